@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la sélection des frames OCR de uploader/ocr_utils.py.
+
+Mesure load_text_frames sur toute la durée de vrais fichiers vidéo (parcours des
+vignettes, choix des frames puis relecture des gagnantes), avec les deux sources
+de frames : ffmpeg (vignettes en niveaux de gris sur un pipe) et OpenCV
+(grab()/retrieve()). Les métadonnées ffprobe sont lues une fois, hors mesure,
+comme dans le pipeline.
+
+Usage: python benchmarks/bench_frame_sampling.py video1.mp4 [video2.mkv ...] [--repeat N]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from uploader.ocr_utils import ffmpeg_available, load_text_frames
+from video_utils import probe_media
+
+FRAME_SOURCES = ['ffmpeg', 'opencv']
+
+
+def run_source(frame_source, video_path, media, repeat):
+    timings = []
+    frames = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        frames, _, _ = load_text_frames(video_path, frame_source, media=media)
+        timings.append(time.perf_counter() - started)
+    return min(timings), [index for index, _ in frames]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('videos', nargs='+', help='Fichiers vidéo à tester')
+    parser.add_argument('--repeat', type=int, default=3, help='Nombre de répétitions (meilleur temps retenu)')
+    args = parser.parse_args()
+
+    sources = FRAME_SOURCES if ffmpeg_available() else ['opencv']
+    if len(sources) < len(FRAME_SOURCES):
+        print("⚠️ Exécutable ffmpeg introuvable : seule la source OpenCV sera mesurée")
+
+    print(f"{'Fichier':40} {'durée (s)':>10} {'source':>8} {'temps (s)':>10} {'frames':>7} {'index retenus'}")
+    for video_path in args.videos:
+        media = probe_media(video_path)
+        duration = (media or {}).get('duration') or 0
+        name = os.path.basename(video_path)[:40]
+        selected = {}
+        for frame_source in sources:
+            elapsed, selected[frame_source] = run_source(frame_source, video_path, media, args.repeat)
+            indices = selected[frame_source]
+            print(f"{name:40} {duration:10.1f} {frame_source:>8} {elapsed:10.3f} {len(indices):7d} {indices}")
+
+        if len(selected) == len(FRAME_SOURCES):
+            common = len(set(selected['ffmpeg']) & set(selected['opencv']))
+            print(f"{'':40} frames communes aux deux sources : {common}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Benchmark des moteurs Tesseract de uploader/ocr_utils.py.
+
+Compare pytesseract (un processus `tesseract` et une image temporaire par frame,
+zones empilées) au moteur en processus tesserocr sur les frames retenues par l'OCR de vrais
+fichiers vidéo, en frames par seconde pour les deux méthodes Tesseract.
+
+Usage: python benchmarks/bench_tesseract_backends.py video1.mp4 [video2.mkv ...] [--repeat N] [--no-regions]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import pytesseract
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from uploader.ocr_utils import (
+    TESSERACT_METHODS, TESSEROCR_AVAILABLE, detect_text_regions, get_tesseract_engine,
+    select_text_frames, set_tesseract_backend, tesseract_region_texts,
+)
+
+
+def run_backend(backend, frames, frame_regions, repeat):
+    set_tesseract_backend(backend)
+    engine = get_tesseract_engine()
+    if engine.name != backend:
+        return None, None
+    if backend == 'pytesseract':
+        try:
+            pytesseract.get_tesseract_version()
+        except Exception:
+            print("⚠️ Exécutable tesseract introuvable : pytesseract ne sera pas mesuré")
+            return None, None
+
+    timings = []
+    texts = []
+    for _ in range(repeat):
+        texts = []
+        started = time.perf_counter()
+        for frame, regions in zip(frames, frame_regions):
+            for method in TESSERACT_METHODS:
+                texts.append(tesseract_region_texts(method, frame, regions, frame.shape[0]))
+        timings.append(time.perf_counter() - started)
+    return min(timings), texts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('videos', nargs='+', help='Fichiers vidéo à tester')
+    parser.add_argument('--repeat', type=int, default=3, help='Nombre de répétitions (meilleur temps retenu)')
+    parser.add_argument('--no-regions', action='store_true', help='OCR sur les frames entières')
+    args = parser.parse_args()
+
+    if not TESSEROCR_AVAILABLE:
+        print("⚠️ tesserocr n'est pas installé : seul pytesseract sera mesuré")
+
+    print(f"{'Fichier':40} {'frames':>7} {'pytesseract (f/s)':>18} {'tesserocr (f/s)':>16} {'mêmes textes':>13}")
+    for video_path in args.videos:
+        cap = cv2.VideoCapture(video_path)
+        frames = select_text_frames(cap)
+        cap.release()
+        frame_regions = [[] if args.no_regions else detect_text_regions(frame) for frame in frames]
+
+        results = {
+            backend: run_backend(backend, frames, frame_regions, args.repeat)
+            for backend in ('pytesseract', 'tesserocr')
+        }
+
+        columns = []
+        for backend in ('pytesseract', 'tesserocr'):
+            elapsed, _ = results[backend]
+            columns.append(f"{len(frames) / elapsed:.2f}" if elapsed else "n/a")
+        texts = [texts for _, texts in results.values() if texts is not None]
+        same = 'oui' if len(texts) == 2 and texts[0] == texts[1] else ('n/a' if len(texts) < 2 else 'non')
+
+        name = os.path.basename(video_path)[:40]
+        print(f"{name:40} {len(frames):7} {columns[0]:>18} {columns[1]:>16} {same:>13}")
+
+
+if __name__ == '__main__':
+    main()
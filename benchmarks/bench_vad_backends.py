@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Benchmark des moteurs Silero VAD de voice_detection.py.
+
+Compare le modèle TorchScript au modèle ONNX (onnxruntime) sur CPU : temps de
+chargement du modèle, puis latence de détection vocale par fichier sur l'audio
+déjà décodé en mémoire, et vérifie que les deux moteurs prennent la même décision.
+
+Usage: python benchmarks/bench_vad_backends.py video1.mp4 [video2.mkv ...] [--repeat N] [--threads N]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import torch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from video_utils import AUDIO_SAMPLE_RATE, decode_audio
+from voice_detection import VoiceActivityDetector
+
+
+def load_detector(onnx):
+    started = time.perf_counter()
+    try:
+        detector = VoiceActivityDetector(onnx=onnx)
+    except Exception:
+        return None, None
+    return detector, time.perf_counter() - started
+
+
+def run_detector(detector, audio, repeat):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = detector.has_speech(audio)
+        timings.append(time.perf_counter() - started)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('videos', nargs='+', help='Fichiers vidéo ou audio à tester')
+    parser.add_argument('--repeat', type=int, default=3, help='Nombre de répétitions (meilleur temps retenu)')
+    parser.add_argument('--threads', type=int, default=1, help='Threads torch (Silero est prévu pour 1 thread)')
+    args = parser.parse_args()
+
+    torch.set_num_threads(args.threads)
+
+    detectors = {}
+    for name, onnx in (('torch', False), ('onnx', True)):
+        detector, load_time = load_detector(onnx)
+        if detector is None:
+            print(f"⚠️ Moteur {name} indisponible (onnxruntime installé ?) : il ne sera pas mesuré")
+            continue
+        detectors[name] = detector
+        print(f"Chargement {name}: {load_time:.3f}s")
+
+    print(f"{'Fichier':40} {'audio (s)':>10} {'torch (s)':>10} {'onnx (s)':>10} {'même décision':>14}")
+    for video_path in args.videos:
+        audio = decode_audio(video_path)
+        if audio is None:
+            print(f"⚠️ Pas d'audio dans {video_path}")
+            continue
+
+        results = {name: run_detector(detector, audio, args.repeat) for name, detector in detectors.items()}
+
+        columns = [
+            f"{results[name][0]:.3f}" if name in results else "n/a"
+            for name in ('torch', 'onnx')
+        ]
+        decisions = [result[0] for _, result in results.values()]
+        same = 'n/a' if len(decisions) < 2 else ('oui' if decisions[0] == decisions[1] else 'non')
+
+        name = os.path.basename(video_path)[:40]
+        print(f"{name:40} {len(audio) / AUDIO_SAMPLE_RATE:10.1f} {columns[0]:>10} {columns[1]:>10} {same:>14}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+Serveur d'inférence local gardant les modèles Whisper, Silero VAD et EasyOCR en mémoire.
+
+Sans ce serveur, chaque vidéo recharge les poids des modèles (plusieurs secondes).
+Le serveur les charge une seule fois et reçoit des tâches (détection vocale,
+transcription, OCR) via un socket Unix ou un port localhost. Les vidéos sont
+échangées par chemin (le client et le serveur doivent tourner sur la même machine),
+l'audio déjà décodé en mémoire est envoyé tel quel (tableau numpy float32).
+
+Usage: python manage.py inference_server
+   ou: python inference_server.py <adresse>
+"""
+
+import ipaddress
+import os
+import queue
+import threading
+import time
+import traceback
+from multiprocessing.connection import Listener, Client
+
+
+class InferenceError(Exception):
+    """Erreur levée par le serveur pendant l'exécution d'une tâche."""
+
+
+def parse_address(address: str):
+    """
+    Convertit une adresse de configuration en adresse multiprocessing.
+
+    'host:port' devient un tuple TCP, tout autre valeur est un chemin de socket Unix.
+    Les requêtes sont désérialisées par pickle : seules les adresses locales
+    (localhost, 127.0.0.0/8) sont acceptées.
+    """
+    if ':' in address and not address.startswith('/'):
+        host, port = address.rsplit(':', 1)
+        if not _is_loopback(host):
+            raise ValueError(f"Adresse du serveur d'inférence non locale refusée: {address}")
+        return (host, int(port)), 'AF_INET'
+    return address, 'AF_UNIX'
+
+
+def _is_loopback(host: str) -> bool:
+    if host == 'localhost':
+        return True
+    try:
+        # multiprocessing.connection n'écoute qu'en IPv4 (AF_INET)
+        return ipaddress.IPv4Address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def check_authkey(authkey: bytes):
+    """Refuse une clé vide : sans clé, n'importe quel processus local pourrait envoyer des pickles."""
+    if not authkey:
+        raise ValueError("INFERENCE_SERVER_AUTHKEY doit être défini (clé partagée par le serveur et les workers)")
+
+
+class TranscriptionBatcher:
+    """
+    Regroupe les transcriptions demandées en même temps par plusieurs clients :
+    les fenêtres de 30 secondes de ces vidéos partagent les mêmes lots Whisper.
+
+    Un seul thread exécute Whisper ; il attend jusqu'à `wait` secondes après la
+    première demande que d'autres arrivent (au plus `max_requests` vidéos par passe).
+    """
+
+    def __init__(self, transcribe_many, wait: float, max_requests: int = 8):
+        self.transcribe_many = transcribe_many
+        self.wait = wait
+        self.max_requests = max_requests
+        self._pending = queue.Queue()
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def submit(self, audio, segments=None) -> str:
+        """Transcrit un audio avec les autres demandes en attente ; bloque jusqu'au résultat."""
+        job = {'request': (audio, segments), 'done': threading.Event()}
+        self._pending.put(job)
+        job['done'].wait()
+        if 'error' in job:
+            raise job['error']
+        return job['result']
+
+    def _run(self):
+        while True:
+            jobs = [self._pending.get()]
+            deadline = time.monotonic() + self.wait
+            while len(jobs) < self.max_requests:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    jobs.append(self._pending.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            if len(jobs) > 1:
+                print(f"🎧 Transcription groupée de {len(jobs)} vidéos")
+            try:
+                results = self.transcribe_many([job['request'] for job in jobs])
+            except Exception as e:
+                traceback.print_exc()
+                for job in jobs:
+                    job['error'] = e
+            else:
+                for job, result in zip(jobs, results):
+                    job['result'] = result
+            for job in jobs:
+                job['done'].set()
+
+
+class InferenceServer:
+    """Serveur multi-clients ; chaque modèle est protégé par son propre verrou."""
+
+    def __init__(self, address: str, authkey: bytes, vad_options: dict | None = None,
+                 asr_options: dict | None = None):
+        check_authkey(authkey)
+        self.address, self.family = parse_address(address)
+        self.authkey = authkey
+        # Modèle Silero préchargé (onnx, model_path) ; les clients peuvent en demander un autre
+        self.vad_options = vad_options or {}
+        # Lots Whisper (batch_size, num_threads), prioritaires sur les options des clients, et
+        # attente du regroupement entre vidéos (cross_video_wait, 0 : chaque demande transcrite seule)
+        self.asr_options = dict(asr_options or {})
+        self.cross_video_wait = self.asr_options.pop('cross_video_wait', 0)
+        self.whisper = None
+        self.detector = None
+        self.batcher = None
+        self._load_lock = threading.Lock()
+        # Un verrou par modèle. L'OCR d'une vidéo à la fois est voulu : le lecteur EasyOCR,
+        # le moteur Tesseract et le pool de processus de uploader.ocr_utils sont partagés et
+        # non réentrants, et une seule vidéo en cours borne la mémoire (frames, modèles)
+        self._locks = {
+            'vad': threading.Lock(),
+            'asr': threading.Lock(),
+            'ocr': threading.Lock(),
+        }
+
+    def load_models(self):
+        """Charge les modèles une seule fois pour toute la durée de vie du serveur."""
+        with self._load_lock:
+            if self.whisper is None:
+                from speech_transcriber import get_model
+                self.whisper = get_model()
+                print("✅ Modèle Whisper chargé")
+
+            if self.batcher is None and self.cross_video_wait > 0:
+                from functools import partial
+                from speech_transcriber import transcribe_many
+                processor, model = self.whisper
+                self.batcher = TranscriptionBatcher(
+                    partial(transcribe_many, processor=processor, model=model, **self.asr_options),
+                    wait=self.cross_video_wait,
+                )
+
+            if self.detector is None:
+                from voice_detection import get_detector
+                self.detector = get_detector(**self.vad_options)
+
+            from uploader.ocr_utils import get_easyocr_reader
+            if get_easyocr_reader() is not None:
+                print("✅ Modèle EasyOCR chargé")
+
+    def serve_forever(self):
+        if self.family == 'AF_UNIX' and os.path.exists(self.address):
+            os.remove(self.address)
+
+        with Listener(self.address, family=self.family, authkey=self.authkey) as listener:
+            print(f"🚀 Serveur d'inférence à l'écoute sur {self.address}")
+            try:
+                while True:
+                    try:
+                        conn = listener.accept()
+                    except Exception as e:
+                        # Client non authentifié ou déconnecté pendant la poignée de main
+                        print(f"⚠️ Connexion refusée: {e}")
+                        continue
+                    threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+            finally:
+                if self.family == 'AF_UNIX' and os.path.exists(self.address):
+                    os.remove(self.address)
+
+    def _handle(self, conn):
+        with conn:
+            while True:
+                try:
+                    request = conn.recv()
+                except (EOFError, OSError):
+                    return
+
+                try:
+                    result = self.dispatch(request.pop('op'), **request)
+                    conn.send({'ok': True, 'result': result})
+                except Exception as e:
+                    traceback.print_exc()
+                    conn.send({'ok': False, 'error': f"{type(e).__name__}: {e}"})
+
+    def dispatch(self, op, **kwargs):
+        if op == 'ping':
+            return 'pong'
+
+        self.load_models()
+
+        if op == 'has_speech':
+            from voice_detection import has_speech
+            with self._locks['vad']:
+                return has_speech(kwargs.pop('audio'), **kwargs)
+
+        if op == 'transcribe':
+            if self.batcher is not None:
+                return self.batcher.submit(kwargs['audio'], kwargs.get('segments'))
+
+            from speech_transcriber import transcribe
+            processor, model = self.whisper
+            options = {**kwargs, **self.asr_options}
+            with self._locks['asr']:
+                return transcribe(options.pop('audio'), processor=processor, model=model, **options)
+
+        if op == 'extract_text_details':
+            from uploader.ocr_utils import extract_text_details
+            with self._locks['ocr']:
+                return extract_text_details(kwargs.pop('video_path'), **kwargs)
+
+        raise ValueError(f"Opération inconnue: {op}")
+
+
+class InferenceClient:
+    """
+    Client du serveur d'inférence.
+
+    Une connexion est ouverte par appel ; les erreurs de connexion (serveur arrêté)
+    sont des OSError, les erreurs d'exécution côté serveur des InferenceError.
+    """
+
+    def __init__(self, address: str, authkey: bytes):
+        self.address, self.family = parse_address(address)
+        self.authkey = authkey
+
+    def _call(self, op, **kwargs):
+        with Client(self.address, family=self.family, authkey=self.authkey) as conn:
+            conn.send({'op': op, **kwargs})
+            response = conn.recv()
+        if not response['ok']:
+            raise InferenceError(response['error'])
+        return response['result']
+
+    def ping(self) -> bool:
+        return self._call('ping') == 'pong'
+
+    def has_speech(self, audio, **vad_options):
+        return self._call('has_speech', audio=audio, **vad_options)
+
+    def transcribe(self, audio, segments=None, **asr_options) -> str:
+        return self._call('transcribe', audio=audio, segments=segments, **asr_options)
+
+    def extract_text_details(self, video_path: str, **ocr_options) -> dict:
+        return self._call('extract_text_details', video_path=video_path, **ocr_options)
+
+
+if __name__ == "__main__":
+    import sys
+    if len(sys.argv) > 1:
+        try:
+            server = InferenceServer(
+                sys.argv[1],
+                os.environ.get('INFERENCE_SERVER_AUTHKEY', '').encode(),
+                vad_options={
+                    'onnx': os.environ.get('VAD_ONNX', 'False').lower() == 'true',
+                    'model_path': os.environ.get('VAD_MODEL_PATH') or None,
+                },
+                asr_options={
+                    'batch_size': int(os.environ.get('ASR_BATCH_SIZE', '4')),
+                    'num_threads': int(os.environ.get('ASR_NUM_THREADS', '0')),
+                    'cross_video_wait': float(os.environ.get('ASR_CROSS_VIDEO_WAIT', '0')),
+                },
+            )
+        except ValueError as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+        server.load_models()
+        server.serve_forever()
+    else:
+        print("Usage: python inference_server.py <socket_unix|host:port>")
@@ -207,3 +207,86 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # OpenAI Configuration for AI text analysis
 OPENAI_API_KEY = os.environ.get('OPENAI_API_KEY', '')
+
+# File d'attente des traitements vidéo (commande `process_videos`)
+PROCESSING_JOB_MAX_ATTEMPTS = int(os.environ.get('PROCESSING_JOB_MAX_ATTEMPTS', '3'))
+PROCESSING_JOB_RETRY_DELAY = int(os.environ.get('PROCESSING_JOB_RETRY_DELAY', '60'))  # secondes, doublé à chaque échec
+# Le worker rafraîchit le verrou de sa tâche toutes les PROCESSING_JOB_HEARTBEAT_SECONDS ; un verrou
+# non rafraîchi depuis PROCESSING_JOB_STALE_SECONDS est celui d'un worker mort
+PROCESSING_JOB_HEARTBEAT_SECONDS = int(os.environ.get('PROCESSING_JOB_HEARTBEAT_SECONDS', '60'))
+PROCESSING_JOB_STALE_SECONDS = int(os.environ.get('PROCESSING_JOB_STALE_SECONDS', '600'))
+
+# Exécuter la branche OCR et la branche audio (VAD + Whisper) en parallèle, dans deux processus
+PIPELINE_PARALLEL_BRANCHES = os.environ.get('PIPELINE_PARALLEL_BRANCHES', 'True').lower() == 'true'
+
+# Taille des blocs lors du téléchargement d'une vidéo dans l'espace de travail
+# d'une tâche (multiple de 256 Ko, exigé par Google Cloud Storage)
+MEDIA_DOWNLOAD_CHUNK_SIZE = int(os.environ.get('MEDIA_DOWNLOAD_CHUNK_SIZE', str(8 * 1024 * 1024)))
+
+# Empreinte SHA-256 calculée pendant la réception des uploads (déduplication des vidéos)
+FILE_UPLOAD_HANDLERS = [
+    'uploader.upload_handlers.HashingMemoryFileUploadHandler',
+    'uploader.upload_handlers.HashingTemporaryFileUploadHandler',
+]
+
+# Réutiliser aussi le fichier déjà stocké quand une vidéo identique est uploadée
+DEDUPLICATE_UPLOAD_BLOBS = os.environ.get('DEDUPLICATE_UPLOAD_BLOBS', 'False').lower() == 'true'
+
+# Serveur d'inférence gardant les modèles en mémoire (commande `inference_server`).
+# Socket Unix (/tmp/mediamanager-inference.sock) ou localhost:port ; vide = modèles chargés dans le worker.
+# La clé partagée est obligatoire : le serveur refuse de démarrer sans elle
+INFERENCE_SERVER_ADDRESS = os.environ.get('INFERENCE_SERVER_ADDRESS', '')
+INFERENCE_SERVER_AUTHKEY = os.environ.get('INFERENCE_SERVER_AUTHKEY', '')
+
+# OCR uniquement sur les zones de texte détectées (recadrées puis agrandies) au lieu de l'image entière
+OCR_TEXT_REGIONS = os.environ.get('OCR_TEXT_REGIONS', 'True').lower() == 'true'
+
+# Nombre de processus pour les méthodes Tesseract de l'OCR (0 ou 1 = séquentiel)
+OCR_WORKERS = int(os.environ.get('OCR_WORKERS', str(min(4, os.cpu_count() or 1))))
+
+# OCR en cascade : Tesseract, puis preprocessing agressif, puis EasyOCR, arrêt dès que la
+# confiance atteint le seuil de la frame ; frames suivantes ignorées au-delà du seuil vidéo.
+# Désactivée par défaut : toutes les méthodes sont appliquées à chaque frame, comme auparavant
+OCR_CASCADE = os.environ.get('OCR_CASCADE', 'False').lower() == 'true'
+OCR_CASCADE_FRAME_THRESHOLD = float(os.environ.get('OCR_CASCADE_FRAME_THRESHOLD', '0.8'))
+OCR_CASCADE_VIDEO_THRESHOLD = float(os.environ.get('OCR_CASCADE_VIDEO_THRESHOLD', '0.9'))
+
+# EasyOCR : toutes les frames (ou zones de texte) d'une vidéo en un appel, par lots de cette taille
+EASYOCR_BATCH_SIZE = int(os.environ.get('EASYOCR_BATCH_SIZE', '8'))
+EASYOCR_WORKERS = int(os.environ.get('EASYOCR_WORKERS', '0'))  # workers du chargeur de données EasyOCR
+
+# Moteur Tesseract : 'auto' (tesserocr en processus si installé, sinon pytesseract), 'tesserocr' ou 'pytesseract'
+OCR_TESSERACT_BACKEND = os.environ.get('OCR_TESSERACT_BACKEND', 'auto')
+
+# Ne lire qu'une fois les frames et zones de texte identiques (dHash, puis masque du texte au pixel près)
+OCR_DEDUPE = os.environ.get('OCR_DEDUPE', 'True').lower() == 'true'
+
+# Lecture des frames pour l'OCR : 'ffmpeg' (frames échantillonnées, réduites et en niveaux de gris
+# lues sur un pipe), 'opencv' ou 'auto' (ffmpeg si l'exécutable est installé)
+OCR_FRAME_SOURCE = os.environ.get('OCR_FRAME_SOURCE', 'auto')
+
+# Mode OCR : 'frames' (frames distinctes de toute la vidéo) ou 'subtitles' (bande des sous-titres
+# incrustés détectée une fois, puis seule cette bande lue toutes les OCR_SUBTITLE_INTERVAL secondes)
+OCR_MODE = os.environ.get('OCR_MODE', 'frames')
+OCR_SUBTITLE_INTERVAL = float(os.environ.get('OCR_SUBTITLE_INTERVAL', '0.5'))
+
+# Utiliser les pistes de sous-titres texte intégrées (mov_text, SRT, WebVTT...) comme texte de la
+# vidéo, sans OCR (la piste audio est toujours analysée et transcrite)
+USE_EMBEDDED_SUBTITLES = os.environ.get('USE_EMBEDDED_SUBTITLES', 'True').lower() == 'true'
+
+# Détection vocale en flux (pipe ffmpeg) avant tout décodage en mémoire : arrêtée dès que l'absence
+# de parole est acquise (ou sa présence, sans transcription à faire) ; seuls les passages de parole
+# sont ensuite décodés pour Whisper
+VAD_STREAMING = os.environ.get('VAD_STREAMING', 'True').lower() == 'true'
+
+# Silero VAD : modèle ONNX (onnxruntime, à installer) plutôt que TorchScript, et fichier de modèle
+# local (.jit ou .onnx) ; par défaut le modèle fourni par le paquet silero-vad, sans torch.hub
+VAD_ONNX = os.environ.get('VAD_ONNX', 'False').lower() == 'true'
+VAD_MODEL_PATH = os.environ.get('VAD_MODEL_PATH', '')
+
+# Whisper : fenêtres de 30 s transcrites par lot (features et generate), threads torch (0 : défaut)
+ASR_BATCH_SIZE = int(os.environ.get('ASR_BATCH_SIZE', '4'))
+ASR_NUM_THREADS = int(os.environ.get('ASR_NUM_THREADS', '0'))
+# Serveur d'inférence : attente (secondes) pour regrouper dans les mêmes lots Whisper les
+# transcriptions de plusieurs vidéos demandées en même temps (0 : désactivé)
+ASR_CROSS_VIDEO_WAIT = float(os.environ.get('ASR_CROSS_VIDEO_WAIT', '0'))
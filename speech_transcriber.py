@@ -1,90 +1,220 @@
-import torch
-from transformers import WhisperProcessor, WhisperForConditionalGeneration
-import torchaudio
-import ffmpeg
+import threading
+
 import numpy as np
 
+from video_utils import AUDIO_SAMPLE_RATE, load_audio
+
+# Processeur et modèle Whisper du processus (voir get_model)
+_whisper = None
+_whisper_lock = threading.Lock()
+
 def load_model():
     """Charge le modèle Whisper et le processeur."""
+    # Import différé : transformers et torch ne sont chargés qu'avec le modèle
+    from transformers import WhisperProcessor, WhisperForConditionalGeneration
+
     processor = WhisperProcessor.from_pretrained("openai/whisper-small")
     model = WhisperForConditionalGeneration.from_pretrained("openai/whisper-small")
     model.config.forced_decoder_ids = None
     return processor, model
 
-def transcribe(audio_path: str) -> str:
-    """Transcrire le fichier audio donné en texte, en traitant par segments."""
-    processor, model = load_model()
-
-    try:
-        waveform, sample_rate = torchaudio.load(audio_path)
-    except Exception as e:
-        # Tenter de convertir avec ffmpeg si le chargement direct échoue
-        try:
-            out, _ = (
-                ffmpeg
-                .input(audio_path)
-                .output('-', format='s16le', acodec='pcm_s16le', ac=1, ar='16k')
-                .run(capture_stdout=True, capture_stderr=True)
-            )
-            waveform = torch.from_numpy(np.frombuffer(out, np.int16).copy().astype(np.float32) / 32768.0)
-            sample_rate = 16000 # Whisper attend du 16kHz
-            # Si la waveform est stéréo, la convertir en mono
-            if waveform.ndim > 1 and waveform.shape[0] > 1:
-                waveform = waveform.mean(dim=0)
-
-        except ffmpeg.Error as e:
-            print(f"Erreur FFMPEG: {e.stderr.decode('utf8')}")
-            return f"Erreur lors du traitement audio avec FFmpeg: {e}"
-        except Exception as e_ffmpeg:
-             return f"Erreur inattendue lors de la conversion avec FFmpeg: {e_ffmpeg}"
-
-    # S'assurer que l'audio est mono pour Whisper
-    if waveform.ndim > 1 and waveform.shape[0] > 1:
-        waveform = waveform.mean(dim=0) # Convertir en mono en prenant la moyenne des canaux
-    elif waveform.ndim == 1 and waveform.shape[0] > 16000 * 30 : # Si c'est un long fichier mono déjà chargé
-        pass # Pas besoin de faire la moyenne
-
-    # Rééchantillonner si nécessaire (Whisper attend du 16kHz)
-    if sample_rate != 16000:
-        resampler = torchaudio.transforms.Resample(orig_freq=sample_rate, new_freq=16000)
-        waveform = resampler(waveform)
-
-    # Diviser l'audio en segments de 30 secondes pour un meilleur traitement
-    chunk_length = 30 * 16000  # 30 secondes à 16kHz
-    waveform_numpy = waveform.squeeze().numpy()
-    
-    print(f"Durée totale de l'audio : {len(waveform_numpy) / 16000:.2f} secondes")
-    
-    transcriptions = []
-    
-    # Traiter par segments
-    for i in range(0, len(waveform_numpy), chunk_length):
-        chunk = waveform_numpy[i:i + chunk_length]
-        
-        # Ignorer les segments trop courts (moins de 1 seconde)
-        if len(chunk) < 16000:
+def get_model():
+    """Processeur et modèle Whisper partagés par tout le processus, chargés au premier appel."""
+    global _whisper
+    with _whisper_lock:
+        if _whisper is None:
+            _whisper = load_model()
+        return _whisper
+
+def set_num_threads(num_threads: int = 0):
+    """Nombre de threads torch pour l'inférence sur CPU (0 : valeur par défaut de torch)."""
+    import torch
+
+    if num_threads and num_threads > 0 and torch.get_num_threads() != num_threads:
+        torch.set_num_threads(num_threads)
+
+def transcribe(audio, processor=None, model=None, segments=None, batch_size: int = 4,
+               num_threads: int = 0) -> str:
+    """
+    Transcrire l'audio donné en texte, en traitant par segments.
+
+    audio est soit l'audio déjà décodé par video_utils.decode_audio (numpy float32
+    mono 16kHz, partagé avec la détection vocale), soit le chemin d'un fichier
+    audio/vidéo décodé ici par ffmpeg.
+
+    segments: segments de parole [[début, fin], ...] en secondes détectés par le VAD.
+    S'ils sont fournis, seuls ces passages (avec une marge) sont regroupés dans les
+    fenêtres de 30 secondes de Whisper ; sinon tout l'audio est transcrit.
+
+    batch_size: nombre de fenêtres de 30 secondes traitées par un même appel Whisper
+    num_threads: threads torch (0 : valeur par défaut de torch)
+
+    processor et model peuvent être fournis déjà chargés ; sinon ceux du processus
+    sont utilisés (chargés une seule fois, voir get_model).
+    """
+    return transcribe_many([(audio, segments)], processor, model, batch_size, num_threads)[0]
+
+def transcribe_many(requests, processor=None, model=None, batch_size: int = 4,
+                    num_threads: int = 0) -> list:
+    """
+    Transcrit plusieurs audios (une vidéo chacun) : les fenêtres de 30 secondes de
+    tous les audios sont regroupées dans les mêmes lots pour l'extraction des
+    features et model.generate.
+
+    Args:
+        requests: list[(audio, segments)] (voir transcribe)
+
+    Returns:
+        list[str] : une transcription par audio, dans l'ordre de requests
+    """
+    chunks = []
+    for index, (audio, segments) in enumerate(requests):
+        if segments is not None and not segments:
+            print("Aucun segment de parole : transcription ignorée")
+            continue
+
+        waveform_numpy = load_audio(audio)
+        if waveform_numpy is None:
             continue
-            
-        print(f"Traitement du segment {i//chunk_length + 1}: {i/16000:.1f}s - {(i+len(chunk))/16000:.1f}s")
-        
-        # Traiter ce segment
-        input_features = processor(chunk, sampling_rate=16000, return_tensors="pt").input_features
-        
-        # Générer les IDs des tokens pour ce segment
-        predicted_ids = model.generate(input_features)
-        
-        # Décoder les IDs des tokens en texte
-        segment_transcription = processor.batch_decode(predicted_ids, skip_special_tokens=True)[0]
-        
-        if segment_transcription.strip():
-            transcriptions.append(segment_transcription.strip())
-            print(f"Segment {i//chunk_length + 1}: {segment_transcription[:50]}...")
-
-    # Combiner toutes les transcriptions
-    full_transcription = " ".join(transcriptions)
-    print(f"Transcription complète : {len(full_transcription)} caractères")
+
+        print(f"Durée totale de l'audio : {len(waveform_numpy) / AUDIO_SAMPLE_RATE:.2f} secondes")
+        audio_chunks = split_audio_chunks(waveform_numpy, segments)
+        if segments is not None:
+            speech_seconds = sum(len(chunk) for _, _, chunk in audio_chunks) / AUDIO_SAMPLE_RATE
+            print(f"Parole seule : {speech_seconds:.1f}s en {len(audio_chunks)} fenêtre(s)")
+        chunks.extend((index, start, end, chunk) for start, end, chunk in audio_chunks)
+
+    transcriptions = [[] for _ in requests]
+    if chunks:
+        if processor is None or model is None:
+            processor, model = get_model()
+        set_num_threads(num_threads)
+        batch_size = max(1, batch_size)
+
+        # Traiter les segments par lots
+        for first in range(0, len(chunks), batch_size):
+            batch = chunks[first:first + batch_size]
+            print(f"Traitement des segments {first + 1}-{first + len(batch)}/{len(chunks)}")
+
+            # Features de tout le lot (chaque segment est complété à 30 secondes)
+            input_features = processor(
+                [chunk for _, _, _, chunk in batch], sampling_rate=AUDIO_SAMPLE_RATE, return_tensors="pt"
+            ).input_features
+
+            # Générer les IDs des tokens pour tout le lot
+            predicted_ids = model.generate(input_features)
+
+            # Décoder les IDs des tokens en texte
+            texts = processor.batch_decode(predicted_ids, skip_special_tokens=True)
+
+            for (index, start, end, _), segment_transcription in zip(batch, texts):
+                if segment_transcription.strip():
+                    transcriptions[index].append(segment_transcription.strip())
+                    print(f"Segment {start:.1f}s - {end:.1f}s: {segment_transcription[:50]}...")
+
+    # Combiner les transcriptions de chaque audio
+    results = [" ".join(parts) for parts in transcriptions]
+    for full_transcription in results:
+        print(f"Transcription complète : {len(full_transcription)} caractères")
     
-    return full_transcription
+    return results
+
+def split_audio_chunks(waveform, segments=None, chunk_seconds=30):
+    """
+    Découpe l'audio en morceaux d'au plus `chunk_seconds` pour Whisper.
+
+    Sans segments, découpage fixe de tout l'audio (les morceaux de moins d'une
+    seconde sont ignorés). Avec segments, les passages de parole sont mis bout à
+    bout dans les fenêtres (voir speech_windows).
+
+    Returns:
+        list[(début, fin, audio)] ; début et fin en secondes dans l'audio d'origine
+    """
+    chunk_length = chunk_seconds * AUDIO_SAMPLE_RATE
+    if segments is None:
+        return [
+            (i / AUDIO_SAMPLE_RATE, (i + len(chunk)) / AUDIO_SAMPLE_RATE, chunk)
+            for i in range(0, len(waveform), chunk_length)
+            # Ignorer les segments trop courts (moins de 1 seconde)
+            if len(chunk := waveform[i:i + chunk_length]) >= AUDIO_SAMPLE_RATE
+        ]
+
+    chunks = []
+    for ranges in speech_windows(segments, len(waveform), chunk_length):
+        chunk = np.concatenate([waveform[start:end] for start, end in ranges])
+        chunks.append((ranges[0][0] / AUDIO_SAMPLE_RATE, ranges[-1][1] / AUDIO_SAMPLE_RATE, chunk))
+    return chunks
+
+def speech_windows(segments, total_samples, window_samples, padding=0.2, min_window=1.0):
+    """
+    Regroupe les segments de parole dans des fenêtres Whisper.
+
+    Chaque segment est élargi de `padding` secondes de chaque côté (les segments qui
+    se chevauchent alors sont fusionnés), puis les segments sont ajoutés à la fenêtre
+    courante tant qu'elle ne dépasse pas `window_samples` : un segment n'est jamais
+    coupé entre deux fenêtres, sauf s'il est à lui seul plus long qu'une fenêtre ; il
+    est alors coupé en parts égales, sans reste minuscule.
+
+    Une fenêtre de moins de `min_window` secondes (Whisper y invente volontiers du
+    texte) est fusionnée avec sa voisine si elles tiennent ensemble dans une fenêtre,
+    sinon ignorée.
+
+    Args:
+        segments: [[début, fin], ...] en secondes
+        total_samples: Nombre d'échantillons de l'audio
+        window_samples: Taille maximale d'une fenêtre en échantillons
+
+    Returns:
+        list[list[(début, fin)]] : plages d'échantillons de chaque fenêtre
+    """
+    pad = int(padding * AUDIO_SAMPLE_RATE)
+    ranges = []
+    for start, end in sorted(segments):
+        start = max(0, int(start * AUDIO_SAMPLE_RATE) - pad)
+        end = min(total_samples, int(end * AUDIO_SAMPLE_RATE) + pad)
+        if end <= start:
+            continue
+        if ranges and start <= ranges[-1][1]:
+            ranges[-1] = (ranges[-1][0], max(ranges[-1][1], end))
+        else:
+            ranges.append((start, end))
+
+    windows = []
+    current, current_length = [], 0
+    for start, end in ranges:
+        # Segment plus long qu'une fenêtre : découpé en parts égales d'au plus une fenêtre
+        if end - start > window_samples:
+            if current:
+                windows.append(current)
+                current, current_length = [], 0
+            parts = -(-(end - start) // window_samples)
+            size = -(-(end - start) // parts)
+            while end - start > window_samples:
+                windows.append([(start, start + size)])
+                start += size
+
+        if current_length + end - start > window_samples:
+            windows.append(current)
+            current, current_length = [], 0
+        current.append((start, end))
+        current_length += end - start
+
+    if current:
+        windows.append(current)
+
+    min_samples = int(min_window * AUDIO_SAMPLE_RATE)
+    merged = []
+    for window in windows:
+        if merged:
+            previous_length, length = _window_length(merged[-1]), _window_length(window)
+            if min(previous_length, length) < min_samples and previous_length + length <= window_samples:
+                merged[-1] = merged[-1] + window
+                continue
+        merged.append(window)
+    return [window for window in merged if _window_length(window) >= min_samples]
+
+def _window_length(window):
+    return sum(end - start for start, end in window)
 
 if __name__ == '__main__':
     # Ceci est un exemple d'utilisation.
@@ -94,4 +224,4 @@ if __name__ == '__main__':
     # print(f"Tentative de transcription de {test_audio_path}")
     # transcript = transcribe(test_audio_path)
     # print("Transcription:", transcript)
-    print("Le module de transcription est prêt. Utilisez la fonction transcribe(audio_path) avec un chemin de fichier audio.") 
\ No newline at end of file
+    print("Le module de transcription est prêt. Utilisez la fonction transcribe(audio) avec un chemin de fichier audio ou l'audio décodé.") 
\ No newline at end of file
@@ -1,16 +1,16 @@
 from django.contrib import admin
-from .models import Video
+from .models import Video, ProcessingJob
 
 @admin.register(Video)
 class VideoAdmin(admin.ModelAdmin):
-    list_display = ['title', 'category', 'subcategory', 'keywords_display', 'uploaded_at']
-    list_filter = ['category', 'subcategory', 'uploaded_at']
+    list_display = ['title', 'category', 'subcategory', 'keywords_display', 'processing_status', 'uploaded_at']
+    list_filter = ['category', 'subcategory', 'processing_status', 'uploaded_at']
     search_fields = ['title', 'extracted_text', 'corrected_text', 'category', 'subcategory']
-    readonly_fields = ['extracted_text', 'corrected_text', 'keywords', 'category', 'subcategory', 'analysis_metadata', 'uploaded_at']
+    readonly_fields = ['extracted_text', 'corrected_text', 'keywords', 'category', 'subcategory', 'analysis_metadata', 'processing_status', 'processing_stages', 'media_metadata', 'content_hash', 'uploaded_at']
     
     fieldsets = (
         ('Informations de base', {
-            'fields': ('title', 'file', 'uploaded_at')
+            'fields': ('title', 'file', 'uploaded_at', 'processing_status')
         }),
         ('Analyse OCR', {
             'fields': ('extracted_text', 'corrected_text'),
@@ -21,7 +21,7 @@ class VideoAdmin(admin.ModelAdmin):
             'classes': ('collapse',),
         }),
         ('Métadonnées', {
-            'fields': ('analysis_metadata',),
+            'fields': ('analysis_metadata', 'processing_stages', 'media_metadata', 'content_hash'),
             'classes': ('collapse',),
         }),
     )
@@ -36,3 +36,12 @@ class VideoAdmin(admin.ModelAdmin):
     def get_queryset(self, request):
         """Optimise les requêtes pour la liste."""
         return super().get_queryset(request).select_related()
+
+
+@admin.register(ProcessingJob)
+class ProcessingJobAdmin(admin.ModelAdmin):
+    list_display = ['id', 'video', 'status', 'attempts', 'max_attempts', 'locked_by', 'run_after', 'updated_at']
+    list_filter = ['status']
+    search_fields = ['video__title', 'locked_by', 'last_error']
+    readonly_fields = ['locked_by', 'locked_at', 'last_error', 'created_at', 'updated_at']
+    list_select_related = ['video']
@@ -920,6 +920,8 @@ class SmartSearch:
         scored_videos = []
         
         for index, video in enumerate(videos):
+            # Instant où le texte recherché apparaît à l'écran (lien direct depuis les résultats)
+            video.match_time = video.find_in_timeline(query_lower)
             score = SmartSearch._calculate_relevance_score(video, query_lower, query_words)
             if score > 0:
                 # Score négatif pour avoir les meilleurs scores en premier avec heapq
@@ -946,7 +948,8 @@ class SmartSearch:
             'subcategory': 2.0,
             'keywords': 2.0,
             'corrected_text': 1.0,
-            'extracted_text': 0.8
+            'extracted_text': 0.8,
+            'ocr_timeline': 0.8
         }
         
         # Recherche dans le titre
@@ -973,6 +976,9 @@ class SmartSearch:
         # Recherche dans le texte extrait (fallback)
         if video.extracted_text and query_lower in video.extracted_text.lower():
             score += weights['extracted_text']
+        # Sinon dans la chronologie OCR (texte de toutes les frames lues)
+        elif getattr(video, 'match_time', None) is not None:
+            score += weights['ocr_timeline']
         
         # Bonus pour correspondance de mots multiples
         for word in query_words:
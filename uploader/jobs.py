@@ -0,0 +1,210 @@
+"""
+File d'attente des traitements vidéo, stockée dans PostgreSQL.
+
+Les tâches sont réclamées avec SELECT ... FOR UPDATE SKIP LOCKED : plusieurs
+workers `process_videos` (sur une ou plusieurs machines) peuvent tourner en
+parallèle sans jamais traiter deux fois la même vidéo. Pendant le traitement,
+le worker rafraîchit `locked_at` (JobHeartbeat) : seul le verrou d'un worker
+mort devient périmé, quelle que soit la durée de la vidéo.
+"""
+
+import logging
+import socket
+import os
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Video, ProcessingJob
+
+logger = logging.getLogger(__name__)
+
+
+def default_worker_id():
+    """Identifiant unique du worker courant (hôte + PID)."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def enqueue_video(video):
+    """
+    Ajoute une tâche de traitement pour la vidéo.
+    Ne crée pas de doublon si une tâche est déjà en attente ou en cours.
+    """
+    job = video.jobs.filter(
+        status__in=[ProcessingJob.STATUS_PENDING, ProcessingJob.STATUS_RUNNING]
+    ).first()
+    if job is None:
+        job = ProcessingJob.objects.create(
+            video=video,
+            max_attempts=settings.PROCESSING_JOB_MAX_ATTEMPTS,
+        )
+    Video.objects.filter(pk=video.pk).update(processing_status=Video.STATUS_PENDING)
+    video.processing_status = Video.STATUS_PENDING
+    return job
+
+
+def claim_next_job(worker_id):
+    """
+    Réclame la prochaine tâche disponible pour ce worker.
+
+    Une tâche est disponible si elle est en attente et que son délai de retry
+    est écoulé, ou si elle est marquée en cours mais que son verrou est périmé
+    (worker mort pendant le traitement).
+
+    Returns:
+        ProcessingJob réclamé, ou None si la file est vide
+    """
+    now = timezone.now()
+    stale_before = now - timedelta(seconds=settings.PROCESSING_JOB_STALE_SECONDS)
+
+    while True:
+        with transaction.atomic():
+            job = (
+                ProcessingJob.objects
+                .select_for_update(skip_locked=True)
+                .filter(
+                    Q(status=ProcessingJob.STATUS_PENDING, run_after__lte=now) |
+                    Q(status=ProcessingJob.STATUS_RUNNING, locked_at__lt=stale_before)
+                )
+                .order_by('run_after', 'id')
+                .first()
+            )
+            if job is None:
+                return None
+
+            # Verrou périmé sur une tâche qui a épuisé ses tentatives : abandon définitif
+            if job.status == ProcessingJob.STATUS_RUNNING and job.attempts >= job.max_attempts:
+                job.status = ProcessingJob.STATUS_FAILED
+                job.last_error = job.last_error or f"Worker {job.locked_by} n'a jamais terminé la tâche"
+                job.save(update_fields=['status', 'last_error', 'updated_at'])
+                Video.objects.filter(pk=job.video_id).update(processing_status=Video.STATUS_FAILED)
+                continue
+
+            job.status = ProcessingJob.STATUS_RUNNING
+            job.locked_by = worker_id
+            job.locked_at = now
+            job.attempts += 1
+            job.save(update_fields=['status', 'locked_by', 'locked_at', 'attempts', 'updated_at'])
+            Video.objects.filter(pk=job.video_id).update(processing_status=Video.STATUS_PROCESSING)
+            return job
+
+
+def _owned(job):
+    """La tâche, tant qu'elle est en cours et verrouillée par le worker qui l'a réclamée."""
+    return ProcessingJob.objects.filter(
+        pk=job.pk, status=ProcessingJob.STATUS_RUNNING, locked_by=job.locked_by,
+    )
+
+
+def touch_job(job):
+    """
+    Rafraîchit le verrou de la tâche.
+
+    Returns:
+        bool: False si la tâche a été reprise par un autre worker (ou n'est plus en cours)
+    """
+    now = timezone.now()
+    if not _owned(job).update(locked_at=now, updated_at=now):
+        return False
+    job.locked_at = now
+    return True
+
+
+class JobHeartbeat:
+    """
+    Rafraîchit `locked_at` toutes les `interval` secondes dans un thread, pendant
+    que la tâche est traitée :
+
+        with JobHeartbeat(job):
+            process_video(job.video)
+    """
+
+    def __init__(self, job, interval=None):
+        self.job = job
+        self.interval = interval or settings.PROCESSING_JOB_HEARTBEAT_SECONDS
+        self.lost = False
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+        return False
+
+    def _run(self):
+        try:
+            while not self._stop.wait(self.interval):
+                if not touch_job(self.job):
+                    self.lost = True
+                    logger.warning(f"Tâche {self.job.pk} reprise par un autre worker, verrou perdu")
+                    return
+        except Exception as e:
+            logger.error(f"Erreur rafraîchissement du verrou de la tâche {self.job.pk}: {e}")
+        finally:
+            # Connexion ouverte par ce thread
+            connection.close()
+
+
+def complete_job(job):
+    """
+    Marque la tâche et la vidéo comme terminées.
+
+    Returns:
+        bool: False si la tâche a été reprise par un autre worker (rien n'est modifié)
+    """
+    if not _owned(job).update(status=ProcessingJob.STATUS_DONE, last_error='', updated_at=timezone.now()):
+        logger.warning(f"Tâche {job.pk} reprise par un autre worker, résultat ignoré")
+        return False
+    job.status = ProcessingJob.STATUS_DONE
+    job.last_error = ''
+    Video.objects.filter(pk=job.video_id).update(processing_status=Video.STATUS_DONE)
+    return True
+
+
+def fail_job(job, error):
+    """
+    Enregistre l'échec d'une tentative.
+    La tâche est replanifiée avec un délai exponentiel tant qu'il reste des tentatives.
+    Rien n'est modifié si la tâche a été reprise par un autre worker.
+
+    Returns:
+        bool: True si la tâche sera retentée
+    """
+    retry = job.attempts < job.max_attempts
+
+    if retry:
+        delay = settings.PROCESSING_JOB_RETRY_DELAY * (2 ** max(job.attempts - 1, 0))
+        status = ProcessingJob.STATUS_PENDING
+        run_after = timezone.now() + timedelta(seconds=delay)
+        video_status = Video.STATUS_PENDING
+    else:
+        status = ProcessingJob.STATUS_FAILED
+        run_after = job.run_after
+        video_status = Video.STATUS_FAILED
+
+    updated = _owned(job).update(
+        status=status, run_after=run_after, last_error=str(error), updated_at=timezone.now(),
+    )
+    if not updated:
+        logger.warning(f"Tâche {job.pk} reprise par un autre worker, échec ignoré: {error}")
+        return False
+
+    if retry:
+        logger.warning(f"Tâche {job.pk} en échec (tentative {job.attempts}/{job.max_attempts}), nouvel essai dans {delay}s: {error}")
+    else:
+        logger.error(f"Tâche {job.pk} abandonnée après {job.attempts} tentative(s): {error}")
+
+    job.status = status
+    job.run_after = run_after
+    job.last_error = str(error)
+    Video.objects.filter(pk=job.video_id).update(processing_status=video_status)
+    return retry
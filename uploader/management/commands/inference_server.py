@@ -0,0 +1,52 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+import sys
+sys.path.append(str(settings.BASE_DIR))
+from inference_server import InferenceServer
+
+class Command(BaseCommand):
+    help = 'Lance le serveur d\'inférence gardant Whisper, Silero VAD et EasyOCR en mémoire'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--address',
+            type=str,
+            help='Socket Unix ou host:port (par défaut: INFERENCE_SERVER_ADDRESS)'
+        )
+        parser.add_argument(
+            '--lazy',
+            action='store_true',
+            help='Charge les modèles à la première requête plutôt qu\'au démarrage'
+        )
+
+    def handle(self, *args, **options):
+        address = options.get('address') or settings.INFERENCE_SERVER_ADDRESS
+        if not address:
+            self.stdout.write(
+                self.style.ERROR('Aucune adresse: utilisez --address ou INFERENCE_SERVER_ADDRESS')
+            )
+            return
+
+        try:
+            server = InferenceServer(
+                address,
+                settings.INFERENCE_SERVER_AUTHKEY.encode(),
+                vad_options={'onnx': settings.VAD_ONNX, 'model_path': settings.VAD_MODEL_PATH},
+                asr_options={
+                    'batch_size': settings.ASR_BATCH_SIZE,
+                    'num_threads': settings.ASR_NUM_THREADS,
+                    'cross_video_wait': settings.ASR_CROSS_VIDEO_WAIT,
+                },
+            )
+        except ValueError as e:
+            self.stdout.write(self.style.ERROR(str(e)))
+            return
+
+        if not options.get('lazy'):
+            self.stdout.write('⏳ Chargement des modèles...')
+            server.load_models()
+
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.WARNING('Serveur d\'inférence arrêté'))
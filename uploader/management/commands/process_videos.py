@@ -0,0 +1,142 @@
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from uploader.jobs import default_worker_id, claim_next_job, complete_job, fail_job, enqueue_video, JobHeartbeat
+from uploader.models import Video
+import signal
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+class Command(BaseCommand):
+    help = 'Worker de traitement des vidéos en file d\'attente (OCR, audio, IA)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Traite les tâches disponibles puis s\'arrête'
+        )
+        parser.add_argument(
+            '--max-jobs',
+            type=int,
+            default=0,
+            help='Nombre maximal de tâches à traiter avant arrêt (0 = illimité)'
+        )
+        parser.add_argument(
+            '--sleep',
+            type=float,
+            default=5.0,
+            help='Délai d\'attente (secondes) quand la file est vide'
+        )
+        parser.add_argument(
+            '--worker-id',
+            type=str,
+            help='Identifiant du worker (par défaut: hôte:pid)'
+        )
+        parser.add_argument(
+            '--enqueue',
+            type=int,
+            metavar='VIDEO_ID',
+            help='Ajoute la vidéo indiquée à la file puis s\'arrête'
+        )
+        parser.add_argument(
+            '--restart-from',
+            type=str,
+            metavar='STAGE',
+            help='Avec --enqueue : refait cette étape et les suivantes (download, probe, subtitles, ocr, audio_extract, vad, asr, llm_correction, categorization)'
+        )
+
+    def handle(self, *args, **options):
+        if options.get('enqueue'):
+            self._enqueue(options['enqueue'], options.get('restart_from'))
+            return
+
+        # Import tardif : charge les modèles OCR/audio uniquement dans le worker
+        from uploader.pipeline import process_video, shutdown_branch_executor
+        from uploader.ocr_utils import shutdown_ocr_executor
+
+        worker_id = options.get('worker_id') or default_worker_id()
+        once = options.get('once', False)
+        max_jobs = options.get('max_jobs', 0)
+        sleep = options.get('sleep', 5.0)
+
+        self._stop = False
+        signal.signal(signal.SIGTERM, self._request_stop)
+        signal.signal(signal.SIGINT, self._request_stop)
+
+        self.stdout.write(
+            self.style.SUCCESS(f'🚀 Worker {worker_id} démarré')
+        )
+
+        processed = 0
+        while not self._stop:
+            close_old_connections()
+            job = claim_next_job(worker_id)
+
+            if job is None:
+                if once:
+                    break
+                time.sleep(sleep)
+                continue
+
+            video = job.video
+            self.stdout.write(f'Traitement: {video.title} (tâche #{job.pk}, tentative {job.attempts}/{job.max_attempts})...')
+            started = time.monotonic()
+
+            try:
+                # Verrou rafraîchi pendant tout le traitement, même pour une vidéo de plusieurs heures
+                with JobHeartbeat(job):
+                    process_video(video)
+            except Exception as e:
+                logger.exception(f"Erreur traitement vidéo {video.pk}")
+                retry = fail_job(job, e)
+                self.stdout.write(
+                    self.style.ERROR(f'  💥 Erreur pour {video.title}: {e}' + (' (nouvel essai prévu)' if retry else ''))
+                )
+            else:
+                if complete_job(job):
+                    self.stdout.write(
+                        self.style.SUCCESS(f'  ✅ {video.title} traitée en {time.monotonic() - started:.1f}s')
+                    )
+                else:
+                    self.stdout.write(
+                        self.style.WARNING(f'  ⚠️ {video.title} reprise par un autre worker, résultat ignoré')
+                    )
+
+            processed += 1
+            if max_jobs and processed >= max_jobs:
+                break
+
+        shutdown_branch_executor()
+        shutdown_ocr_executor()
+        self.stdout.write(f'Worker {worker_id} arrêté après {processed} tâche(s)')
+
+    def _request_stop(self, signum, frame):
+        """Termine la tâche en cours puis arrête le worker."""
+        self.stdout.write(
+            self.style.WARNING('Arrêt demandé, fin de la tâche en cours...')
+        )
+        self._stop = True
+
+    def _enqueue(self, video_id, restart_from=None):
+        try:
+            video = Video.objects.get(id=video_id)
+        except Video.DoesNotExist:
+            self.stdout.write(
+                self.style.ERROR(f'Vidéo avec ID {video_id} introuvable')
+            )
+            return
+
+        if restart_from:
+            from uploader.pipeline import reset_stages
+            try:
+                reset_stages(video, restart_from)
+            except ValueError as e:
+                self.stdout.write(self.style.ERROR(str(e)))
+                return
+
+        job = enqueue_video(video)
+        self.stdout.write(
+            self.style.SUCCESS(f'Vidéo "{video.title}" en file d\'attente (tâche #{job.pk})')
+        )
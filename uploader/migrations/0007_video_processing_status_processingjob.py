@@ -0,0 +1,56 @@
+# Generated by Django 5.2.1 on 2026-10-17 05:54
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('uploader', '0006_video_has_speech_video_speech_metadata'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProcessingJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pending', 'En attente'), ('running', 'En cours'), ('done', 'Terminée'), ('failed', 'Échec')], default='pending', max_length=20)),
+                ('attempts', models.PositiveIntegerField(default=0, help_text='Nombre de tentatives déjà effectuées')),
+                ('max_attempts', models.PositiveIntegerField(default=3, help_text='Nombre maximal de tentatives avant échec définitif')),
+                ('run_after', models.DateTimeField(default=django.utils.timezone.now, help_text='La tâche ne sera pas réclamée avant cette date')),
+                ('locked_by', models.CharField(blank=True, help_text='Identifiant du worker qui traite la tâche', max_length=255)),
+                ('locked_at', models.DateTimeField(blank=True, null=True)),
+                ('last_error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['created_at'],
+            },
+        ),
+        migrations.AddField(
+            model_name='video',
+            name='processing_status',
+            field=models.CharField(choices=[('pending', 'En attente'), ('processing', 'En cours'), ('done', 'Terminé'), ('failed', 'Échec')], default='pending', help_text='État du traitement en arrière-plan (OCR, audio, IA)', max_length=20),
+        ),
+        # Les vidéos existantes ont déjà été traitées de manière synchrone
+        migrations.RunSQL(
+            "UPDATE uploader_video SET processing_status = 'done';",
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        migrations.AddIndex(
+            model_name='video',
+            index=models.Index(fields=['processing_status'], name='uploader_vi_process_a57bae_idx'),
+        ),
+        migrations.AddField(
+            model_name='processingjob',
+            name='video',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='jobs', to='uploader.video'),
+        ),
+        migrations.AddIndex(
+            model_name='processingjob',
+            index=models.Index(fields=['status', 'run_after'], name='uploader_pr_status_d5f066_idx'),
+        ),
+    ]
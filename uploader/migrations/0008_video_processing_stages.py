@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-17 05:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('uploader', '0007_video_processing_status_processingjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='video',
+            name='processing_stages',
+            field=models.JSONField(blank=True, default=dict, help_text='État, durée et erreur de chaque étape du pipeline'),
+        ),
+    ]
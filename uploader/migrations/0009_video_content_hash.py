@@ -0,0 +1,22 @@
+# Generated by Django 5.2.1 on 2026-10-17 05:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('uploader', '0008_video_processing_stages'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='video',
+            name='content_hash',
+            field=models.CharField(blank=True, help_text='Empreinte SHA-256 du fichier vidéo', max_length=64),
+        ),
+        migrations.AddIndex(
+            model_name='video',
+            index=models.Index(fields=['content_hash'], name='uploader_vi_content_c5439a_idx'),
+        ),
+    ]
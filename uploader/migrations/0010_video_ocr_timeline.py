@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-17 06:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('uploader', '0009_video_content_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='video',
+            name='ocr_timeline',
+            field=models.JSONField(blank=True, default=list, help_text='Texte OCR horodaté : [t, x, y, w, h, texte, confiance] par zone de texte'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-17 06:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('uploader', '0010_video_ocr_timeline'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='video',
+            name='media_metadata',
+            field=models.JSONField(blank=True, default=dict, help_text='Métadonnées ffprobe : durée, flux vidéo, audio et sous-titres'),
+        ),
+    ]
@@ -1,5 +1,6 @@
 from django.db import models
-from .ocr_utils import extract_text_from_video_file
+from django.utils import timezone
+import copy
 import json
 import os
 import tempfile
@@ -7,18 +8,24 @@ import requests
 from django.core.files.storage import default_storage
 from django.core.files.base import ContentFile
 
-# Import des modules de transcription audio
-import sys
-sys.path.append('/Users/jesseelorddushime/Documents/Projects/MediaManager')
-from video_utils import extract_audio
-from speech_transcriber import transcribe
-
 # Create your models here.
 
 class Video(models.Model):
+    STATUS_PENDING = 'pending'
+    STATUS_PROCESSING = 'processing'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    PROCESSING_STATUS_CHOICES = [
+        (STATUS_PENDING, 'En attente'),
+        (STATUS_PROCESSING, 'En cours'),
+        (STATUS_DONE, 'Terminé'),
+        (STATUS_FAILED, 'Échec'),
+    ]
+
     title = models.CharField(max_length=100)
     file = models.FileField(upload_to='videos/')
     extracted_text = models.TextField(blank=True, help_text="Texte extrait automatiquement par OCR")
+    ocr_timeline = models.JSONField(default=list, blank=True, help_text="Texte OCR horodaté : [t, x, y, w, h, texte, confiance] par zone de texte")
     corrected_text = models.TextField(blank=True, help_text="Texte OCR corrigé par IA")
     audio_transcription = models.TextField(blank=True, default='', help_text="Transcription automatique de l'audio parlé")
     corrected_audio_transcription = models.TextField(blank=True, default='', help_text="Transcription audio corrigée par IA")
@@ -28,6 +35,10 @@ class Video(models.Model):
     category = models.CharField(max_length=100, blank=True, help_text="Catégorie principale")
     subcategory = models.CharField(max_length=100, blank=True, help_text="Sous-catégorie")
     analysis_metadata = models.JSONField(default=dict, blank=True, help_text="Métadonnées d'analyse IA")
+    processing_status = models.CharField(max_length=20, choices=PROCESSING_STATUS_CHOICES, default=STATUS_PENDING, help_text="État du traitement en arrière-plan (OCR, audio, IA)")
+    processing_stages = models.JSONField(default=dict, blank=True, help_text="État, durée et erreur de chaque étape du pipeline")
+    media_metadata = models.JSONField(default=dict, blank=True, help_text="Métadonnées ffprobe : durée, flux vidéo, audio et sous-titres")
+    content_hash = models.CharField(max_length=64, blank=True, help_text="Empreinte SHA-256 du fichier vidéo")
     uploaded_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
@@ -36,8 +47,26 @@ class Video(models.Model):
             models.Index(fields=['category']),
             models.Index(fields=['subcategory']),
             models.Index(fields=['-uploaded_at']),
+            models.Index(fields=['processing_status']),
+            models.Index(fields=['content_hash']),
         ]
 
+    # Résultats d'analyse recopiés depuis une vidéo identique déjà traitée
+    REUSABLE_ANALYSIS_FIELDS = [
+        'extracted_text',
+        'ocr_timeline',
+        'corrected_text',
+        'audio_transcription',
+        'corrected_audio_transcription',
+        'has_speech',
+        'speech_metadata',
+        'keywords',
+        'category',
+        'subcategory',
+        'analysis_metadata',
+        'media_metadata',
+    ]
+
     def __str__(self):
         return self.title
 
@@ -59,96 +88,101 @@ class Video(models.Model):
         if not hasattr(self, 'speech_metadata') or self.speech_metadata is None:
             self.speech_metadata = {}
         
+        # Empreinte du contenu (calculée pendant l'upload par HashingUploadHandlerMixin)
+        if is_new and self.file and not self.content_hash:
+            self.content_hash = self._get_content_hash()
+        
+        # Même contenu déjà analysé : reprendre ses résultats au lieu de tout retraiter
+        duplicate = self.find_analyzed_duplicate() if is_new and self.file else None
+        blob_shared = False
+        if duplicate:
+            from django.conf import settings
+            print(f"♻️ Contenu identique à la vidéo #{duplicate.pk}, réutilisation de son analyse")
+            self.copy_analysis_from(duplicate)
+            if settings.DEDUPLICATE_UPLOAD_BLOBS and duplicate.file:
+                # Pointer vers le fichier déjà stocké au lieu d'en uploader une copie
+                self.file = duplicate.file.name
+                blob_shared = True
+        
         # Sauvegarder d'abord l'objet (Django gère automatiquement l'upload vers GCS)
         super().save(*args, **kwargs)
         
         # Si c'est un nouveau fichier, vérifier et forcer l'upload GCS si nécessaire
-        if is_new and self.file:
+        if is_new and self.file and not blob_shared:
             self._ensure_file_on_gcs()
         
-        # Après sauvegarde, faire l'extraction OCR et transcription audio si c'est un nouvel objet
-        if is_new and self.file:
-            try:
-                # Extraction OCR avec le fichier uploadé
-                extracted_text = extract_text_from_video_file(self.file)
-                
-                if extracted_text:
-                    self.extracted_text = extracted_text
-                
-                # Transcription audio - gérer les fichiers GCS et locaux
-                try:
-                    video_path = self._get_video_file_path()
-                    print(f"Extraction audio pour le fichier vidéo : {video_path}")
-                    
-                    # Extraire l'audio
-                    audio_path = extract_audio(video_path)
-                    
-                    if audio_path:
-                        # Détecter d'abord si il y a de la parole
-                        from voice_detection import has_speech
-                        speech_detected, speech_meta = has_speech(audio_path)
-                        
-                        print(f"🎙️ Détection vocale: {'Parole détectée' if speech_detected else 'Aucune parole'}")
-                        
-                        # Stocker les métadonnées de détection vocale
-                        self.has_speech = speech_detected
-                        self.speech_metadata = speech_meta
-                        
-                        if speech_detected:
-                            # Transcrire seulement si parole détectée
-                            transcription = transcribe(audio_path)
-                            if transcription:
-                                self.audio_transcription = transcription
-                                print(f"Transcription réussie : {transcription[:100]}...")
-                            else:
-                                self.audio_transcription = ""
-                        else:
-                            # Pas de parole détectée, pas de transcription
-                            self.audio_transcription = ""
-                            print(f"🚫 Transcription ignorée : aucune parole détectée")
-                        
-                        # Nettoyer le fichier audio temporaire
-                        os.remove(audio_path)
-                        print(f"Fichier audio temporaire supprimé : {audio_path}")
-                    
-                    # Nettoyer le fichier vidéo temporaire si il existe
-                    self._cleanup_temp_file()
-                    
-                except Exception as e:
-                    print(f"Erreur lors de la transcription audio pour {self.title}: {e}")
-                    self.audio_transcription = ""
-                    self.has_speech = False
-                    self.speech_metadata = {'error': str(e)}
-                    # Nettoyer le fichier vidéo temporaire même en cas d'erreur
-                    self._cleanup_temp_file()
-                
-                # Analyse IA si pas déjà fait
-                if not self.corrected_text:
-                    self.analyze_with_ai()
-                
-                # Mise à jour avec les nouvelles données (sans déclencher save() récursif)
-                Video.objects.filter(pk=self.pk).update(
-                    extracted_text=self.extracted_text,
-                    corrected_text=self.corrected_text,
-                    audio_transcription=self.audio_transcription,
-                    corrected_audio_transcription=self.corrected_audio_transcription,
-                    has_speech=self.has_speech,
-                    speech_metadata=self.speech_metadata,
-                    keywords=self.keywords,
-                    category=self.category,
-                    subcategory=self.subcategory,
-                    analysis_metadata=self.analysis_metadata
-                )
-                
-                # Nettoyer le fichier local après traitement si on utilise GCS
-                self._cleanup_local_file_if_on_gcs()
-                
-            except Exception as e:
-                # En cas d'erreur OCR, garder l'objet sans texte
-                print(f"Erreur OCR pour {self.title}: {e}")
-                # Nettoyer quand même le fichier local
-                self._cleanup_local_file_if_on_gcs()
-                pass
+        # Si c'est un nouveau fichier, mettre le traitement en file d'attente
+        # (OCR, audio, IA) : il sera exécuté par un worker `process_videos`
+        if is_new and self.file and not duplicate:
+            from .jobs import enqueue_video
+            enqueue_video(self)
+
+    def _get_content_hash(self):
+        """Retourne le SHA-256 du fichier, calculé à l'upload ou en relisant le fichier."""
+        from .upload_handlers import compute_content_hash
+        
+        uploaded_file = getattr(self.file, '_file', None)
+        content_hash = getattr(uploaded_file, 'content_hash', None)
+        if content_hash:
+            return content_hash
+        
+        try:
+            content_hash = compute_content_hash(self.file)
+            self.file.seek(0)
+            return content_hash
+        except Exception as e:
+            print(f"⚠️ Impossible de calculer l'empreinte du fichier: {e}")
+            return ''
+
+    def find_analyzed_duplicate(self):
+        """Retourne une autre vidéo de même contenu dont le traitement est terminé."""
+        if not self.content_hash:
+            return None
+        return (
+            Video.objects
+            .filter(content_hash=self.content_hash, processing_status=Video.STATUS_DONE)
+            .exclude(pk=self.pk)
+            .order_by('uploaded_at')
+            .first()
+        )
+
+    def copy_analysis_from(self, source):
+        """Recopie les résultats d'analyse d'une vidéo de même contenu."""
+        for field in self.REUSABLE_ANALYSIS_FIELDS:
+            setattr(self, field, copy.deepcopy(getattr(source, field)))
+        
+        self.processing_stages = {
+            name: {**state, 'reused_from': source.pk}
+            for name, state in (source.processing_stages or {}).items()
+        }
+        self.processing_status = Video.STATUS_DONE
+
+    def timeline_entries(self):
+        """Chronologie OCR sous forme de dictionnaires (affichage dans les templates)."""
+        entries = []
+        for t, x, y, w, h, text, confidence in self.ocr_timeline or []:
+            entries.append({
+                'time': t,
+                'label': f"{int(t) // 60}:{int(t) % 60:02d}",
+                'box': (x, y, w, h),
+                'text': text,
+                'confidence': confidence,
+            })
+        return entries
+
+    def find_in_timeline(self, query):
+        """Premier instant (secondes) où le texte OCR contient `query`, ou None."""
+        query = query.lower()
+        for entry in self.ocr_timeline or []:
+            if query in entry[5].lower():
+                return entry[0]
+        return None
+
+    def file_is_shared(self):
+        """Indique si le fichier stocké est aussi utilisé par une autre vidéo (déduplication)."""
+        if not self.file:
+            return False
+        return Video.objects.filter(file=self.file.name).exclude(pk=self.pk).exists()
 
     def _ensure_file_on_gcs(self):
         """S'assure que le fichier est bien uploadé sur Google Cloud Storage."""
@@ -211,107 +245,11 @@ class Video(models.Model):
             print(f"❌ Erreur upload manuel GCS: {e}")
             # Ne pas lever d'exception, continuer avec le fichier local
 
-    def _get_video_file_path(self):
-        """
-        Obtient le chemin du fichier vidéo, gérant à la fois le stockage local et GCS.
-        Télécharge temporairement le fichier si nécessaire.
-        """
-        from django.conf import settings
-        from django.core.files.storage import default_storage
-        
-        try:
-            # Si on utilise le stockage local, utiliser le chemin direct
-            if hasattr(self.file, 'path'):
-                return self.file.path
-        except (NotImplementedError, AttributeError):
-            # Le fichier est sur GCS, on doit le télécharger temporairement
-            pass
-        
-        # Téléchargement temporaire depuis GCS
-        import tempfile
-        import requests
-        
-        try:
-            # Créer un fichier temporaire
-            temp_fd, temp_path = tempfile.mkstemp(suffix='.mp4')
-            os.close(temp_fd)  # Fermer le descripteur de fichier
-            
-            # Télécharger le fichier depuis GCS
-            file_url = self.file.url
-            print(f"Téléchargement temporaire depuis : {file_url}")
-            
-            response = requests.get(file_url, stream=True)
-            response.raise_for_status()
-            
-            # Écrire le contenu dans le fichier temporaire
-            with open(temp_path, 'wb') as temp_file:
-                for chunk in response.iter_content(chunk_size=8192):
-                    temp_file.write(chunk)
-            
-            print(f"Fichier temporaire créé : {temp_path}")
-            
-            # Stocker le chemin temporaire pour nettoyage ultérieur
-            self._temp_video_path = temp_path
-            
-            return temp_path
-            
-        except Exception as e:
-            print(f"Erreur téléchargement fichier GCS : {e}")
-            # Fallback : utiliser l'URL directement (peut ne pas marcher avec ffmpeg)
-            return self.file.url
-
-    def _cleanup_temp_file(self):
-        """Nettoie le fichier temporaire si il existe."""
-        if hasattr(self, '_temp_video_path') and os.path.exists(self._temp_video_path):
-            try:
-                os.remove(self._temp_video_path)
-                print(f"Fichier vidéo temporaire supprimé : {self._temp_video_path}")
-                delattr(self, '_temp_video_path')
-            except OSError as e:
-                print(f"Erreur suppression fichier temporaire : {e}")
-
     def analyze_with_ai(self):
         """Analyse le texte avec OpenAI pour correction, catégorisation et extraction de mots-clés."""
-        from .ai_analyzer import AITextAnalyzer
-        
         try:
-            analyzer = AITextAnalyzer()
-            
-            # 1. Correction OCR séparée
-            if self.extracted_text:
-                print("🔧 Correction OCR avec IA...")
-                ocr_result = analyzer.analyze_text(self.extracted_text, self.title)
-                if ocr_result:
-                    self.corrected_text = ocr_result.get('corrected_text', 'N/A')
-                else:
-                    self.corrected_text = 'N/A'
-            else:
-                self.corrected_text = 'N/A'
-            
-            # 2. Correction audio séparée
-            if self.audio_transcription:
-                print("🎤 Correction transcription audio avec IA...")
-                audio_result = analyzer.analyze_text(self.audio_transcription, self.title)
-                if audio_result:
-                    self.corrected_audio_transcription = audio_result.get('corrected_text', 'N/A')
-                else:
-                    self.corrected_audio_transcription = 'N/A'
-            else:
-                self.corrected_audio_transcription = 'N/A'
-            
-            # 3. Analyse combinée pour catégorisation et mots-clés
-            print("🧠 Analyse combinée pour catégorisation...")
-            combined_result = analyzer.analyze_combined_content(
-                self.corrected_text if self.corrected_text != 'N/A' else '',
-                self.corrected_audio_transcription if self.corrected_audio_transcription != 'N/A' else '',
-                self.title
-            )
-            
-            if combined_result:
-                self.keywords = combined_result.get('keywords', [])
-                self.category = combined_result.get('category', '')
-                self.subcategory = combined_result.get('subcategory', '')
-                self.analysis_metadata = combined_result.get('metadata', {})
+            self.correct_with_ai()
+            self.categorize_with_ai()
                 
         except Exception as e:
             # En cas d'erreur, on garde les textes originaux avec marqueurs N/A
@@ -322,6 +260,60 @@ class Video(models.Model):
                 self.corrected_audio_transcription = self.audio_transcription if self.audio_transcription else 'N/A'
             self.analysis_metadata = {'error': str(e)}
 
+    def correct_with_ai(self, analyzer=None):
+        """
+        Corrige le texte OCR et la transcription audio avec OpenAI.
+        Lève une exception si l'analyseur IA n'est pas disponible.
+        """
+        from .ai_analyzer import AITextAnalyzer
+        
+        analyzer = analyzer or AITextAnalyzer()
+        
+        # 1. Correction OCR séparée
+        if self.extracted_text:
+            print("🔧 Correction OCR avec IA...")
+            ocr_result = analyzer.analyze_text(self.extracted_text, self.title)
+            if ocr_result:
+                self.corrected_text = ocr_result.get('corrected_text', 'N/A')
+            else:
+                self.corrected_text = 'N/A'
+        else:
+            self.corrected_text = 'N/A'
+        
+        # 2. Correction audio séparée
+        if self.audio_transcription:
+            print("🎤 Correction transcription audio avec IA...")
+            audio_result = analyzer.analyze_text(self.audio_transcription, self.title)
+            if audio_result:
+                self.corrected_audio_transcription = audio_result.get('corrected_text', 'N/A')
+            else:
+                self.corrected_audio_transcription = 'N/A'
+        else:
+            self.corrected_audio_transcription = 'N/A'
+
+    def categorize_with_ai(self, analyzer=None):
+        """
+        Analyse combinée des textes corrigés pour catégorisation et mots-clés.
+        Lève une exception si l'analyseur IA n'est pas disponible.
+        """
+        from .ai_analyzer import AITextAnalyzer
+        
+        analyzer = analyzer or AITextAnalyzer()
+        
+        # 3. Analyse combinée pour catégorisation et mots-clés
+        print("🧠 Analyse combinée pour catégorisation...")
+        combined_result = analyzer.analyze_combined_content(
+            self.corrected_text if self.corrected_text != 'N/A' else '',
+            self.corrected_audio_transcription if self.corrected_audio_transcription != 'N/A' else '',
+            self.title
+        )
+        
+        if combined_result:
+            self.keywords = combined_result.get('keywords', [])
+            self.category = combined_result.get('category', '')
+            self.subcategory = combined_result.get('subcategory', '')
+            self.analysis_metadata = combined_result.get('metadata', {})
+
     def get_keywords_display(self):
         """Retourne les mots-clés sous forme de chaîne pour l'affichage."""
         if isinstance(self.keywords, list):
@@ -381,8 +373,8 @@ class Video(models.Model):
         Suppression personnalisée pour s'assurer que le fichier sur GCS est aussi supprimé.
         """
         try:
-            # Supprimer le fichier physique (local ou GCS)
-            if self.file:
+            # Supprimer le fichier physique (local ou GCS), sauf s'il est partagé
+            if self.file and not self.file_is_shared():
                 try:
                     # Essayer la suppression standard Django
                     self.file.delete(save=False)
@@ -428,3 +420,41 @@ class Video(models.Model):
         except Exception as e:
             print(f"❌ Erreur suppression manuelle GCS: {e}")
             raise
+
+
+class ProcessingJob(models.Model):
+    """
+    Tâche de traitement d'une vidéo (OCR, audio, IA) stockée en base.
+    Les workers `process_videos` réclament les tâches avec SELECT ... FOR UPDATE SKIP LOCKED,
+    ce qui permet d'en lancer plusieurs, sur plusieurs machines, sans double traitement.
+    """
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'En attente'),
+        (STATUS_RUNNING, 'En cours'),
+        (STATUS_DONE, 'Terminée'),
+        (STATUS_FAILED, 'Échec'),
+    ]
+
+    video = models.ForeignKey(Video, on_delete=models.CASCADE, related_name='jobs')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.PositiveIntegerField(default=0, help_text="Nombre de tentatives déjà effectuées")
+    max_attempts = models.PositiveIntegerField(default=3, help_text="Nombre maximal de tentatives avant échec définitif")
+    run_after = models.DateTimeField(default=timezone.now, help_text="La tâche ne sera pas réclamée avant cette date")
+    locked_by = models.CharField(max_length=255, blank=True, help_text="Identifiant du worker qui traite la tâche")
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['status', 'run_after']),
+        ]
+
+    def __str__(self):
+        return f"Job #{self.pk} - {self.video} ({self.status})"
@@ -1,10 +1,18 @@
 import cv2
+import numpy as np
 import pytesseract
-import tempfile
-import os
 import logging
+import multiprocessing
 import re
+import difflib
+import shutil
 import string
+import bisect
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+
+import ffmpeg
 
 logger = logging.getLogger(__name__)
 
@@ -18,6 +26,28 @@ except ImportError:
     EASYOCR_AVAILABLE = False
     _easyocr_reader = None
 
+# Import tesserocr (Tesseract en processus, sans sous-processus par image) avec gestion d'erreur
+try:
+    import tesserocr
+    TESSEROCR_AVAILABLE = True
+except ImportError:
+    TESSEROCR_AVAILABLE = False
+
+# Moteur Tesseract du processus : 'auto' (tesserocr si disponible), 'tesserocr' ou 'pytesseract'
+_tesseract_backend = 'auto'
+_tesseract_engine = None
+
+# Caractères autorisés pour le preprocessing agressif
+AGGRESSIVE_WHITELIST = 'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789'
+
+# Modes de segmentation Tesseract limités à une ligne, un mot ou un caractère
+SINGLE_LINE_PSMS = (7, 8, 10, 13)
+
+# Pool de processus pour les méthodes Tesseract (créé au premier usage)
+_ocr_executor = None
+_ocr_executor_workers = 0
+_ocr_executor_backend = None
+
 def get_easyocr_reader():
     """Obtient l'instance EasyOCR reader (cache global)."""
     global _easyocr_reader
@@ -25,79 +55,213 @@ def get_easyocr_reader():
         _easyocr_reader = easyocr.Reader(['en'], gpu=False)
     return _easyocr_reader
 
-def extract_text_from_video_file(file_field):
+class PytesseractEngine:
+    """Tesseract en ligne de commande : une image temporaire et un processus par appel."""
+    name = 'pytesseract'
+    
+    def image_to_string(self, image, psm, whitelist=None):
+        config = f'--oem 3 --psm {psm}'
+        if whitelist:
+            config += f' -c tessedit_char_whitelist={whitelist}'
+        return pytesseract.image_to_string(image, lang='eng', config=config)
+    
+    def images_to_strings(self, images, psm, whitelist=None):
+        """
+        Un seul processus tesseract pour toutes les images : elles sont empilées
+        verticalement (voir stack_images), puis chaque mot reconnu est rendu à
+        l'image qui contient son centre. Les modes ligne ou mot (psm 7, 8, 10, 13)
+        ne savent pas lire une pile : chaque image est alors lue séparément, avec
+        le mode demandé.
+        """
+        if len(images) < 2 or psm in SINGLE_LINE_PSMS:
+            return [self.image_to_string(image, psm, whitelist) for image in images]
+        
+        stacked, offsets = stack_images(images)
+        config = f'--oem 3 --psm {psm}'
+        if whitelist:
+            config += f' -c tessedit_char_whitelist={whitelist}'
+        data = pytesseract.image_to_data(stacked, lang='eng', config=config, output_type=pytesseract.Output.DICT)
+        return split_stacked_words(data, offsets)
+
+class TesserocrEngine:
+    """
+    Tesseract en processus via tesserocr : un moteur initialisé par mode de
+    segmentation (psm), réutilisé pour toutes les images du processus.
     """
-    Extrait le texte d'un fichier vidéo avec approche hybride EasyOCR + Tesseract.
+    name = 'tesserocr'
     
-    Args:
-        file_field: Django FileField contenant le fichier vidéo
+    def __init__(self):
+        self._apis = {}
+    
+    def _api(self, psm):
+        api = self._apis.get(psm)
+        if api is None:
+            api = tesserocr.PyTessBaseAPI(lang='eng', psm=psm, oem=tesserocr.OEM.DEFAULT)
+            self._apis[psm] = api
+        return api
+    
+    def image_to_string(self, image, psm, whitelist=None):
+        api = self._api(psm)
+        api.SetVariable('tessedit_char_whitelist', whitelist or '')
         
+        # Pixels transmis directement, sans encodage ni fichier temporaire
+        image = np.ascontiguousarray(image)
+        h, w = image.shape[:2]
+        bytes_per_pixel = 1 if image.ndim == 2 else image.shape[2]
+        api.SetImageBytes(image.tobytes(), w, h, bytes_per_pixel, w * bytes_per_pixel)
+        return api.GetUTF8Text()
+    
+    def images_to_strings(self, images, psm, whitelist=None):
+        # En processus, un appel par image ne coûte pas de processus supplémentaire
+        return [self.image_to_string(image, psm, whitelist) for image in images]
+
+def stack_images(images, gap=32):
+    """
+    Empile des images en niveaux de gris (binarisées) dans une seule image.
+    
+    Chaque image est entourée d'une marge de `gap` / 2 pixels de sa propre
+    couleur de fond (valeur médiane) : les zones restent séparées sans qu'un
+    bord artificiel ne soit lu comme un caractère.
+    
     Returns:
-        str: Texte extrait de la vidéo, ou chaîne vide si échec
+        Tuple (image empilée, ordonnée du haut de chaque image dans la pile)
     """
-    if not file_field:
-        return ""
+    margin = gap // 2
+    width = max(image.shape[1] for image in images) + 2 * margin
+    blocks = []
+    offsets = []
+    top = 0
+    for image in images:
+        h, w = image.shape[:2]
+        block = np.full((h + 2 * margin, width), np.median(image), dtype=np.uint8)
+        block[margin:margin + h, margin:margin + w] = image
+        blocks.append(block)
+        offsets.append(top)
+        top += block.shape[0]
+    return np.vstack(blocks), offsets
+
+def split_stacked_words(data, offsets):
+    """
+    Répartit les mots de pytesseract.image_to_data (pile de stack_images)
+    entre les images d'origine : un texte par image, une ligne par ligne reconnue.
+    """
+    lines = [{} for _ in offsets]
+    for i, word in enumerate(data['text']):
+        word = word.strip()
+        if not word:
+            continue
+        center = data['top'][i] + data['height'][i] / 2
+        owner = max(0, bisect.bisect_right(offsets, center) - 1)
+        key = (data['block_num'][i], data['par_num'][i], data['line_num'][i])
+        lines[owner].setdefault(key, []).append(word)
+    return ['\n'.join(' '.join(words) for words in owner_lines.values()) for owner_lines in lines]
+
+def create_tesseract_engine(backend='auto'):
+    """
+    Crée le moteur Tesseract demandé ; pytesseract sert de repli si tesserocr
+    n'est pas installé ou ne trouve pas ses données (TESSDATA_PREFIX).
+    """
+    if backend in ('auto', 'tesserocr'):
+        if TESSEROCR_AVAILABLE:
+            try:
+                engine = TesserocrEngine()
+                engine._api(6)
+                return engine
+            except Exception as e:
+                logger.warning(f"Initialisation tesserocr impossible, repli sur pytesseract: {e}")
+        elif backend == 'tesserocr':
+            logger.warning("tesserocr n'est pas installé, repli sur pytesseract")
+    return PytesseractEngine()
+
+def set_tesseract_backend(backend):
+    """Choisit le moteur Tesseract du processus (recréé au prochain usage si modifié)."""
+    global _tesseract_backend, _tesseract_engine
+    if backend != _tesseract_backend:
+        _tesseract_backend = backend
+        _tesseract_engine = None
+
+def get_tesseract_engine():
+    """Obtient le moteur Tesseract du processus (cache global)."""
+    global _tesseract_engine
+    if _tesseract_engine is None:
+        _tesseract_engine = create_tesseract_engine(_tesseract_backend)
+    return _tesseract_engine
+
+def extract_text_details(video_path, name=None, detect_regions=True, workers=0,
+                         cascade=False, frame_threshold=0.8, video_threshold=0.9,
+                         easyocr_batch_size=8, easyocr_workers=0, tesseract_backend='auto',
+                         dedupe=True, frame_source='auto', mode='frames', subtitle_interval=0.5,
+                         media=None):
+    """
+    Extrait le texte d'un fichier vidéo et décrit le travail OCR effectué.
     
-    tmp_path = None
+    Args:
+        video_path: Chemin local du fichier vidéo (ou URL avec la source ffmpeg)
+        name: Nom du fichier pour les logs (par défaut le chemin)
+        detect_regions: OCR uniquement sur les zones de texte détectées
+                        (image entière si aucune zone n'est trouvée)
+        workers: Nombre de processus pour les méthodes Tesseract (0 ou 1 = séquentiel)
+        cascade: Méthode la moins coûteuse d'abord, arrêt dès que la confiance suffit
+        frame_threshold: Confiance arrêtant la cascade pour une frame
+        video_threshold: Confiance arrêtant la cascade pour toute la vidéo
+        easyocr_batch_size: Taille des lots d'images envoyés à EasyOCR
+        easyocr_workers: Workers du chargeur de données EasyOCR (0 = aucun)
+        tesseract_backend: 'auto', 'tesserocr' (en processus) ou 'pytesseract'
+        dedupe: Écarter les frames et zones quasi identiques (dHash) déjà lues
+        frame_source: 'ffmpeg' (frames échantillonnées, réduites et en niveaux de gris
+                      lues sur un pipe), 'opencv' ou 'auto' (ffmpeg si installé)
+        mode: 'frames' (frames distinctes de toute la vidéo) ou 'subtitles' (bande des
+              sous-titres incrustés lue toutes les `subtitle_interval` secondes, voir
+              extract_subtitle_details ; mode 'frames' si aucune bande n'est détectée)
+        subtitle_interval: Intervalle d'échantillonnage des sous-titres, en secondes
+        media: Métadonnées ffprobe déjà connues (video_utils.probe_media) : pas de
+               nouvelle analyse, nombre de frames adapté à la durée
+        
+    Returns:
+        dict: {'text': texte extrait (vide si aucun texte), 'confidence': float,
+               'timeline': entrées [t, x, y, w, h, texte, confiance] (voir build_ocr_timeline),
+               'stats': frames traitées, méthodes exécutées et ignorées}
+    """
+    name = name or video_path
+    details = {'text': "", 'confidence': 0, 'timeline': [], 'stats': {}}
+    set_tesseract_backend(tesseract_backend)
     try:
-        # Créer un fichier temporaire pour la vidéo
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.mp4') as tmp:
-            for chunk in file_field.chunks():
-                tmp.write(chunk)
-            tmp_path = tmp.name
-
-        # Ouvrir la vidéo avec OpenCV
-        cap = cv2.VideoCapture(tmp_path)
+        if mode == 'subtitles':
+            subtitles = extract_subtitle_details(video_path, name, frame_source, subtitle_interval,
+                                                 workers=workers, frame_threshold=frame_threshold,
+                                                 easyocr_batch_size=easyocr_batch_size,
+                                                 easyocr_workers=easyocr_workers, media=media)
+            if subtitles is not None:
+                return subtitles
         
-        if not cap.isOpened():
-            logger.warning(f"Impossible d'ouvrir le fichier vidéo: {file_field.name}")
-            return ""
+        # Parcourir toute la vidéo en basse résolution et garder des frames distinctes
+        indexed_frames, fps, box_scale = load_text_frames(video_path, frame_source, name, media)
         
-        # Obtenir les propriétés de la vidéo
-        fps = cap.get(cv2.CAP_PROP_FPS)
-        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        if not indexed_frames:
+            logger.warning(f"Aucune frame utilisable trouvée: {name}")
+            return details
         
-        # Échantillonner plusieurs frames (10 premières secondes max)
-        max_frames_to_check = min(15, int(fps * 10)) if fps > 0 else 15
-        best_frames = sample_best_frames(cap, max_frames_to_check)
+        frame_times = [frame_index / fps for frame_index, _ in indexed_frames]
+        best_frames = [frame for _, frame in indexed_frames]
         
-        cap.release()
+        # Zones de texte à recadrer (vide = image entière)
+        frame_regions = [detect_text_regions(frame) if detect_regions else [] for frame in best_frames]
         
-        if not best_frames:
-            logger.warning(f"Aucune frame utilisable trouvée: {file_field.name}")
-            return ""
+        # Chaque image distincte (frame ou zone) n'est lue qu'une fois
+        dedupe_stats = {}
+        if dedupe:
+            kept, frame_regions, dedupe_stats = deduplicate_images(best_frames, frame_regions)
+            best_frames = [best_frames[k] for k in kept]
+            frame_times = [frame_times[k] for k in kept]
         
         # Tester différentes approches sur les meilleures frames
-        all_results = []
-        
-        for frame in best_frames:
-            # Approche 1: EasyOCR (deep learning)
-            if EASYOCR_AVAILABLE:
-                easyocr_text = extract_with_easyocr(frame)
-                if easyocr_text:
-                    all_results.append({
-                        'text': easyocr_text,
-                        'confidence': calculate_text_confidence(easyocr_text),
-                        'method': 'EasyOCR'
-                    })
-            
-            # Approche 2: Tesseract avec preprocessing optimisé
-            tesseract_text = extract_with_tesseract_enhanced(frame)
-            if tesseract_text:
-                all_results.append({
-                    'text': tesseract_text,
-                    'confidence': calculate_text_confidence(tesseract_text),
-                    'method': 'Tesseract'
-                })
-            
-            # Approche 3: Preprocessing agressif + Tesseract
-            aggressive_text = extract_with_aggressive_preprocessing(frame)
-            if aggressive_text:
-                all_results.append({
-                    'text': aggressive_text,
-                    'confidence': calculate_text_confidence(aggressive_text),
-                    'method': 'Aggressive'
-                })
+        if cascade:
+            all_results, stats = run_ocr_cascade(best_frames, frame_regions, workers,
+                                                 frame_threshold, video_threshold,
+                                                 easyocr_batch_size, easyocr_workers)
+        else:
+            all_results, stats = run_ocr_methods(best_frames, frame_regions, workers,
+                                                 easyocr_batch_size, easyocr_workers)
         
         # Fusionner et choisir le meilleur résultat
         best_text = merge_and_select_best_result(all_results)
@@ -108,52 +272,1087 @@ def extract_text_from_video_file(file_field):
         # Calculer la confiance finale
         final_confidence = calculate_text_confidence(cleaned_text)
         
-        logger.info(f"Texte extrait de {file_field.name}: {len(cleaned_text)} caractères (confiance: {final_confidence:.2f})")
-        return cleaned_text
+        logger.info(f"Texte extrait de {name}: {len(cleaned_text)} caractères (confiance: {final_confidence:.2f})")
+        # Texte de chaque zone, avec l'instant et la position où il apparaît
+        timeline = build_ocr_timeline(all_results, frame_regions, frame_times,
+                                      [frame.shape[:2] for frame in best_frames], box_scale)
+        
+        stats.update(dedupe_stats)
+        details.update({
+            'text': cleaned_text,
+            'confidence': round(final_confidence, 3),
+            'timeline': timeline,
+            'stats': stats,
+        })
+        return details
 
     except Exception as e:
-        logger.error(f"Erreur lors de l'extraction OCR pour {file_field.name}: {str(e)}")
-        return ""
+        # Erreur propagée : l'étape OCR est marquée en échec et la tâche réessayée,
+        # au lieu d'enregistrer un texte vide comme résultat définitif
+        logger.error(f"Erreur lors de l'extraction OCR pour {name}: {str(e)}")
+        raise
+
+def load_text_frames(video_path, frame_source='auto', name=None, media=None, max_height=1080):
+    """
+    Frames à passer à l'OCR (voir select_text_frame_indices), lues par ffmpeg ou OpenCV.
+    
+    `media` : métadonnées ffprobe déjà connues (voir video_utils.probe_media), qui
+    évitent une nouvelle analyse et dimensionnent le nombre de frames (frame_budget).
+    Les frames retenues sont en niveaux de gris, réduites à `max_height` lignes.
+    
+    Returns:
+        Tuple (list[(index, frame)], fps, facteur d'échelle des frames lues vers
+        la résolution d'origine) ; liste vide si la vidéo est illisible
+    """
+    budget = frame_budget((media or {}).get('duration'))
+    if _use_ffmpeg(frame_source):
+        try:
+            return load_text_frames_ffmpeg(video_path, info=(media or {}).get('video'), max_height=max_height,
+                                           budget=budget)
+        except (ffmpeg.Error, OSError, ValueError) as e:
+            if frame_source == 'ffmpeg':
+                raise
+            logger.warning(f"Lecture ffmpeg impossible pour {name or video_path} ({e}), repli sur OpenCV")
     
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        logger.warning(f"Impossible d'ouvrir le fichier vidéo: {name or video_path}")
+        return [], 30, 1.0
+    try:
+        fps = cap.get(cv2.CAP_PROP_FPS) or 30
+        frames = read_frames(cap, select_text_frame_indices(cap, budget=budget))
     finally:
-        # Nettoyer le fichier temporaire
-        if tmp_path and os.path.exists(tmp_path):
-            try:
-                os.remove(tmp_path)
-            except OSError:
-                logger.warning(f"Impossible de supprimer le fichier temporaire: {tmp_path}")
+        cap.release()
+    
+    # Comme avec ffmpeg : frames en niveaux de gris, réduites à `max_height` lignes
+    height = frames[0][1].shape[0] if frames else 0
+    frames = [(frame_index, _thumbnail(frame, max_height)) for frame_index, frame in frames]
+    box_scale = height / frames[0][1].shape[0] if frames else 1.0
+    return frames, fps, box_scale
+
+def frame_budget(duration, base=5, per_minute=1, maximum=15):
+    """
+    Nombre de frames distinctes à lire selon la durée de la vidéo : `base` jusqu'à
+    une minute, puis `per_minute` de plus par minute, sans dépasser `maximum`.
+    """
+    if not duration:
+        return base
+    return int(min(maximum, base + per_minute * (max(0.0, duration - 60) // 60)))
+
+def load_text_frames_ffmpeg(source, info=None, max_height=1080, budget=5, max_scan=300, min_interval=0.5,
+                            seek_threshold=300, thumb_height=180, scene_threshold=0.12, overlay_threshold=0.35):
+    """
+    Comme select_text_frame_indices + read_frames, sans OpenCV ni copie locale.
+    
+    ffmpeg décode la vidéo (chemin local ou URL) et ne sort sur son stdout que les
+    vignettes échantillonnées (filtres select/scale/format), en niveaux de gris ;
+    les frames retenues sont ensuite relues une à une (seek), réduites à
+    `max_height` et en niveaux de gris. Aucune frame BGR pleine résolution n'est
+    convertie ni copiée en Python. `info` : flux vidéo déjà analysé (probe_video_stream).
+    """
+    info = info or probe_video_stream(source)
+    step = _scan_step(info['fps'], info['frames'], min_interval, max_scan)
+    
+    thumbs = ffmpeg_scan_frames(source, info, step, thumb_height, seek=step >= seek_threshold)
+    indices = select_text_thumbnails(thumbs, budget, scene_threshold, overlay_threshold)
+    
+    frames = ffmpeg_read_frames(source, info, indices, max_height)
+    box_scale = info['height'] / frames[0][1].shape[0] if frames else 1.0
+    return frames, info['fps'], box_scale
+
+def ffmpeg_available():
+    """True si l'exécutable ffmpeg est installé."""
+    return shutil.which('ffmpeg') is not None
+
+def _use_ffmpeg(frame_source):
+    return frame_source == 'ffmpeg' or (frame_source == 'auto' and ffmpeg_available())
+
+def probe_video_stream(source):
+    """
+    Caractéristiques du premier flux vidéo (voir video_utils.probe_media) : fps,
+    nombre de frames, largeur et hauteur après rotation.
+    """
+    from video_utils import probe_media
+    media = probe_media(source)
+    if not media or not media['video'] or not media['video']['height']:
+        raise ValueError("Aucun flux vidéo lisible")
+    return media['video']
+
+def ffmpeg_scan_frames(source, info, step, height, crop=None, seek=False):
+    """
+    Génère (index, vignette en niveaux de gris) toutes les `step` frames, décodées par ffmpeg.
+    
+    `crop` (x, y, w, h) : seule cette zone de la frame est extraite, avant réduction.
+    Pas long (`seek`, vidéos longues) : un seek par échantillon coûte moins que de
+    décoder toutes les frames intermédiaires.
+    """
+    filters, width, height = _ffmpeg_gray_filters(info, height, crop)
+    if seek and info['frames'] > 0:
+        for frame_index in range(0, info['frames'], step):
+            frame = _ffmpeg_frame_at(source, info, frame_index, filters, width, height)
+            if frame is None:
+                break
+            yield frame_index, frame
+        return
+    
+    stream = (
+        ffmpeg
+        .input(source)
+        .output('pipe:', format='rawvideo', pix_fmt='gray', an=None, sn=None, vsync='passthrough',
+                vf=f"select=not(mod(n\\,{step})),{filters}")
+    )
+    for k, frame in enumerate(_ffmpeg_raw_frames(stream, width, height)):
+        yield k * step, frame
 
-def sample_best_frames(cap, max_frames):
+def ffmpeg_read_frames(source, info, frame_indices, max_height=1080):
     """
-    Échantillonne les meilleures frames basées sur la netteté.
+    Lit les frames demandées (seek ffmpeg par frame), réduites à `max_height`
+    et en niveaux de gris.
+    
+    Returns:
+        list[(index, frame)] pour les frames lues
     """
+    filters, width, height = _ffmpeg_gray_filters(info, max_height)
     frames = []
-    frame_scores = []
+    for frame_index in frame_indices:
+        frame = _ffmpeg_frame_at(source, info, frame_index, filters, width, height)
+        if frame is not None:
+            frames.append((frame_index, frame))
+    return frames
+
+def _ffmpeg_gray_filters(info, max_height, crop=None):
+    """Filtres ffmpeg (niveaux de gris, recadrage, réduction) et taille des images produites."""
+    x, y, width, height = crop or (0, 0, info['width'], info['height'])
+    filters = "format=gray"
+    if crop:
+        filters += f",crop={width}:{height}:{x}:{y}"
+    width, height = _scaled_size(width, height, max_height)
+    return f"{filters},scale={width}:{height}:flags=area", width, height
+
+def _ffmpeg_frame_at(source, info, frame_index, filters, width, height):
+    """Une frame lue par seek ffmpeg, ou None après la fin de la vidéo."""
+    # Seek exact sur l'instant de la frame (ffmpeg le tronque à la microseconde, donc jamais après)
+    stream = (
+        ffmpeg
+        .input(source, ss=frame_index / info['fps'])
+        .output('pipe:', format='rawvideo', pix_fmt='gray', an=None, sn=None, vframes=1, vf=filters)
+    )
+    return next(_ffmpeg_raw_frames(stream, width, height), None)
+
+def _ffmpeg_raw_frames(stream, width, height):
+    """Génère les frames brutes (uint8, H x W) écrites par ffmpeg sur son stdout."""
+    frame_bytes = width * height
+    process = stream.global_args('-nostdin', '-loglevel', 'error').run_async(pipe_stdout=True)
+    try:
+        while True:
+            buffer = process.stdout.read(frame_bytes)
+            if len(buffer) < frame_bytes:
+                break
+            yield np.frombuffer(buffer, np.uint8).reshape(height, width)
+    finally:
+        # Générateur abandonné avant la fin : inutile de décoder le reste de la vidéo
+        process.stdout.close()
+        if process.poll() is None:
+            process.kill()
+        process.wait()
+
+def _scaled_size(width, height, max_height):
+    if height <= max_height:
+        return width, height
+    return max(1, int(width * max_height / height)), max_height
+
+def extract_subtitle_details(video_path, name=None, frame_source='auto', interval=0.5, max_samples=3600,
+                             workers=0, frame_threshold=0.8, easyocr_batch_size=8, easyocr_workers=0,
+                             chunk_size=32, media=None):
+    """
+    Sous-titres incrustés : la bande où ils s'affichent est détectée une fois pour
+    toute la vidéo (voir detect_subtitle_band), puis seule cette bande est lue et
+    passée à l'OCR, toutes les `interval` secondes.
     
-    for i in range(max_frames):
-        # Échantillonner à différents points dans la vidéo
-        frame_pos = i * 15  # Toutes les 15 frames (~0.5 sec à 30fps)
-        cap.set(cv2.CAP_PROP_POS_FRAMES, frame_pos)
-        
+    Une bande identique à la précédente (même sous-titre) ou sans contraste n'est
+    pas relue ; l'OCR (cascade sans arrêt anticipé vidéo) se fait par lots de
+    `chunk_size` bandes pour borner la mémoire. `media` : voir load_text_frames.
+    
+    Returns:
+        dict comme extract_text_details (une ligne de texte par sous-titre, chronologie
+        des sous-titres), ou None si aucune bande de sous-titres n'est détectée
+    """
+    name = name or video_path
+    use_ffmpeg = _use_ffmpeg(frame_source)
+    info = (media or {}).get('video') or (
+        probe_video_stream(video_path) if use_ffmpeg else _opencv_stream_info(video_path))
+    if not info['width'] or not info['height']:
+        logger.warning(f"Impossible d'ouvrir le fichier vidéo: {name}")
+        return None
+    
+    # Détection de la bande sur des vignettes de toute la vidéo
+    step = _scan_step(info['fps'], info['frames'], 1.0, 120)
+    masks = [text_presence_mask(thumb)
+             for _, thumb in scan_gray_frames(video_path, info, step, use_ffmpeg, height=180)]
+    band = detect_subtitle_band(masks)
+    if band is None:
+        logger.info(f"Aucune bande de sous-titres détectée: {name}")
+        return None
+    
+    top, bottom = int(band[0] * info['height']), int(np.ceil(band[1] * info['height']))
+    box = (0, top, info['width'], bottom - top)
+    
+    segments = []
+    pending = []
+    previous = None
+    samples = 0
+    stats = {'methods_run': {}, 'frames_processed': 0}
+    
+    def flush():
+        results, run_stats = run_ocr_cascade(
+            [image for _, image in pending], [[] for _ in pending], workers,
+            frame_threshold, float('inf'), easyocr_batch_size, easyocr_workers,
+            reference_height=info['height'],
+        )
+        for i, (frame_index, _) in enumerate(pending):
+            texts = [(r['confidence'], post_process_text(r['text'])) for r in results if r['frame'] == i]
+            confidence, text = max(texts, default=(0, ""))
+            segments.append((frame_index, text, confidence))
+        for method, count in run_stats['methods_run'].items():
+            stats['methods_run'][method] = stats['methods_run'].get(method, 0) + count
+        stats['frames_processed'] += len(pending)
+        pending.clear()
+    
+    step = _scan_step(info['fps'], info['frames'], interval, max_samples)
+    for frame_index, image in scan_gray_frames(video_path, info, step, use_ffmpeg, crop=box):
+        samples += 1
+        # Même sous-titre que l'échantillon précédent : déjà lu
+        signature = _subtitle_signature(image)
+        if previous is not None and _same_subtitle(previous, signature):
+            continue
+        previous = signature
+        if not _band_has_text(image):
+            segments.append((frame_index, "", 0))
+            continue
+        pending.append((frame_index, image))
+        if len(pending) >= chunk_size:
+            flush()
+    if pending:
+        flush()
+    
+    # Un sous-titre affiché sur plusieurs échantillons ne donne qu'une entrée (la lecture la plus fiable)
+    timeline = []
+    for frame_index, text, confidence in segments:
+        if not text:
+            continue
+        if timeline and difflib.SequenceMatcher(None, timeline[-1][5], text).ratio() >= 0.8:
+            if confidence > timeline[-1][6]:
+                timeline[-1][5:] = [text, round(confidence, 2)]
+            continue
+        timeline.append([round(frame_index / info['fps'], 2), *box, text, round(confidence, 2)])
+    
+    text = '\n'.join(entry[5] for entry in timeline)
+    confidence = float(np.mean([entry[6] for entry in timeline])) if timeline else 0
+    logger.info(f"Sous-titres extraits de {name}: {len(timeline)} lignes ({samples} bandes échantillonnées)")
+    stats.update({
+        'mode': 'subtitles',
+        'band': [top, bottom],
+        'frames': samples,
+        'frames_skipped': samples - stats['frames_processed'],
+        'subtitles': len(timeline),
+    })
+    return {'text': text, 'confidence': round(confidence, 3), 'timeline': timeline, 'stats': stats}
+
+def detect_subtitle_band(masks, min_presence=0.15, search_from=0.5, max_height=0.3, padding=0.25):
+    """
+    Bande horizontale stable où s'affichent les sous-titres incrustés.
+    
+    Pour chaque ligne de pixels, on mesure la proportion des vignettes (masques de
+    text_presence_mask, même taille) où du texte la couvre. Dans la moitié basse de
+    l'image, le bloc de lignes le plus souvent couvert (au moins `min_presence` et
+    la moitié du maximum, pour ignorer les faux positifs dispersés du décor) est
+    étendu aux lignes voisines moins fréquentes (sous-titres sur deux lignes),
+    puis d'une marge.
+    
+    Returns:
+        (haut, bas) en fraction de la hauteur de l'image, ou None si aucune bande
+        assez fréquente et assez fine n'est trouvée
+    """
+    if not masks:
+        return None
+    
+    presence = np.mean([mask.any(axis=1) for mask in masks], axis=0)
+    h = len(presence)
+    start = int(h * search_from)
+    core = max(min_presence, presence[start:].max() / 2)
+    rows = np.flatnonzero(presence[start:] >= core) + start
+    if not rows.size:
+        return None
+    
+    # Bloc de lignes consécutives (petits trous tolérés) le plus souvent couvert
+    runs = np.split(rows, np.flatnonzero(np.diff(rows) > 2) + 1)
+    run = max(runs, key=lambda r: presence[r].sum())
+    top, bottom = int(run[0]), int(run[-1]) + 1
+    while top > start and presence[top - 1] >= core / 2:
+        top -= 1
+    while bottom < h and presence[bottom] >= core / 2:
+        bottom += 1
+    
+    margin = int((bottom - top) * padding) + 1
+    top, bottom = max(0, top - margin), min(h, bottom + margin)
+    if bottom - top > max_height * h:
+        return None
+    return top / h, bottom / h
+
+def scan_gray_frames(video_path, info, step, use_ffmpeg, height=None, crop=None):
+    """
+    Génère (index, image en niveaux de gris) toutes les `step` frames, par ffmpeg
+    ou OpenCV ; `crop` (x, y, w, h) extrait une zone, `height` réduit l'image.
+    """
+    if use_ffmpeg:
+        yield from ffmpeg_scan_frames(video_path, info, step, height or info['height'], crop, seek=step >= 300)
+        return
+    
+    x, y, w, h = crop or (0, 0, info['width'], info['height'])
+    cap = cv2.VideoCapture(video_path)
+    try:
+        for frame_index, frame in scan_video_frames(cap, step, use_seek=step >= 300,
+                                                    total_frames=info['frames']):
+            image = _to_gray(frame[y:y + h, x:x + w])
+            yield frame_index, _thumbnail(image, height) if height else image
+    finally:
+        cap.release()
+
+def _opencv_stream_info(video_path):
+    """Comme probe_video_stream, via OpenCV (largeur et hauteur nulles si la vidéo est illisible)."""
+    cap = cv2.VideoCapture(video_path)
+    try:
+        return {
+            'fps': cap.get(cv2.CAP_PROP_FPS) or 30,
+            'frames': int(cap.get(cv2.CAP_PROP_FRAME_COUNT)),
+            'width': int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            'height': int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+        }
+    finally:
+        cap.release()
+
+def _subtitle_signature(image, bright=200, min_bright=0.002, width=160):
+    """
+    Signature réduite d'une bande de sous-titres. Les sous-titres sont presque
+    toujours clairs : la signature est alors le masque des pixels clairs,
+    insensible au décor qui bouge derrière ; sinon, la bande en niveaux de gris.
+    """
+    size = (width, max(1, image.shape[0] * width // image.shape[1]))
+    mask = image >= bright
+    if np.count_nonzero(mask) >= min_bright * mask.size:
+        return cv2.resize(mask.astype(np.uint8) * 255, size, interpolation=cv2.INTER_AREA) > 64
+    return cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+
+def _same_subtitle(a, b, max_change=0.3, max_difference=0.05):
+    """Deux signatures (voir _subtitle_signature) du même sous-titre affiché."""
+    if a.dtype != b.dtype:
+        return False
+    if a.dtype == bool:
+        union = np.count_nonzero(a | b)
+        return union == 0 or np.count_nonzero(a ^ b) / union <= max_change
+    return _frame_difference(a, b) <= max_difference
+
+def _band_has_text(image, min_edges=0.01):
+    """Une bande sans contours marqués (aucun sous-titre affiché) n'est pas passée à l'OCR."""
+    gradient = cv2.morphologyEx(image, cv2.MORPH_GRADIENT, cv2.getStructuringElement(cv2.MORPH_RECT, (3, 3)))
+    return np.count_nonzero(gradient > 64) >= min_edges * gradient.size
+
+def batch_sharpness(thumbs):
+    """
+    Netteté (variance du Laplacien) d'un lot de vignettes de même taille.
+    
+    Le Laplacien 4-voisins est appliqué en une seule opération numpy sur
+    le tableau (N, H, W) au lieu d'un appel OpenCV par image.
+    """
+    stack = np.asarray(thumbs, dtype=np.float32)
+    if stack.ndim != 3 or stack.shape[1] < 3 or stack.shape[2] < 3:
+        return np.zeros(len(thumbs))
+    
+    laplacian = (stack[:, :-2, 1:-1] + stack[:, 2:, 1:-1] + stack[:, 1:-1, :-2] + stack[:, 1:-1, 2:]
+                 - 4 * stack[:, 1:-1, 1:-1])
+    return laplacian.reshape(len(stack), -1).var(axis=1)
+
+def decode_frames(cap, frame_indices):
+    """
+    Relit en pleine résolution uniquement les frames demandées (dans l'ordre donné).
+    
+    Un seek par frame : pour quelques gagnantes, c'est moins coûteux que de
+    redécoder toute la vidéo ou de garder chaque échantillon en mémoire.
+    """
+    return [frame for _, frame in read_frames(cap, frame_indices)]
+
+def read_frames(cap, frame_indices):
+    """Comme decode_frames, mais retourne des tuples (index, frame) pour les frames lues."""
+    frames = []
+    for frame_index in frame_indices:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, frame_index)
         ret, frame = cap.read()
-        if not ret:
-            break
-            
-        # Calculer la netteté (variance du Laplacien)
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        sharpness = cv2.Laplacian(gray, cv2.CV_64F).var()
+        if ret:
+            frames.append((frame_index, frame))
+    return frames
+
+def select_text_frames(cap, **options):
+    """Frames retenues par select_text_frame_indices, lues en pleine résolution."""
+    return decode_frames(cap, select_text_frame_indices(cap, **options))
+
+def select_text_frame_indices(cap, budget=5, max_scan=300, min_interval=0.5, seek_threshold=300,
+                              thumb_height=180, scene_threshold=0.12, overlay_threshold=0.35):
+    """
+    Sélectionne les frames à passer à l'OCR sur toute la durée de la vidéo.
+    
+    La vidéo est parcourue en basse résolution (au plus `max_scan` vignettes,
+    espacées d'au moins `min_interval` secondes). Une nouvelle séquence commence
+    à chaque changement de plan ou d'incrustation de texte ; pour chaque séquence,
+    seule la frame la plus susceptible de contenir du texte net est candidate.
+    Seules les vignettes sont gardées en mémoire.
+    
+    Returns:
+        list[int] : index des `budget` meilleures candidates distinctes, dans
+        l'ordre chronologique (à relire en pleine résolution)
+    """
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    if fps <= 0:
+        fps = 30
+    
+    step = _scan_step(fps, total_frames, min_interval, max_scan)
+    thumbs = (
+        (frame_index, _thumbnail(frame, thumb_height))
+        for frame_index, frame in scan_video_frames(cap, step, use_seek=step >= seek_threshold,
+                                                    total_frames=total_frames)
+    )
+    return select_text_thumbnails(thumbs, budget, scene_threshold, overlay_threshold)
+
+def select_text_thumbnails(thumbs, budget=5, scene_threshold=0.12, overlay_threshold=0.35):
+    """
+    Cœur de select_text_frame_indices : choisit les frames à partir des
+    vignettes (index, image en niveaux de gris) dans l'ordre de la vidéo.
+    
+    Les vignettes (au plus `max_scan`, voir _scan_step) sont rassemblées pour
+    calculer la netteté de toutes en un seul appel à batch_sharpness.
+    """
+    thumbs = list(thumbs)
+    sharpnesses = batch_sharpness([thumb for _, thumb in thumbs]) if thumbs else []
+    candidates = []
+    segment_best = None
+    previous = None
+    
+    for (frame_index, thumb), sharpness in zip(thumbs, sharpnesses):
+        text_mask = text_presence_mask(thumb)
+        text_score = float(np.count_nonzero(text_mask)) / text_mask.size
+        
+        if previous is not None and _is_new_segment(previous, (thumb, text_mask),
+                                                     scene_threshold, overlay_threshold):
+            _add_candidate(candidates, segment_best, budget, scene_threshold, overlay_threshold)
+            segment_best = None
+        previous = (thumb, text_mask)
         
-        frames.append(frame)
-        frame_scores.append(sharpness)
+        # Le texte prime ; la netteté départage (et choisit seule sans texte détecté)
+        sharp_weight = min(float(sharpness) / 500.0, 1.0)
+        score = text_score * (0.5 + 0.5 * sharp_weight) + 0.001 * sharp_weight
+        if segment_best is None or score > segment_best['score']:
+            segment_best = {'score': score, 'index': frame_index, 'thumb': thumb, 'text_mask': text_mask}
+    
+    _add_candidate(candidates, segment_best, budget, scene_threshold, overlay_threshold)
+    
+    return sorted(c['index'] for c in candidates)
+
+def _scan_step(fps, total_frames, min_interval, max_scan):
+    """Pas d'échantillonnage : au moins `min_interval` secondes, au plus `max_scan` vignettes."""
+    step = max(1, int(fps * min_interval))
+    if total_frames > 0:
+        step = max(step, -(-total_frames // max_scan))
+    return step
+
+def scan_video_frames(cap, step, use_seek=False, total_frames=0):
+    """
+    Génère (index, frame) toutes les `step` frames.
+    
+    Pas court : lecture séquentielle grab()/retrieve(). Pas long (vidéos longues) :
+    un seek par échantillon coûte moins que de décoder toutes les frames intermédiaires.
+    """
+    if use_seek and total_frames > 0:
+        for frame_index in range(0, total_frames, step):
+            cap.set(cv2.CAP_PROP_POS_FRAMES, frame_index)
+            ret, frame = cap.read()
+            if not ret:
+                break
+            yield frame_index, frame
+        return
+    
+    frame_index = 0
+    while cap.grab():
+        if frame_index % step == 0:
+            ret, frame = cap.retrieve()
+            if not ret:
+                break
+            yield frame_index, frame
+        frame_index += 1
+
+def text_presence_mask(gray, min_contrast=24):
+    """
+    Masque des zones ressemblant à des lignes de texte (image en niveaux de gris).
     
-    if not frames:
+    Gradient morphologique + seuillage d'Otsu, puis fermeture horizontale pour
+    relier les caractères ; on ne garde que les blocs allongés et de hauteur
+    compatible avec une ligne de texte. Le seuil ne descend pas sous `min_contrast` :
+    sur un fond uni, Otsu retiendrait le bruit de compression.
+    """
+    h, w = gray.shape
+    gradient = cv2.morphologyEx(gray, cv2.MORPH_GRADIENT, cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (3, 3)))
+    threshold, binary = cv2.threshold(gradient, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)
+    if threshold < min_contrast:
+        _, binary = cv2.threshold(gradient, min_contrast, 255, cv2.THRESH_BINARY)
+    connected = cv2.morphologyEx(binary, cv2.MORPH_CLOSE, cv2.getStructuringElement(cv2.MORPH_RECT, (9, 1)))
+    
+    mask = np.zeros_like(gray)
+    contours, _ = cv2.findContours(connected, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    for contour in contours:
+        x, y, cw, ch = cv2.boundingRect(contour)
+        if cw < 2 * ch or not (0.02 * h <= ch <= 0.3 * h):
+            continue
+        # Les caractères remplissent une bonne partie de leur boîte englobante
+        if cv2.countNonZero(binary[y:y + ch, x:x + cw]) < 0.2 * cw * ch:
+            continue
+        mask[y:y + ch, x:x + cw] = 255
+    return mask
+
+def _to_gray(frame):
+    """Frame en niveaux de gris (les frames lues par ffmpeg le sont déjà)."""
+    return frame if frame.ndim == 2 else cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+
+def _thumbnail(frame, height):
+    gray = _to_gray(frame)
+    h, w = gray.shape
+    if h <= height:
+        return gray
+    return cv2.resize(gray, (max(1, int(w * height / h)), height), interpolation=cv2.INTER_AREA)
+
+def _frame_difference(a, b):
+    """Différence moyenne normalisée (0-1) entre deux vignettes."""
+    if a.shape != b.shape:
+        return 1.0
+    return float(cv2.absdiff(a, b).mean()) / 255.0
+
+def _is_new_segment(previous, current, scene_threshold, overlay_threshold):
+    prev_thumb, prev_mask = previous
+    thumb, mask = current
+    
+    # Changement de plan
+    if _frame_difference(prev_thumb, thumb) > scene_threshold:
+        return True
+    
+    # Même plan, mais incrustation de texte apparue, disparue ou déplacée
+    union = cv2.countNonZero(cv2.bitwise_or(prev_mask, mask))
+    if union == 0:
+        return False
+    changed = cv2.countNonZero(cv2.bitwise_xor(prev_mask, mask))
+    return changed / union > overlay_threshold
+
+def _add_candidate(candidates, candidate, budget, scene_threshold, overlay_threshold):
+    """Ajoute la meilleure frame d'une séquence en gardant au plus `budget` frames distinctes."""
+    if candidate is None:
+        return
+    
+    # Une séquence identique à une candidate déjà retenue (plan qui revient) : garder la meilleure
+    current = (candidate['thumb'], candidate['text_mask'])
+    for i, existing in enumerate(candidates):
+        if not _is_new_segment((existing['thumb'], existing['text_mask']), current,
+                               scene_threshold / 2, overlay_threshold):
+            if candidate['score'] > existing['score']:
+                candidates[i] = candidate
+            return
+    
+    candidates.append(candidate)
+    if len(candidates) > budget:
+        candidates.remove(min(candidates, key=lambda c: c['score']))
+
+def detect_text_regions(frame, work_height=720, padding=0.3, max_coverage=0.6, max_regions=12):
+    """
+    Détecte les zones de texte d'une frame (gradient morphologique, voir text_presence_mask).
+    
+    Les lignes voisines sont regroupées en blocs, puis chaque bloc est agrandi
+    d'une marge pour ne pas couper les caractères.
+    
+    Returns:
+        list[(x, y, w, h)] en coordonnées de la frame, dans l'ordre de lecture ;
+        liste vide si aucune zone n'est trouvée ou si les zones couvrent presque
+        toute l'image (l'OCR se fait alors sur l'image entière).
+    """
+    frame_h, frame_w = frame.shape[:2]
+    gray = _thumbnail(frame, work_height)
+    scale = frame_h / gray.shape[0]
+    
+    mask = text_presence_mask(gray)
+    # Regrouper les lignes d'un même bloc de texte
+    blocks = cv2.dilate(mask, cv2.getStructuringElement(cv2.MORPH_RECT, (15, 7)))
+    contours, _ = cv2.findContours(blocks, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    if not contours:
+        return []
+    
+    boxes = sorted((cv2.boundingRect(c) for c in contours), key=lambda b: b[2] * b[3], reverse=True)[:max_regions]
+    
+    regions = []
+    covered = 0
+    for x, y, w, h in boxes:
+        margin = int(h * padding * scale)
+        x0 = max(0, int(x * scale) - margin)
+        y0 = max(0, int(y * scale) - margin)
+        x1 = min(frame_w, int((x + w) * scale) + margin)
+        y1 = min(frame_h, int((y + h) * scale) + margin)
+        regions.append((x0, y0, x1 - x0, y1 - y0))
+        covered += (x1 - x0) * (y1 - y0)
+    
+    if covered > max_coverage * frame_w * frame_h:
         return []
     
-    # Garder les 5 frames les plus nettes
-    sorted_indices = sorted(range(len(frame_scores)), key=lambda i: frame_scores[i], reverse=True)
-    best_frames = [frames[i] for i in sorted_indices[:5]]
+    return sorted(regions, key=lambda r: (r[1], r[0]))
+
+def dhash(image, hash_size=8):
+    """
+    Empreinte perceptuelle (dHash) : signe du gradient horizontal sur une
+    vignette de hash_size x (hash_size + 1), soit hash_size² bits.
+    """
+    gray = _to_gray(image)
+    resized = cv2.resize(gray, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    bits = resized[:, 1:] > resized[:, :-1]
+    return int.from_bytes(np.packbits(bits).tobytes(), 'big')
+
+def hamming_distance(a, b):
+    return bin(a ^ b).count('1')
+
+def text_ink_mask(image):
+    """
+    Masque binarisé du texte (seuillage d'Otsu), recadré sur l'encre.
+    
+    L'encre est la classe minoritaire : texte sombre sur fond clair comme
+    texte clair sur fond sombre. Le recadrage rend la comparaison insensible
+    à un léger décalage de la zone détectée.
+    """
+    gray = _to_gray(image)
+    _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)
+    ink = binary > 0
+    if np.count_nonzero(ink) > ink.size / 2:
+        ink = ~ink
+    rows, cols = np.any(ink, axis=1), np.any(ink, axis=0)
+    if not rows.any():
+        return ink[:0, :0]
+    top, bottom = np.argmax(rows), len(rows) - np.argmax(rows[::-1])
+    left, right = np.argmax(cols), len(cols) - np.argmax(cols[::-1])
+    return ink[top:bottom, left:right]
+
+def same_text_mask(a, b, max_mismatch=0.001, max_shift=2):
+    """
+    Deux masques (voir text_ink_mask) du même texte, au pixel près.
+    
+    Un pixel d'encre n'est compté comme différent que s'il n'a aucun pixel
+    d'encre de l'autre masque dans son voisinage immédiat : les contours
+    modifiés par la compression sont tolérés, pas un caractère changé.
+    `max_mismatch` : part de l'encre pouvant différer ; `max_shift` : écart
+    toléré (pixels) entre les dimensions des deux masques.
+    """
+    if abs(a.shape[0] - b.shape[0]) > max_shift or abs(a.shape[1] - b.shape[1]) > max_shift:
+        return False
+    if a.size == 0 or b.size == 0:
+        return a.size == b.size
+    
+    h, w = max(a.shape[0], b.shape[0]), max(a.shape[1], b.shape[1])
+    a = np.pad(a, ((0, h - a.shape[0]), (0, w - a.shape[1]))).astype(np.uint8)
+    b = np.pad(b, ((0, h - b.shape[0]), (0, w - b.shape[1]))).astype(np.uint8)
+    kernel = np.ones((3, 3), np.uint8)
+    mismatch = (np.count_nonzero(a > cv2.dilate(b, kernel))
+                + np.count_nonzero(b > cv2.dilate(a, kernel)))
+    ink = np.count_nonzero(a) + np.count_nonzero(b)
+    return mismatch <= max_mismatch * ink
+
+def deduplicate_images(frames, frame_regions, hash_size=16, frame_max_distance=0.02, region_max_distance=0.1,
+                       max_mismatch=0.001):
+    """
+    Écarte les images identiques à une image déjà retenue pour l'OCR.
+    
+    Les frames entières (sans zone détectée) et les zones de texte sont d'abord
+    comparées par dHash (256 bits), puis confirmées au pixel près sur leur
+    masque de texte binarisé (voir same_text_mask) : deux légendes qui ne
+    diffèrent que d'un chiffre ont des empreintes voisines mais restent
+    distinctes. Les zones doivent en plus avoir des dimensions proches : une
+    même incrustation (logo, sous-titre encore affiché) présente sur plusieurs
+    frames n'est lue qu'une fois. Une frame dont toutes les zones ont déjà été
+    lues est écartée.
+    
+    `frame_max_distance` / `region_max_distance` : part des bits pouvant différer
+    entre deux empreintes pour que les images soient comparées au pixel près.
+    `max_mismatch` : voir same_text_mask.
+    
+    Returns:
+        Tuple (positions des frames conservées, zones par frame conservée,
+               statistiques de déduplication)
+    """
+    seen_frames = []
+    seen_regions = []
+    kept = []
+    kept_regions = []
+    duplicate_frames = 0
+    duplicate_regions = 0
+    
+    def duplicate(image_hash, mask, seen, max_distance):
+        return any(
+            hamming_distance(image_hash, seen_hash) <= max_distance * hash_size ** 2
+            and same_text_mask(mask, seen_mask, max_mismatch)
+            for seen_hash, seen_mask in seen
+        )
+    
+    for position, (frame, regions) in enumerate(zip(frames, frame_regions)):
+        if not regions:
+            frame_hash, mask = dhash(frame, hash_size), text_ink_mask(frame)
+            if duplicate(frame_hash, mask, seen_frames, frame_max_distance):
+                duplicate_frames += 1
+                continue
+            seen_frames.append((frame_hash, mask))
+            kept.append(position)
+            kept_regions.append(regions)
+            continue
+        
+        unique = []
+        for x, y, w, h in regions:
+            crop = frame[y:y + h, x:x + w]
+            region_hash, mask = dhash(crop, hash_size), text_ink_mask(crop)
+            similar = [
+                (seen_hash, seen_mask) for seen_hash, seen_mask, sw, sh in seen_regions
+                if abs(w - sw) <= 0.1 * max(w, sw) and abs(h - sh) <= 0.1 * max(h, sh)
+            ]
+            if duplicate(region_hash, mask, similar, region_max_distance):
+                duplicate_regions += 1
+                continue
+            seen_regions.append((region_hash, mask, w, h))
+            unique.append((x, y, w, h))
+        
+        if not unique:
+            duplicate_frames += 1
+            continue
+        kept.append(position)
+        kept_regions.append(unique)
+    
+    stats = {'duplicate_frames': duplicate_frames, 'duplicate_regions': duplicate_regions}
+    return kept, kept_regions, stats
+
+def extract_region_texts(extract_func, frame, regions, **kwargs):
+    """
+    Applique une méthode d'extraction à chaque zone recadrée (ou à l'image entière
+    si `regions` est vide) et retourne un texte par zone.
+    """
+    if not regions:
+        return [extract_func(frame, **kwargs)]
+    return [extract_func(frame[y:y + h, x:x + w], **kwargs) for x, y, w, h in regions]
+
+def _join_texts(texts):
+    return '\n'.join(text for text in texts if text)
+
+def run_ocr_methods(frames, frame_regions, workers=0, easyocr_batch_size=8, easyocr_workers=0):
+    """
+    Applique EasyOCR, Tesseract et le preprocessing agressif à chaque frame.
+    
+    Avec `workers` > 1, les méthodes Tesseract de toutes les frames sont réparties
+    sur un pool de processus ; les frames sont placées une seule fois en mémoire
+    partagée au lieu d'être copiées pour chaque tâche. EasyOCR reste dans ce
+    processus (modèle déjà chargé) et traite toutes les frames en un seul appel
+    par lots pendant que le pool travaille.
+    
+    Returns:
+        Tuple (résultats {'text', 'confidence', 'method', 'frame', 'region_texts'}
+               pour merge_and_select_best_result, statistiques : frames traitées
+               et méthodes exécutées)
+    """
+    texts = {}
+    futures = {}
+    shm = None
+    try:
+        if workers > 1 and frames and all(f.shape == frames[0].shape for f in frames):
+            shm, shape = _share_frames(frames)
+            keys = [(i, method) for i in range(len(frames)) for method in TESSERACT_METHODS]
+            executor, submitted = submit_ocr_tasks(workers, [
+                (_ocr_shared_frame, shm.name, shape, i, method, frame_regions[i]) for i, method in keys
+            ])
+            futures = dict(zip(keys, submitted))
+        
+        # Approche 1: EasyOCR (deep learning), toutes les frames en lots
+        if EASYOCR_AVAILABLE:
+            easyocr_texts = extract_with_easyocr_batched_regions(frames, frame_regions,
+                                                                 easyocr_batch_size, easyocr_workers)
+            for i, region_texts in enumerate(easyocr_texts):
+                texts[(i, 'EasyOCR')] = region_texts
+        
+        # Approches 2 et 3: Tesseract (optimisé puis agressif), si pas de pool
+        if not futures:
+            for i, frame in enumerate(frames):
+                for method in TESSERACT_METHODS:
+                    texts[(i, method)] = _run_method(method, frame, frame_regions[i])
+        
+        for (i, method), future in futures.items():
+            try:
+                texts[(i, method)] = future.result()
+            except Exception as e:
+                if isinstance(e, BrokenProcessPool):
+                    _discard_ocr_executor(executor)
+                logger.warning(f"Erreur OCR parallèle ({method}), exécution locale: {e}")
+                texts[(i, method)] = _run_method(method, frames[i], frame_regions[i])
+    finally:
+        if shm is not None:
+            shm.close()
+            shm.unlink()
+    
+    all_results = []
+    methods_run = {}
+    for i in range(len(frames)):
+        for method in ('EasyOCR', *TESSERACT_METHODS):
+            if (i, method) not in texts:
+                continue
+            methods_run[method] = methods_run.get(method, 0) + 1
+            result = _ocr_result(texts[(i, method)], method, i)
+            if result['text']:
+                all_results.append(result)
+    
+    stats = {'mode': 'full', 'frames': len(frames), 'frames_processed': len(frames), 'methods_run': methods_run}
+    return all_results, stats
+
+def run_ocr_cascade(frames, frame_regions, workers=0, frame_threshold=0.8, video_threshold=0.9,
+                    easyocr_batch_size=8, easyocr_workers=0, reference_height=None):
+    """
+    OCR en cascade : les méthodes sont essayées de la moins à la plus coûteuse
+    (Tesseract, preprocessing agressif, EasyOCR) et une frame s'arrête dès qu'un
+    résultat atteint `frame_threshold`. Dès qu'un résultat atteint `video_threshold`,
+    les frames restantes sont ignorées.
+    
+    La cascade Tesseract de chaque frame s'exécute d'abord (dans le pool si
+    `workers` > 1, frames en mémoire partagée) ; EasyOCR est ensuite lancé en un
+    seul appel par lots sur les frames restées sous le seuil.
+    
+    `reference_height` : hauteur de la vidéo quand les « frames » sont des bandes
+    recadrées (voir tesseract_region_texts).
+    
+    Returns:
+        Tuple (résultats pour merge_and_select_best_result, statistiques de la cascade)
+    """
+    tesseract_methods = list(TESSERACT_METHODS)
+    cascade_methods = tesseract_methods + (['EasyOCR'] if EASYOCR_AVAILABLE else [])
+    frame_results = {}
+    
+    def video_done():
+        return any(r['confidence'] >= video_threshold for results, _ in frame_results.values() for r in results)
+    
+    shm = None
+    try:
+        executor = None
+        if workers > 1 and len(frames) > 1 and all(f.shape == frames[0].shape for f in frames):
+            shm, shape = _share_frames(frames)
+            executor, submitted = submit_ocr_tasks(workers, [
+                (_cascade_shared_frame, shm.name, shape, i, regions, frame_threshold, reference_height)
+                for i, regions in enumerate(frame_regions)
+            ])
+        if executor is not None:
+            futures = {future: i for i, future in enumerate(submitted)}
+            try:
+                for future in as_completed(futures):
+                    i = futures[future]
+                    try:
+                        frame_results[i] = future.result()
+                    except Exception as e:
+                        if isinstance(e, BrokenProcessPool):
+                            _discard_ocr_executor(executor)
+                        logger.warning(f"Erreur OCR parallèle (cascade), exécution locale: {e}")
+                        frame_results[i] = cascade_frame(frames[i], frame_regions[i], tesseract_methods,
+                                                         frame_threshold, reference_height)
+                    if video_done():
+                        break
+            finally:
+                # Frames non commencées : annulées ; les autres se terminent sans être attendues
+                for future in futures:
+                    future.cancel()
+        else:
+            for i, (frame, regions) in enumerate(zip(frames, frame_regions)):
+                frame_results[i] = cascade_frame(frame, regions, tesseract_methods, frame_threshold,
+                                                 reference_height)
+                if video_done():
+                    break
+    finally:
+        if shm is not None:
+            shm.close()
+            shm.unlink()
+    
+    # Dernier niveau : EasyOCR, en lots, pour les frames encore sous le seuil
+    pending = sorted(i for i, (results, _) in frame_results.items() if not _frame_done(results, frame_threshold))
+    if EASYOCR_AVAILABLE and pending and not video_done():
+        easyocr_texts = extract_with_easyocr_batched_regions(
+            [frames[i] for i in pending], [frame_regions[i] for i in pending],
+            easyocr_batch_size, easyocr_workers,
+        )
+        for i, region_texts in zip(pending, easyocr_texts):
+            results, run = frame_results[i]
+            result = _ocr_result(region_texts, 'EasyOCR')
+            frame_results[i] = (results + ([result] if result['text'] else []), run + ['EasyOCR'])
+    
+    all_results = []
+    methods_run = {}
+    for i in sorted(frame_results):
+        results, run = frame_results[i]
+        for result in results:
+            result['frame'] = i
+        all_results.extend(results)
+        for method in run:
+            methods_run[method] = methods_run.get(method, 0) + 1
+    
+    total = len(frames)
+    methods_skipped = {
+        method: total - methods_run.get(method, 0)
+        for method in cascade_methods
+        if total - methods_run.get(method, 0) > 0
+    }
+    stats = {
+        'mode': 'cascade',
+        'frames': total,
+        'frames_processed': len(frame_results),
+        'frames_skipped': total - len(frame_results),
+        'methods_run': methods_run,
+        'methods_skipped': methods_skipped,
+    }
+    return all_results, stats
+
+def cascade_frame(frame, regions, methods, frame_threshold, reference_height=None):
+    """
+    Essaie les méthodes dans l'ordre sur une frame jusqu'à atteindre `frame_threshold`.
+    
+    Returns:
+        Tuple (résultats non vides, méthodes exécutées)
+    """
+    results = []
+    run = []
+    for method in methods:
+        result = _ocr_result(_run_method(method, frame, regions, reference_height), method)
+        run.append(method)
+        if result['text']:
+            results.append(result)
+        if _frame_done(results, frame_threshold):
+            break
+    return results, run
+
+def _frame_done(results, frame_threshold):
+    return any(r['confidence'] >= frame_threshold for r in results)
+
+def _run_method(method, frame, regions, reference_height=None):
+    """Textes d'une méthode pour chaque zone de la frame."""
+    if method in TESSERACT_METHODS:
+        return tesseract_region_texts(method, frame, regions, reference_height or frame.shape[0])
+    return extract_region_texts(extract_with_easyocr, frame, regions)
+
+def _ocr_result(region_texts, method, frame_index=None):
+    text = _join_texts(region_texts)
+    return {
+        'text': text,
+        'confidence': calculate_text_confidence(text),
+        'method': method,
+        'frame': frame_index,
+        'region_texts': region_texts,
+    }
+
+def get_ocr_executor(workers):
+    """
+    Pool de processus OCR, conservé d'une vidéo à l'autre.
+    
+    Chaque processus utilise le moteur Tesseract choisi dans ce processus et
+    garde son propre moteur initialisé entre les tâches.
+    """
+    global _ocr_executor, _ocr_executor_workers, _ocr_executor_backend
+    if _ocr_executor is not None and (_ocr_executor_workers, _ocr_executor_backend) != (workers, _tesseract_backend):
+        shutdown_ocr_executor()
+    if _ocr_executor is None:
+        # spawn : pas de fork d'un processus qui détient des threads (EasyOCR/torch)
+        _ocr_executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=set_tesseract_backend,
+            initargs=(_tesseract_backend,),
+        )
+        _ocr_executor_workers = workers
+        _ocr_executor_backend = _tesseract_backend
+    return _ocr_executor
+
+def submit_ocr_tasks(workers, tasks):
+    """
+    Soumet les tâches (fonction, arguments...) au pool OCR.
+    
+    Un pool dont un processus est mort (mémoire, crash de Tesseract) refuse
+    toute tâche (BrokenProcessPool) : il est remplacé une fois.
     
-    return best_frames
+    Returns:
+        Tuple (pool, futures dans l'ordre des tâches), ou (None, []) si aucun
+        pool n'accepte les tâches : elles s'exécutent alors dans ce processus
+    """
+    for attempt in range(2):
+        executor = get_ocr_executor(workers)
+        futures = []
+        try:
+            for task in tasks:
+                futures.append(executor.submit(*task))
+            return executor, futures
+        except BrokenProcessPool as e:
+            for future in futures:
+                future.cancel()
+            _discard_ocr_executor(executor)
+            logger.warning(f"Pool OCR inutilisable (tentative {attempt + 1}): {e}")
+    return None, []
+
+def _discard_ocr_executor(executor):
+    """Abandonne un pool cassé s'il est encore le pool courant ; le suivant est recréé au besoin."""
+    if executor is _ocr_executor:
+        shutdown_ocr_executor()
+
+def shutdown_ocr_executor():
+    global _ocr_executor, _ocr_executor_workers, _ocr_executor_backend
+    if _ocr_executor is not None:
+        _ocr_executor.shutdown(wait=False, cancel_futures=True)
+        _ocr_executor = None
+        _ocr_executor_workers = 0
+        _ocr_executor_backend = None
+
+def _share_frames(frames):
+    """Copie les frames (même taille) dans un bloc de mémoire partagée."""
+    shape = (len(frames),) + frames[0].shape
+    shm = shared_memory.SharedMemory(create=True, size=int(np.prod(shape)))
+    shared = np.ndarray(shape, dtype=np.uint8, buffer=shm.buf)
+    for i, frame in enumerate(frames):
+        shared[i] = frame
+    del shared
+    return shm, shape
+
+def _ocr_shared_frame(shm_name, shape, index, method, regions):
+    """Tâche du pool : OCR d'une frame lue directement dans la mémoire partagée."""
+    shm = _attach_shared_memory(shm_name)
+    frames = np.ndarray(shape, dtype=np.uint8, buffer=shm.buf)
+    frame = frames[index]
+    try:
+        return _run_method(method, frame, regions)
+    finally:
+        del frame, frames
+        shm.close()
+
+def _cascade_shared_frame(shm_name, shape, index, regions, frame_threshold, reference_height=None):
+    """Tâche du pool : cascade Tesseract d'une frame lue dans la mémoire partagée."""
+    shm = _attach_shared_memory(shm_name)
+    frames = np.ndarray(shape, dtype=np.uint8, buffer=shm.buf)
+    frame = frames[index]
+    try:
+        return cascade_frame(frame, regions, list(TESSERACT_METHODS), frame_threshold, reference_height)
+    finally:
+        del frame, frames
+        shm.close()
+
+def _attach_shared_memory(name):
+    try:
+        # Python 3.13+ : le processus qui a créé le bloc reste seul responsable de sa suppression
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Avant 3.13 : les processus spawn partagent le resource tracker du parent,
+        # qui a déjà enregistré ce bloc ; l'enregistrement est sans effet
+        return shared_memory.SharedMemory(name=name)
 
 def extract_with_easyocr(frame):
     """
@@ -177,74 +1376,174 @@ def extract_with_easyocr(frame):
         logger.debug(f"Erreur EasyOCR: {e}")
         return ""
 
-def extract_with_tesseract_enhanced(frame):
+def extract_with_easyocr_batched(images, batch_size=8, workers=0):
     """
-    Extrait le texte avec Tesseract et preprocessing optimisé.
+    Extrait le texte de plusieurs images en un seul appel EasyOCR (readtext_batched).
+    
+    Le détecteur et le reconnaisseur traitent les images par lots de `batch_size`
+    au lieu d'un appel par image. Le traitement par lots exige des images de même
+    taille : elles sont regroupées par hauteur (arrondie à 64 px) et complétées
+    d'une bordure noire jusqu'à la taille du groupe, sans être redimensionnées.
+    
+    Returns:
+        list[str] : un texte par image (chaîne vide si rien n'est lu)
     """
+    reader = get_easyocr_reader()
+    if reader is None or not images:
+        return [""] * len(images)
+    
     try:
-        # Convertir en niveaux de gris
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        
-        # Sur-échantillonner
-        h, w = gray.shape
-        if h < 800:
-            scale_factor = 800 / h
-            new_w = int(w * scale_factor)
-            gray = cv2.resize(gray, (new_w, 800), interpolation=cv2.INTER_CUBIC)
+        groups = {}
+        for i, image in enumerate(images):
+            groups.setdefault(-(-image.shape[0] // 64) * 64, []).append(i)
         
-        # Preprocessing optimisé
-        denoised = cv2.medianBlur(gray, 3)
-        binary = cv2.adaptiveThreshold(
-            denoised, 255, 
-            cv2.ADAPTIVE_THRESH_GAUSSIAN_C, 
-            cv2.THRESH_BINARY, 31, 5
-        )
-        
-        # Configuration Tesseract optimale
-        config = '--oem 3 --psm 6'
-        text = pytesseract.image_to_string(binary, lang='eng', config=config)
-        
-        return text.strip()
+        texts = [""] * len(images)
+        for height, indices in groups.items():
+            width = max(images[i].shape[1] for i in indices)
+            padded = [
+                cv2.copyMakeBorder(images[i], 0, height - images[i].shape[0], 0, width - images[i].shape[1],
+                                   cv2.BORDER_CONSTANT, value=0)
+                for i in indices
+            ]
+            batches = reader.readtext_batched(padded, batch_size=batch_size, workers=workers,
+                                              detail=0, paragraph=True)
+            for i, results in zip(indices, batches):
+                texts[i] = ' '.join(results).strip()
+        return texts
     except Exception as e:
-        logger.debug(f"Erreur Tesseract: {e}")
-        return ""
+        logger.debug(f"Erreur EasyOCR par lots, repli image par image: {e}")
+        return [extract_with_easyocr(image) for image in images]
 
-def extract_with_aggressive_preprocessing(frame):
+def extract_with_easyocr_batched_regions(frames, frame_regions, batch_size=8, workers=0):
     """
-    Extrait le texte avec preprocessing très agressif pour les cas difficiles.
+    EasyOCR par lots sur les zones recadrées de toutes les frames (ou les frames
+    entières sans zone détectée), puis textes regroupés par frame.
+    
+    Returns:
+        list[list[str]] : pour chaque frame, un texte par zone (voir extract_region_texts)
     """
-    try:
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        
-        # Sur-échantillonnage important
-        h, w = gray.shape
-        scale_factor = 1200 / h if h < 1200 else 1.5
+    images = []
+    owners = []
+    for i, (frame, regions) in enumerate(zip(frames, frame_regions)):
+        crops = [frame[y:y + h, x:x + w] for x, y, w, h in regions] or [frame]
+        images.extend(crops)
+        owners.extend([i] * len(crops))
+    
+    texts = [[] for _ in frames]
+    for owner, text in zip(owners, extract_with_easyocr_batched(images, batch_size, workers)):
+        texts[owner].append(text)
+    return texts
+
+def preprocess_tesseract_enhanced(frame, reference_height=None):
+    """Preprocessing optimisé : sur-échantillonnage, débruitage et seuillage adaptatif."""
+    # Convertir en niveaux de gris
+    gray = _to_gray(frame)
+    
+    # Sur-échantillonner
+    h, w = gray.shape
+    reference_height = reference_height or h
+    if reference_height < 800:
+        scale_factor = 800 / reference_height
         new_w = int(w * scale_factor)
         new_h = int(h * scale_factor)
-        scaled = cv2.resize(gray, (new_w, new_h), interpolation=cv2.INTER_CUBIC)
-        
-        # Égalisation d'histogramme
-        clahe = cv2.createCLAHE(clipLimit=3.0, tileGridSize=(8,8))
-        enhanced = clahe.apply(scaled)
-        
-        # Débruitage agressif
-        denoised = cv2.bilateralFilter(enhanced, 9, 75, 75)
-        
-        # Morphologie pour nettoyer
-        kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (2, 2))
-        cleaned = cv2.morphologyEx(denoised, cv2.MORPH_CLOSE, kernel)
-        
-        # Seuillage OTSU
-        _, binary = cv2.threshold(cleaned, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
-        
-        # Tesseract avec paramètres spéciaux
-        config = '--oem 3 --psm 8 -c tessedit_char_whitelist=ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789 '
-        text = pytesseract.image_to_string(binary, lang='eng', config=config)
-        
-        return text.strip()
+        gray = cv2.resize(gray, (new_w, new_h), interpolation=cv2.INTER_CUBIC)
+    
+    # Preprocessing optimisé
+    denoised = cv2.medianBlur(gray, 3)
+    return cv2.adaptiveThreshold(
+        denoised, 255, 
+        cv2.ADAPTIVE_THRESH_GAUSSIAN_C, 
+        cv2.THRESH_BINARY, 31, 5
+    )
+
+def preprocess_aggressive(frame, reference_height=None):
+    """Preprocessing très agressif : fort sur-échantillonnage, CLAHE, débruitage et seuillage OTSU."""
+    gray = _to_gray(frame)
+    
+    # Sur-échantillonnage important
+    h, w = gray.shape
+    reference_height = reference_height or h
+    scale_factor = 1200 / reference_height if reference_height < 1200 else 1.5
+    new_w = int(w * scale_factor)
+    new_h = int(h * scale_factor)
+    scaled = cv2.resize(gray, (new_w, new_h), interpolation=cv2.INTER_CUBIC)
+    
+    # Égalisation d'histogramme
+    clahe = cv2.createCLAHE(clipLimit=3.0, tileGridSize=(8,8))
+    enhanced = clahe.apply(scaled)
+    
+    # Débruitage agressif
+    denoised = cv2.bilateralFilter(enhanced, 9, 75, 75)
+    
+    # Morphologie pour nettoyer
+    kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (2, 2))
+    cleaned = cv2.morphologyEx(denoised, cv2.MORPH_CLOSE, kernel)
+    
+    # Seuillage OTSU
+    _, binary = cv2.threshold(cleaned, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    return binary
+
+def tesseract_region_texts(method, frame, regions, reference_height=None):
+    """
+    Textes d'une méthode Tesseract pour chaque zone de la frame (un seul pour
+    l'image entière si `regions` est vide).
+    
+    Les zones sont prétraitées puis transmises ensemble au moteur : avec
+    pytesseract, un seul processus tesseract par frame au lieu d'un par zone
+    (sauf pour les modes ligne ou mot, voir PytesseractEngine.images_to_strings).
+    
+    `reference_height` : hauteur de la frame d'origine quand `frame` est une
+    bande recadrée, pour appliquer le même facteur de sur-échantillonnage.
+    """
+    preprocess, psm, whitelist = TESSERACT_METHODS[method]
+    crops = [frame[y:y + h, x:x + w] for x, y, w, h in regions] or [frame]
+    try:
+        images = [preprocess(crop, reference_height) for crop in crops]
+        texts = get_tesseract_engine().images_to_strings(images, psm=psm, whitelist=whitelist)
+        return [text.strip() for text in texts]
     except Exception as e:
-        logger.debug(f"Erreur preprocessing agressif: {e}")
-        return ""
+        logger.debug(f"Erreur {method}: {e}")
+        return [""] * len(crops)
+
+# Méthodes Tesseract exécutables dans le pool de processus
+# (nom → prétraitement, mode de segmentation, liste blanche de caractères)
+TESSERACT_METHODS = {
+    'Tesseract': (preprocess_tesseract_enhanced, 6, None),
+    'Aggressive': (preprocess_aggressive, 8, AGGRESSIVE_WHITELIST),
+}
+
+def build_ocr_timeline(results, frame_regions, frame_times, frame_sizes, box_scale=1.0):
+    """
+    Construit la chronologie OCR : pour chaque zone de chaque frame, le texte le
+    plus fiable parmi les méthodes exécutées.
+    
+    Entrées compactes (stockées telles quelles dans Video.ocr_timeline) :
+    [t (secondes), x, y, w, h (pixels de la frame), texte, confiance], triées par temps.
+    Une frame sans zone détectée donne une entrée couvrant toute l'image.
+    `box_scale` ramène les zones des frames réduites (source ffmpeg) à la résolution d'origine.
+    """
+    timeline = []
+    for i, regions in enumerate(frame_regions):
+        height, width = frame_sizes[i]
+        boxes = regions or [(0, 0, width, height)]
+        frame_results = [r for r in results if r.get('frame') == i]
+        
+        for k, (x, y, w, h) in enumerate(boxes):
+            best_text, best_confidence = "", 0
+            for result in frame_results:
+                region_texts = result.get('region_texts') or []
+                text = post_process_text(region_texts[k]) if k < len(region_texts) else ""
+                confidence = calculate_text_confidence(text)
+                if text and confidence > best_confidence:
+                    best_text, best_confidence = text, confidence
+            
+            if best_text:
+                x, y, w, h = (round(v * box_scale) for v in (x, y, w, h))
+                timeline.append([round(frame_times[i], 2), int(x), int(y), int(w), int(h),
+                                 best_text, round(best_confidence, 2)])
+    
+    timeline.sort(key=lambda entry: entry[0])
+    return timeline
 
 def merge_and_select_best_result(results):
     """
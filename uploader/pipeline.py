@@ -0,0 +1,382 @@
+"""
+Pipeline de traitement d'une vidéo uploadée : OCR, transcription audio et analyse IA.
+Exécuté en arrière-plan par la commande `process_videos`, jamais dans la requête HTTP.
+
+Chaque étape enregistre son état, sa durée, son erreur et ses résultats dans
+`Video.processing_stages` dès qu'elle se termine. En cas d'échec, la tâche est
+retentée et le pipeline reprend à la première étape incomplète, sans refaire
+l'OCR ou la transcription déjà terminés.
+"""
+
+import time
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import Video
+from .workspace import MediaWorkspace
+from .stages import (
+    STAGE_PENDING, STAGE_RUNNING, STAGE_DONE, STAGE_FAILED, STAGE_SKIPPED,
+    OCR_BRANCH_STAGES, AUDIO_BRANCH_STAGES,
+    run_ocr_branch, run_audio_branch, failed_branch, skipped_stage, probe_stage, subtitles_stage,
+)
+
+logger = logging.getLogger(__name__)
+
+# Étapes dans l'ordre d'exécution
+STAGES = [
+    'download',
+    'probe',
+    'subtitles',
+    'ocr',
+    'audio_extract',
+    'vad',
+    'asr',
+    'llm_correction',
+    'categorization',
+]
+
+# Champs du modèle Video produits par chaque étape
+STAGE_FIELDS = {
+    'download': [],
+    'probe': ['media_metadata', 'has_speech', 'speech_metadata', 'audio_transcription'],
+    'subtitles': ['extracted_text', 'ocr_timeline'],
+    'ocr': ['extracted_text', 'ocr_timeline'],
+    'audio_extract': [],
+    'vad': ['has_speech', 'speech_metadata', 'audio_transcription'],
+    'asr': ['audio_transcription'],
+    'llm_correction': ['corrected_text', 'corrected_audio_transcription'],
+    'categorization': ['keywords', 'category', 'subcategory', 'analysis_metadata'],
+}
+
+
+# Pool de processus pour les branches OCR et audio, conservé entre les tâches
+# du worker afin de ne pas réimporter torch/OpenCV à chaque vidéo
+_branch_executor = None
+
+
+class StageError(Exception):
+    """Une ou plusieurs étapes du pipeline ont échoué."""
+
+
+def get_branch_executor():
+    global _branch_executor
+    if _branch_executor is None:
+        # spawn : pas de fork d'un processus qui détient des connexions DB ou des threads torch
+        _branch_executor = ProcessPoolExecutor(
+            max_workers=2,
+            mp_context=multiprocessing.get_context('spawn'),
+        )
+    return _branch_executor
+
+
+def shutdown_branch_executor():
+    global _branch_executor
+    if _branch_executor is not None:
+        _branch_executor.shutdown(wait=False, cancel_futures=True)
+        _branch_executor = None
+
+
+def process_video(video):
+    """
+    Exécute les étapes restantes du pipeline pour une vidéo.
+
+    Les erreurs sont propagées pour que la tâche soit retentée ;
+    les étapes déjà terminées ne sont pas refaites.
+    """
+    VideoPipeline(video).run()
+
+
+def reset_stages(video, from_stage):
+    """
+    Remet à zéro l'étape indiquée et toutes les suivantes,
+    pour forcer leur réexécution au prochain traitement.
+    """
+    if from_stage not in STAGES:
+        raise ValueError(f"Étape inconnue: {from_stage} (attendu: {', '.join(STAGES)})")
+
+    stages = dict(video.processing_stages or {})
+    for name in STAGES[STAGES.index(from_stage):]:
+        stages.pop(name, None)
+
+    video.processing_stages = stages
+    Video.objects.filter(pk=video.pk).update(processing_stages=stages)
+
+
+class VideoPipeline:
+    """Machine à états des étapes de traitement d'une vidéo."""
+
+    def __init__(self, video):
+        self.video = video
+        self.stages = dict(video.processing_stages or {})
+        self.workspace = None
+        self.video_path = None
+
+    def run(self):
+        if not self.video.file:
+            return
+
+        # Une vidéo de même contenu a pu terminer son analyse depuis l'upload
+        if not self.stages and self._reuse_duplicate_analysis():
+            return
+
+        try:
+            # download (copie locale) et audio_extract (audio en mémoire) ne produisent rien
+            # de persistant : ils sont refaits à chaque exécution si une étape qui en dépend reste à faire
+            if self._needs('ocr', 'vad', 'asr'):
+                self._run_stage('download', self._download)
+                if self._needs('probe'):
+                    self._run_stage('probe', self._probe)
+                if settings.USE_EMBEDDED_SUBTITLES and self._needs('subtitles'):
+                    self._run_stage('subtitles', self._embedded_subtitles)
+                self._run_media_branches()
+
+            if self._needs('llm_correction'):
+                self._run_stage('llm_correction', self._llm_correction)
+
+            if self._needs('categorization'):
+                self._run_stage('categorization', self._categorization)
+
+        finally:
+            self._cleanup()
+
+    def _reuse_duplicate_analysis(self):
+        duplicate = self.video.find_analyzed_duplicate()
+        if duplicate is None:
+            return False
+
+        print(f"♻️ Contenu identique à la vidéo #{duplicate.pk}, réutilisation de son analyse")
+        self.video.copy_analysis_from(duplicate)
+        self.stages = self.video.processing_stages
+        Video.objects.filter(pk=self.video.pk).update(
+            processing_stages=self.stages,
+            **{field: getattr(self.video, field) for field in Video.REUSABLE_ANALYSIS_FIELDS}
+        )
+        return True
+
+    def stage_status(self, name):
+        return self.stages.get(name, {}).get('status', STAGE_PENDING)
+
+    def _needs(self, *names):
+        """Indique si au moins une des étapes reste à faire."""
+        return any(self.stage_status(name) not in (STAGE_DONE, STAGE_SKIPPED) for name in names)
+
+    def _run_stage(self, name, func):
+        """
+        Exécute une étape et persiste son état.
+        Une étape en échec enregistre son erreur puis propage l'exception.
+        """
+        previous = self.stages.get(name, {})
+        state = {
+            'status': STAGE_RUNNING,
+            'started_at': timezone.now().isoformat(),
+            'attempts': previous.get('attempts', 0) + 1,
+        }
+        self.stages[name] = state
+        self._persist(name, fields=False)
+
+        started = time.monotonic()
+        try:
+            output = func() or {}
+        except Exception as e:
+            state.update({
+                'status': STAGE_FAILED,
+                'finished_at': timezone.now().isoformat(),
+                'duration': round(time.monotonic() - started, 3),
+                'error': str(e),
+            })
+            self._persist(name, fields=False)
+            logger.error(f"Étape {name} en échec pour la vidéo {self.video.pk}: {e}")
+            raise
+
+        state.update({
+            'status': STAGE_DONE,
+            'finished_at': timezone.now().isoformat(),
+            'duration': round(time.monotonic() - started, 3),
+            'output': output,
+        })
+        self._persist(name)
+        logger.info(f"Étape {name} terminée pour la vidéo {self.video.pk} en {state['duration']:.1f}s")
+
+    def _run_media_branches(self):
+        """
+        Exécute la branche OCR et la branche audio (extraction → VAD → ASR),
+        en parallèle dans des processus séparés si les deux sont à faire.
+        Les résultats de chaque branche sont enregistrés même si l'autre échoue.
+        """
+        options = self._branch_options()
+        branches = {}
+        if self._needs('ocr'):
+            branches['ocr'] = (run_ocr_branch, (self.video_path, options), OCR_BRANCH_STAGES)
+        if self._needs('vad', 'asr'):
+            plan = {
+                'vad': self._needs('vad'),
+                'asr': self._needs('asr'),
+                'has_speech': self.video.has_speech,
+                'speech_segments': (self.video.speech_metadata or {}).get('segments'),
+                'duration': (self.video.media_metadata or {}).get('duration'),
+            }
+            branches['audio'] = (run_audio_branch, (self.video_path, plan, options), AUDIO_BRANCH_STAGES)
+
+        started = [
+            name for _, _, names in branches.values() for name in names if self._needs(name)
+        ]
+        for name in started:
+            self._mark_running(name)
+
+        results = self._execute_branches(branches)
+
+        errors = []
+        for branch_results in results.values():
+            for name, (state, fields) in branch_results.items():
+                if state['status'] != STAGE_SKIPPED:
+                    state['attempts'] = self.stages.get(name, {}).get('attempts', 1)
+                self.stages[name] = state
+                for field, value in fields.items():
+                    setattr(self.video, field, value)
+                self._persist(name, fields=state['status'] != STAGE_FAILED)
+                if state['status'] == STAGE_FAILED:
+                    errors.append(f"{name}: {state.get('error')}")
+                else:
+                    logger.info(f"Étape {name} {state['status']} pour la vidéo {self.video.pk}")
+
+        # Étapes non atteintes après un échec dans leur branche
+        for name in started:
+            if self.stage_status(name) == STAGE_RUNNING:
+                self.stages[name]['status'] = STAGE_PENDING
+                self._persist(name, fields=False)
+
+        if errors:
+            raise StageError('; '.join(errors))
+
+    def _branch_options(self):
+        """Options transmises aux branches, qui n'ont pas accès aux settings Django."""
+        return {
+            'inference_address': settings.INFERENCE_SERVER_ADDRESS,
+            'inference_authkey': settings.INFERENCE_SERVER_AUTHKEY.encode(),
+            'vad_streaming': settings.VAD_STREAMING,
+            'vad': {
+                'onnx': settings.VAD_ONNX,
+                'model_path': settings.VAD_MODEL_PATH,
+            },
+            'asr': {
+                'batch_size': settings.ASR_BATCH_SIZE,
+                'num_threads': settings.ASR_NUM_THREADS,
+            },
+            'ocr': {
+                'detect_regions': settings.OCR_TEXT_REGIONS,
+                'workers': settings.OCR_WORKERS,
+                'cascade': settings.OCR_CASCADE,
+                'frame_threshold': settings.OCR_CASCADE_FRAME_THRESHOLD,
+                'video_threshold': settings.OCR_CASCADE_VIDEO_THRESHOLD,
+                'easyocr_batch_size': settings.EASYOCR_BATCH_SIZE,
+                'easyocr_workers': settings.EASYOCR_WORKERS,
+                'tesseract_backend': settings.OCR_TESSERACT_BACKEND,
+                'dedupe': settings.OCR_DEDUPE,
+                'frame_source': settings.OCR_FRAME_SOURCE,
+                'mode': settings.OCR_MODE,
+                'subtitle_interval': settings.OCR_SUBTITLE_INTERVAL,
+                'media': self.video.media_metadata or None,
+            },
+        }
+
+    def _execute_branches(self, branches):
+        parallel = settings.PIPELINE_PARALLEL_BRANCHES and len(branches) > 1
+        if not parallel:
+            return {key: func(*args) for key, (func, args, _) in branches.items()}
+
+        executor = get_branch_executor()
+        futures = {key: executor.submit(func, *args) for key, (func, args, _) in branches.items()}
+
+        results = {}
+        for key, future in futures.items():
+            try:
+                results[key] = future.result()
+            except Exception as e:
+                # Processus mort (mémoire, segfault...) : recréer le pool au prochain appel
+                logger.error(f"Branche {key} interrompue pour la vidéo {self.video.pk}: {e}")
+                shutdown_branch_executor()
+                results[key] = failed_branch(branches[key][2], e)
+        return results
+
+    def _mark_running(self, name):
+        previous = self.stages.get(name, {})
+        self.stages[name] = {
+            'status': STAGE_RUNNING,
+            'started_at': timezone.now().isoformat(),
+            'attempts': previous.get('attempts', 0) + 1,
+        }
+        self._persist(name, fields=False)
+
+    def _persist(self, name, fields=True):
+        """Enregistre l'état des étapes et, si demandé, les champs produits par l'étape."""
+        updates = {'processing_stages': self.stages}
+        if fields:
+            for field in STAGE_FIELDS[name]:
+                updates[field] = getattr(self.video, field)
+        self.video.processing_stages = self.stages
+        # Mise à jour sans déclencher save() récursif
+        Video.objects.filter(pk=self.video.pk).update(**updates)
+
+    # --- Étapes -------------------------------------------------------------
+
+    def _download(self):
+        # Une seule copie locale par exécution, partagée par toutes les étapes
+        self.workspace = MediaWorkspace(self.video.file)
+        self.video_path = self.workspace.video_path
+        return {'copied': self.workspace.is_copy, 'bytes': self.workspace.downloaded_bytes}
+
+    def _probe(self):
+        output, fields = probe_stage(self.video_path)
+        for field, value in fields.items():
+            setattr(self.video, field, value)
+
+        # Aucune piste audio : inutile de lancer ffmpeg, la VAD et Whisper
+        if output['probed'] and not output['has_audio']:
+            for name in AUDIO_BRANCH_STAGES:
+                if self._needs(name):
+                    self.stages[name], _ = skipped_stage("Aucune piste audio")
+            self.video.has_speech = False
+            self.video.speech_metadata = {'analyzed': False, 'reason': "Aucune piste audio"}
+            self.video.audio_transcription = ""
+        return output
+
+    def _embedded_subtitles(self):
+        # Sous-titres intégrés : texte de la vidéo sans OCR ; la branche audio reste à faire
+        # (commentaire, doublage : la parole peut différer des sous-titres)
+        streams = self.video.media_metadata.get('subtitles') if self.video.media_metadata else None
+        if streams == []:
+            return {'found': False}
+        output, fields = subtitles_stage(self.video_path, streams)
+        for field, value in fields.items():
+            setattr(self.video, field, value)
+        if output['found']:
+            for name in OCR_BRANCH_STAGES:
+                self.stages[name], _ = skipped_stage("Sous-titres intégrés utilisés")
+        return output
+
+    def _llm_correction(self):
+        self.video.correct_with_ai()
+        return {
+            'ocr_chars': len(self.video.corrected_text),
+            'audio_chars': len(self.video.corrected_audio_transcription),
+        }
+
+    def _categorization(self):
+        self.video.categorize_with_ai()
+        return {
+            'category': self.video.category,
+            'keywords': len(self.video.keywords) if isinstance(self.video.keywords, list) else 0,
+        }
+
+    def _cleanup(self):
+        # Supprimer l'espace de travail (copie locale de la vidéo)
+        if self.workspace is not None:
+            self.workspace.cleanup()
+            self.workspace = None
+
+        # Nettoyer le fichier local après traitement si on utilise GCS
+        self.video._cleanup_local_file_if_on_gcs()
@@ -0,0 +1,368 @@
+"""
+Étapes OCR et audio du pipeline vidéo.
+
+Ce module n'utilise pas Django : les deux branches (OCR d'un côté, extraction
+audio → VAD → transcription de l'autre) peuvent ainsi être exécutées dans des
+processus séparés, sans que Tesseract/EasyOCR et torch se disputent le GIL.
+Chaque étape retourne son état (statut, horodatage, durée, erreur, résumé) et
+les champs du modèle Video qu'elle a produits ; c'est le pipeline qui les enregistre.
+"""
+
+import time
+import logging
+from datetime import datetime, timezone
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+STAGE_PENDING = 'pending'
+STAGE_RUNNING = 'running'
+STAGE_DONE = 'done'
+STAGE_FAILED = 'failed'
+STAGE_SKIPPED = 'skipped'
+
+# Nombre maximal de ffmpeg lancés pour décoder les passages de parole : au-delà,
+# les plages séparées par les plus courts silences sont regroupées
+MAX_SPEECH_RANGES = 8
+# Part de la durée à partir de laquelle l'audio est plutôt décodé en entier (un seul ffmpeg)
+FULL_DECODE_COVERAGE = 0.5
+
+OCR_BRANCH_STAGES = ['ocr']
+AUDIO_BRANCH_STAGES = ['audio_extract', 'vad', 'asr']
+
+
+def now_iso():
+    return datetime.now(timezone.utc).isoformat()
+
+
+def run_stage(func, *args):
+    """
+    Exécute une fonction d'étape sans jamais lever d'exception.
+
+    La fonction doit retourner un tuple (output, fields) : un petit résumé
+    sérialisable en JSON et les valeurs des champs Video produits.
+
+    Returns:
+        Tuple (state: dict, fields: dict)
+    """
+    state = {'status': STAGE_RUNNING, 'started_at': now_iso()}
+    started = time.monotonic()
+    try:
+        output, fields = func(*args)
+    except Exception as e:
+        logger.error(f"Erreur étape {getattr(func, '__name__', func)}: {e}")
+        state.update({
+            'status': STAGE_FAILED,
+            'finished_at': now_iso(),
+            'duration': round(time.monotonic() - started, 3),
+            'error': str(e),
+        })
+        return state, {}
+
+    state.update({
+        'status': STAGE_DONE,
+        'finished_at': now_iso(),
+        'duration': round(time.monotonic() - started, 3),
+        'output': output or {},
+    })
+    return state, fields or {}
+
+
+def skipped_stage(reason):
+    """État d'une étape volontairement ignorée."""
+    return {'status': STAGE_SKIPPED, 'finished_at': now_iso(), 'reason': reason}, {}
+
+
+def failed_branch(stage_names, error):
+    """États d'une branche dont le processus a échoué avant de rendre un résultat."""
+    return {
+        stage_names[0]: ({'status': STAGE_FAILED, 'finished_at': now_iso(), 'error': str(error)}, {}),
+    }
+
+
+def get_inference_client(options):
+    """Client du serveur d'inférence si une adresse est configurée, sinon None."""
+    address = (options or {}).get('inference_address')
+    if not address:
+        return None
+    from inference_server import InferenceClient, check_authkey
+    try:
+        check_authkey(options.get('inference_authkey'))
+        return InferenceClient(address, options['inference_authkey'])
+    except ValueError as e:
+        print(f"⚠️ Serveur d'inférence ignoré ({e}), chargement local des modèles")
+        return None
+
+
+def call_models(options, method, local_func, *args, **kwargs):
+    """
+    Exécute une inférence sur le serveur d'inférence (modèles déjà chargés),
+    ou localement si aucun serveur n'est configuré ou joignable (modèles chargés
+    une fois par processus, voir speech_transcriber.get_model et voice_detection.get_detector).
+    """
+    client = get_inference_client(options)
+    if client is not None:
+        try:
+            return getattr(client, method)(*args, **kwargs)
+        except OSError as e:
+            print(f"⚠️ Serveur d'inférence injoignable ({e}), chargement local des modèles")
+    return local_func(*args, **kwargs)
+
+
+# --- Étapes ---------------------------------------------------------------
+
+def probe_stage(video_path):
+    from video_utils import probe_media
+
+    # Un seul ffprobe par vidéo : durée, flux vidéo, audio et sous-titres
+    metadata = probe_media(video_path)
+    if metadata is None:
+        return {'probed': False}, {}
+
+    video = metadata['video'] or {}
+    output = {
+        'probed': True,
+        'duration': metadata['duration'],
+        'resolution': f"{video.get('width', 0)}x{video.get('height', 0)}" if video else None,
+        'has_audio': metadata['audio'] is not None,
+        'subtitles': len(metadata['subtitles']),
+    }
+    return output, {'media_metadata': metadata}
+
+
+def subtitles_stage(video_path, streams=None):
+    from video_utils import extract_subtitles
+
+    # Piste de sous-titres texte intégrée (MP4 mov_text, MKV SRT/WebVTT/ASS...)
+    track = extract_subtitles(video_path, streams)
+    if track is None:
+        return {'found': False}, {}
+
+    # Répliques consécutives identiques (sous-titres « roll-up ») : une seule fois
+    cues = [cue for i, cue in enumerate(track['cues']) if i == 0 or cue[2] != track['cues'][i - 1][2]]
+    text = '\n'.join(cue_text for _, _, cue_text in cues)
+    # Chronologie au format de Video.ocr_timeline ; zone nulle : piste texte, sans position à l'écran
+    timeline = [[round(start, 2), 0, 0, 0, 0, cue_text, 1.0] for start, _, cue_text in cues]
+    print(f"💬 Sous-titres intégrés ({track['codec']}, {track['language'] or 'langue inconnue'}) : {len(cues)} répliques")
+
+    # Le texte de la piste n'est rangé qu'une fois, comme texte de la vidéo : la présence de
+    # parole et la transcription audio viennent de la branche audio
+    summary = {'stream': track['index'], 'codec': track['codec'], 'language': track['language'], 'cues': len(cues)}
+    return {'found': True, **summary}, {'extracted_text': text, 'ocr_timeline': timeline}
+
+
+def ocr_stage(video_path, options=None):
+    from .ocr_utils import extract_text_details
+
+    # Extraction OCR avec le fichier téléchargé (paramètres OCR issus des settings)
+    ocr_options = (options or {}).get('ocr', {})
+    details = call_models(options, 'extract_text_details', extract_text_details, video_path, **ocr_options)
+    extracted_text = details['text'] or ''
+    # Les statistiques (méthodes exécutées/ignorées par la cascade) restent dans l'état de l'étape
+    output = {'chars': len(extracted_text), 'confidence': details['confidence'], 'stats': details['stats']}
+    return output, {'extracted_text': extracted_text, 'ocr_timeline': details.get('timeline', [])}
+
+
+def audio_extract_stage(video_path, segments=None, duration=None):
+    from video_utils import AUDIO_SAMPLE_RATE, decode_audio, decode_audio_ranges
+
+    ranges = speech_ranges(segments) if segments else []
+    # Parole sur l'essentiel de la vidéo : un décodage complet coûte moins que les plages
+    if ranges and duration and sum(end - start for start, end in ranges) >= FULL_DECODE_COVERAGE * duration:
+        ranges = []
+
+    if ranges:
+        # Segments de parole déjà connus : seuls ces passages (avec une marge) sont décodés,
+        # mis bout à bout ; les segments sont replacés sur cet audio réduit
+        print(f"Décodage des passages de parole pour le fichier vidéo : {video_path}")
+        pieces = decode_audio_ranges(video_path, ranges)
+        if pieces is not None:
+            audio, segments = _join_speech_ranges(pieces, ranges, segments, AUDIO_SAMPLE_RATE)
+            output = {'has_audio': True, 'duration': round(len(audio) / AUDIO_SAMPLE_RATE, 2),
+                      'ranges': len(ranges)}
+            return output, {'audio': audio, 'segments': segments}
+
+    # Décodage unique en mémoire, partagé par la détection vocale et la transcription
+    print(f"Décodage audio pour le fichier vidéo : {video_path}")
+    audio = decode_audio(video_path)
+    output = {'has_audio': audio is not None}
+    if audio is not None:
+        output['duration'] = round(len(audio) / AUDIO_SAMPLE_RATE, 2)
+    return output, {'audio': audio, 'segments': segments}
+
+
+def speech_ranges(segments, padding=0.5, max_gap=2.0, max_ranges=MAX_SPEECH_RANGES):
+    """
+    Plages [début, fin] (secondes) à décoder pour transcrire les segments de parole.
+
+    Chaque segment est élargi de `padding` secondes (plus que la marge ajoutée par
+    la transcription), et les plages séparées de moins de `max_gap` secondes sont
+    regroupées : décoder un court silence coûte moins qu'un ffmpeg de plus. S'il
+    reste plus de `max_ranges` plages, les plus courts silences sont aussi décodés,
+    pour borner le nombre de ffmpeg.
+    """
+    ranges = []
+    for start, end in sorted(segments):
+        start, end = max(0.0, start - padding), end + padding
+        if ranges and start - ranges[-1][1] <= max_gap:
+            ranges[-1][1] = max(ranges[-1][1], end)
+        else:
+            ranges.append([start, end])
+
+    if len(ranges) > max_ranges:
+        gaps = sorted(range(len(ranges) - 1), key=lambda i: ranges[i + 1][0] - ranges[i][1])
+        joined = set(gaps[:len(ranges) - max_ranges])
+        coalesced = [ranges[0]]
+        for i, (start, end) in enumerate(ranges[1:]):
+            if i in joined:
+                coalesced[-1][1] = end
+            else:
+                coalesced.append([start, end])
+        ranges = coalesced
+    return ranges
+
+
+def _join_speech_ranges(pieces, ranges, segments, sample_rate):
+    """Audio des plages mis bout à bout et segments replacés sur cet audio."""
+    offsets = []
+    offset = 0.0
+    for piece in pieces:
+        offsets.append(offset)
+        offset += len(piece) / sample_rate
+
+    moved = []
+    for start, end in sorted(segments):
+        for (range_start, range_end), piece, piece_offset in zip(ranges, pieces, offsets):
+            if range_start <= start <= range_end:
+                limit = piece_offset + len(piece) / sample_rate
+                moved.append([round(piece_offset + start - range_start, 2),
+                              round(min(piece_offset + end - range_start, limit), 2)])
+                break
+    audio = np.concatenate(pieces) if pieces else np.zeros(0, dtype=np.float32)
+    return audio, moved
+
+
+def vad_stage(audio, options=None, duration=None, full_timestamps=True):
+    # Détecter d'abord si il y a de la parole
+    from voice_detection import has_speech
+    vad_options = (options or {}).get('vad', {})
+    speech_detected, speech_meta = call_models(
+        options, 'has_speech', has_speech, audio,
+        duration=duration, full_timestamps=full_timestamps, **vad_options
+    )
+
+    print(f"🎙️ Détection vocale: {'Parole détectée' if speech_detected else 'Aucune parole'}")
+
+    # Stocker les métadonnées de détection vocale
+    fields = {'has_speech': speech_detected, 'speech_metadata': speech_meta}
+    if not speech_detected:
+        fields['audio_transcription'] = ""
+    return {'has_speech': speech_detected}, fields
+
+
+def asr_stage(audio, options=None, segments=None):
+    from speech_transcriber import transcribe
+
+    # Transcrire seulement si parole détectée, et seulement les segments de parole du VAD
+    asr_options = (options or {}).get('asr', {})
+    transcription = call_models(options, 'transcribe', transcribe, audio, segments=segments, **asr_options) or ""
+    if transcription:
+        print(f"Transcription réussie : {transcription[:100]}...")
+    output = {'chars': len(transcription)}
+    if segments is not None:
+        output['speech_segments'] = len(segments)
+    return output, {'audio_transcription': transcription}
+
+
+# --- Branches -------------------------------------------------------------
+
+def run_ocr_branch(video_path, options=None):
+    """
+    Branche OCR : extraction du texte incrusté dans les frames.
+
+    Args:
+        video_path: Chemin local du fichier vidéo
+        options: Options du pipeline (adresse du serveur d'inférence...)
+
+    Returns:
+        dict {nom_étape: (state, fields)}
+    """
+    return {'ocr': run_stage(ocr_stage, video_path, options)}
+
+
+def run_audio_branch(video_path, plan, options=None):
+    """
+    Branche audio : détection vocale → décodage audio en mémoire → transcription.
+
+    Avec la détection vocale en flux (options['vad_streaming']), le VAD lit d'abord
+    l'audio sur un pipe ffmpeg, par fenêtres (mémoire bornée). Sans transcription à
+    suivre, il s'arrête dès que la décision est acquise. L'audio n'est ensuite décodé
+    en mémoire que s'il y a de la parole à transcrire, et seulement les passages de
+    parole, en au plus MAX_SPEECH_RANGES appels ffmpeg (un seul décodage complet si
+    la parole couvre l'essentiel de la vidéo). Sinon, l'audio est décodé entièrement
+    une fois, puis partagé par la détection vocale et la transcription.
+
+    Args:
+        video_path: Chemin local du fichier vidéo
+        plan: dict avec 'vad' et 'asr' (étapes à exécuter), 'has_speech' et
+              'speech_segments' (résultat d'une détection vocale déjà terminée)
+              et 'duration' (durée ffprobe, pour arrêter la détection vocale en flux)
+        options: Options du pipeline (adresse du serveur d'inférence...)
+
+    Returns:
+        dict {nom_étape: (state, fields)} ; les étapes non atteintes après un échec sont absentes
+    """
+    results = {}
+    has_speech = plan.get('has_speech', True)
+    segments = plan.get('speech_segments')
+    vad_pending = bool(plan.get('vad'))
+
+    if vad_pending and (options or {}).get('vad_streaming'):
+        state, fields = run_stage(vad_stage, video_path, options, plan.get('duration'), bool(plan.get('asr')))
+        results['vad'] = (state, fields)
+        if state['status'] == STAGE_FAILED:
+            return results
+        has_speech = fields['has_speech']
+        segments = fields['speech_metadata'].get('segments')
+        vad_pending = False
+
+    # Détection vocale terminée : l'audio n'est décodé que s'il reste de la parole à transcrire
+    if not vad_pending and not (plan.get('asr') and has_speech):
+        if not plan.get('asr'):
+            results['audio_extract'] = skipped_stage("Détection vocale en flux, sans transcription")
+        else:
+            results['audio_extract'] = skipped_stage("Aucune parole détectée")
+            results['asr'] = skipped_stage("Aucune parole détectée")
+        return results
+
+    # Segments connus (détection vocale terminée) : seuls les passages de parole sont décodés
+    state, fields = run_stage(audio_extract_stage, video_path, None if vad_pending else segments,
+                              plan.get('duration'))
+    results['audio_extract'] = (state, {})
+    if state['status'] == STAGE_FAILED:
+        return results
+    audio = fields.get('audio')
+    segments = fields.get('segments', segments)
+
+    if vad_pending:
+        if audio is not None:
+            state, fields = run_stage(vad_stage, audio, options)
+            results['vad'] = (state, fields)
+            if state['status'] == STAGE_FAILED:
+                return results
+            has_speech = fields['has_speech']
+            segments = fields['speech_metadata'].get('segments')
+        else:
+            state, _ = skipped_stage("Aucune piste audio extraite")
+            results['vad'] = (state, {'has_speech': False, 'audio_transcription': ""})
+
+    if plan.get('asr'):
+        if audio is None:
+            results['asr'] = skipped_stage("Aucune piste audio extraite")
+        elif not has_speech:
+            results['asr'] = skipped_stage("Aucune parole détectée")
+        else:
+            results['asr'] = run_stage(asr_stage, audio, options, segments)
+
+    return results
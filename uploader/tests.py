@@ -1,3 +1,512 @@
-from django.test import TestCase
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+import cv2
+import numpy as np
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from inference_server import check_authkey, parse_address
+from speech_transcriber import split_audio_chunks, speech_windows
+from video_utils import AUDIO_SAMPLE_RATE, parse_srt
+from voice_detection import speech_decision
+
+from .jobs import claim_next_job, complete_job, fail_job, touch_job
+from .models import Video, ProcessingJob
+from .ocr_utils import (
+    PytesseractEngine, batch_sharpness, deduplicate_images, detect_text_regions, select_text_thumbnails,
+)
+from .pipeline import STAGES, VideoPipeline, reset_stages
+from .stages import (
+    MAX_SPEECH_RANGES, STAGE_DONE, STAGE_FAILED, STAGE_SKIPPED, audio_extract_stage, ocr_stage,
+    run_audio_branch, run_stage, speech_ranges, subtitles_stage,
+)
+
+
+def create_video(title='Vidéo', content_hash='hash'):
+    """Vidéo sans fichier réel (empreinte fournie : le fichier n'est pas relu) ; une tâche est créée."""
+    video = Video(title=title, file=f'videos/{title}.mp4', content_hash=content_hash)
+    video.save()
+    return video
+
+
+@override_settings(PROCESSING_JOB_STALE_SECONDS=600, PROCESSING_JOB_RETRY_DELAY=60)
+class JobQueueTests(TestCase):
+
+    def setUp(self):
+        self.video = create_video()
+        self.job = self.video.jobs.get()
+
+    def test_upload_enqueues_one_job(self):
+        self.assertEqual(self.job.status, ProcessingJob.STATUS_PENDING)
+        self.assertEqual(self.video.processing_status, Video.STATUS_PENDING)
+
+    def test_claim_locks_job(self):
+        job = claim_next_job('worker-a')
+        self.assertEqual(job.pk, self.job.pk)
+        self.assertEqual(job.status, ProcessingJob.STATUS_RUNNING)
+        self.assertEqual(job.locked_by, 'worker-a')
+        self.assertEqual(job.attempts, 1)
+        self.assertIsNone(claim_next_job('worker-b'))
+
+    def test_pending_job_waits_for_retry_delay(self):
+        ProcessingJob.objects.filter(pk=self.job.pk).update(run_after=timezone.now() + timedelta(minutes=5))
+        self.assertIsNone(claim_next_job('worker-a'))
+
+    def test_stale_lock_is_reclaimed(self):
+        claim_next_job('worker-a')
+        ProcessingJob.objects.filter(pk=self.job.pk).update(locked_at=timezone.now() - timedelta(seconds=601))
+        job = claim_next_job('worker-b')
+        self.assertEqual(job.locked_by, 'worker-b')
+        self.assertEqual(job.attempts, 2)
+
+    def test_heartbeat_keeps_lock(self):
+        job = claim_next_job('worker-a')
+        ProcessingJob.objects.filter(pk=job.pk).update(locked_at=timezone.now() - timedelta(seconds=601))
+        self.assertTrue(touch_job(job))
+        self.assertIsNone(claim_next_job('worker-b'))
+
+    def test_stale_job_without_attempts_left_fails(self):
+        claim_next_job('worker-a')
+        ProcessingJob.objects.filter(pk=self.job.pk).update(
+            attempts=3, max_attempts=3, locked_at=timezone.now() - timedelta(seconds=601),
+        )
+        self.assertIsNone(claim_next_job('worker-b'))
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.status, ProcessingJob.STATUS_FAILED)
+
+    def test_complete_job(self):
+        job = claim_next_job('worker-a')
+        self.assertTrue(complete_job(job))
+        self.video.refresh_from_db()
+        self.assertEqual(self.video.processing_status, Video.STATUS_DONE)
+
+    def test_fail_job_reschedules_then_gives_up(self):
+        job = claim_next_job('worker-a')
+        self.assertTrue(fail_job(job, 'erreur'))
+        job.refresh_from_db()
+        self.assertEqual(job.status, ProcessingJob.STATUS_PENDING)
+        self.assertGreater(job.run_after, timezone.now())
+
+        ProcessingJob.objects.filter(pk=job.pk).update(attempts=2, run_after=timezone.now())
+        job = claim_next_job('worker-a')
+        self.assertFalse(fail_job(job, 'erreur'))
+        job.refresh_from_db()
+        self.assertEqual(job.status, ProcessingJob.STATUS_FAILED)
+
+    def test_reclaimed_job_ignores_previous_worker(self):
+        stale = claim_next_job('worker-a')
+        ProcessingJob.objects.filter(pk=stale.pk).update(locked_at=timezone.now() - timedelta(seconds=601))
+        claim_next_job('worker-b')
+
+        self.assertFalse(touch_job(stale))
+        self.assertFalse(complete_job(stale))
+        self.assertFalse(fail_job(stale, 'erreur'))
+        job = ProcessingJob.objects.get(pk=stale.pk)
+        self.assertEqual(job.status, ProcessingJob.STATUS_RUNNING)
+        self.assertEqual(job.locked_by, 'worker-b')
+        self.video.refresh_from_db()
+        self.assertEqual(self.video.processing_status, Video.STATUS_PROCESSING)
+
+
+class ResetStagesTests(TestCase):
+
+    def setUp(self):
+        self.video = create_video()
+        self.video.processing_stages = {name: {'status': 'done'} for name in STAGES}
+        self.video.save()
+
+    def test_resets_stage_and_following(self):
+        reset_stages(self.video, 'vad')
+        self.video.refresh_from_db()
+        self.assertCountEqual(self.video.processing_stages, STAGES[:STAGES.index('vad')])
+
+    def test_first_stage_resets_everything(self):
+        reset_stages(self.video, 'download')
+        self.video.refresh_from_db()
+        self.assertEqual(self.video.processing_stages, {})
+
+    def test_unknown_stage(self):
+        with self.assertRaises(ValueError):
+            reset_stages(self.video, 'inconnue')
+        self.video.refresh_from_db()
+        self.assertEqual(len(self.video.processing_stages), len(STAGES))
+
+
+class InferenceServerAddressTests(SimpleTestCase):
+
+    def test_unix_socket(self):
+        self.assertEqual(parse_address('/tmp/inference.sock'), ('/tmp/inference.sock', 'AF_UNIX'))
+
+    def test_loopback_hosts(self):
+        self.assertEqual(parse_address('localhost:7000'), (('localhost', 7000), 'AF_INET'))
+        self.assertEqual(parse_address('127.0.0.1:7000'), (('127.0.0.1', 7000), 'AF_INET'))
+
+    def test_remote_hosts_rejected(self):
+        for address in ('0.0.0.0:7000', '10.0.0.5:7000', 'example.com:7000'):
+            with self.assertRaises(ValueError):
+                parse_address(address)
+
+    def test_empty_authkey_rejected(self):
+        with self.assertRaises(ValueError):
+            check_authkey(b'')
+        check_authkey(b'cle')
+
+
+def caption_frame(text, scale=1.0, jpeg_quality=None):
+    """Frame sombre avec une légende claire ; `jpeg_quality` ajoute le bruit d'une compression."""
+    frame = np.full((360, 640, 3), 30, dtype=np.uint8)
+    cv2.putText(frame, text, (40, 200), cv2.FONT_HERSHEY_SIMPLEX, scale, (255, 255, 255), 2)
+    if jpeg_quality:
+        _, encoded = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, jpeg_quality])
+        frame = cv2.imdecode(encoded, cv2.IMREAD_COLOR)
+    return frame
+
+
+class DeduplicateImagesTests(SimpleTestCase):
+    CAPTIONS = [
+        ('Price 10 USD', 'Price 90 USD'),
+        ('see you at 5pm', 'see you at 6pm'),
+        ('HELLO WORLD', 'GOODBYE ALL'),
+    ]
+
+    def deduplicate(self, frames, regions=True):
+        frame_regions = [detect_text_regions(frame) if regions else [] for frame in frames]
+        return deduplicate_images(frames, frame_regions)
+
+    def test_near_identical_captions_are_kept(self):
+        for scale in (0.6, 1.0):
+            for first, second in self.CAPTIONS:
+                frames = [caption_frame(first, scale), caption_frame(second, scale, jpeg_quality=60)]
+                for regions in (True, False):
+                    with self.subTest(first=first, second=second, scale=scale, regions=regions):
+                        kept, _, stats = self.deduplicate(frames, regions)
+                        self.assertEqual(kept, [0, 1])
+                        self.assertEqual(stats['duplicate_frames'], 0)
+
+    def test_same_caption_is_read_once(self):
+        frames = [caption_frame('see you at 5pm'), caption_frame('see you at 5pm', jpeg_quality=60)]
+        for regions in (True, False):
+            with self.subTest(regions=regions):
+                kept, _, stats = self.deduplicate(frames, regions)
+                self.assertEqual(kept, [0])
+                self.assertEqual(stats['duplicate_frames'], 1)
+
+    def test_shared_region_is_read_once(self):
+        frames = [caption_frame('Price 10 USD', 1.5), caption_frame('Price 90 USD', 1.5)]
+        kept, kept_regions, stats = self.deduplicate(frames)
+        self.assertEqual(kept, [0, 1])
+        self.assertEqual(len(kept_regions[1]), 1)
+        self.assertEqual(stats['duplicate_regions'], 1)
+
+
+class SubtitleTests(SimpleTestCase):
+    SRT = (
+        "1\r\n00:00:01,500 --> 00:00:03,000\r\n<i>Bonjour</i>\r\ntout le monde\r\n\r\n"
+        "2\n00:01:02.250 --> 00:01:04.000\n{\\an8}Deuxième réplique\n\n"
+        "3\n00:01:05,000 --> 00:01:06,000\n<b> </b>\n\n"
+        "4\n1:00:00,000 --> 1:00:01,000\nUne heure\n"
+    )
+
+    def test_parse_srt(self):
+        self.assertEqual(parse_srt(self.SRT), [
+            (1.5, 3.0, 'Bonjour tout le monde'),
+            (62.25, 64.0, 'Deuxième réplique'),
+            (3600.0, 3601.0, 'Une heure'),
+        ])
+
+    def test_parse_srt_without_cues(self):
+        self.assertEqual(parse_srt(''), [])
+        self.assertEqual(parse_srt('1\npas de minutage\n'), [])
+
+    def test_subtitles_only_fill_video_text(self):
+        track = {'index': 2, 'codec': 'subrip', 'language': 'fre',
+                 'cues': [(1.0, 2.0, 'Bonjour'), (2.0, 3.0, 'Bonjour'), (3.0, 4.0, 'Au revoir')]}
+        with mock.patch('video_utils.extract_subtitles', return_value=track):
+            output, fields = subtitles_stage('video.mkv')
+
+        self.assertTrue(output['found'])
+        self.assertEqual(output['cues'], 2)
+        self.assertEqual(set(fields), {'extracted_text', 'ocr_timeline'})
+        self.assertEqual(fields['extracted_text'], 'Bonjour\nAu revoir')
+        self.assertEqual([entry[0] for entry in fields['ocr_timeline']], [1.0, 3.0])
+
+    def test_no_subtitle_track(self):
+        with mock.patch('video_utils.extract_subtitles', return_value=None):
+            self.assertEqual(subtitles_stage('video.mkv'), ({'found': False}, {}))
+
+
+class SpeechWindowsTests(SimpleTestCase):
+    RATE = AUDIO_SAMPLE_RATE
+    WINDOW = 30 * AUDIO_SAMPLE_RATE
+
+    def windows(self, segments, duration=120, **kwargs):
+        return speech_windows(segments, duration * self.RATE, self.WINDOW, **kwargs)
+
+    def lengths(self, windows):
+        return [sum(end - start for start, end in window) / self.RATE for window in windows]
+
+    def test_segments_share_a_window(self):
+        windows = self.windows([[1, 5], [10, 20]])
+        self.assertEqual(windows, [[(int(0.8 * self.RATE), int(5.2 * self.RATE)),
+                                    (int(9.8 * self.RATE), int(20.2 * self.RATE))]])
+
+    def test_padding_merges_close_segments(self):
+        self.assertEqual(self.windows([[1, 2], [2.3, 3]]), [[(int(0.8 * self.RATE), int(3.2 * self.RATE))]])
+
+    def test_long_segment_split_in_equal_parts(self):
+        windows = self.windows([[0, 60.5]], padding=0)
+        self.assertEqual(len(windows), 3)
+        self.assertTrue(all(20 <= length <= 30 for length in self.lengths(windows)))
+        self.assertEqual(windows[0][0][0], 0)
+        self.assertEqual(windows[-1][-1][1], int(60.5 * self.RATE))
+
+    def test_short_leftover_joins_previous_window(self):
+        windows = self.windows([[0, 29], [40, 40.3]], padding=0)
+        self.assertEqual(len(windows), 1)
+        self.assertAlmostEqual(self.lengths(windows)[0], 29.3)
+
+    def test_isolated_short_window_is_dropped(self):
+        self.assertEqual(self.windows([[5, 5.3]], padding=0), [])
+        windows = self.windows([[0, 0.5], [10, 39.8]], padding=0)
+        self.assertEqual(windows, [[(10 * self.RATE, int(39.8 * self.RATE))]])
+
+    def test_windows_never_exceed_whisper_window(self):
+        segments = [[i * 7, i * 7 + 6.5] for i in range(15)] + [[110, 119]]
+        for length in self.lengths(self.windows(segments)):
+            self.assertGreaterEqual(length, 1)
+            self.assertLessEqual(length, 30)
+
+    def test_split_audio_chunks(self):
+        waveform = np.arange(70 * self.RATE, dtype=np.float32)
+        self.assertEqual([(start, end) for start, end, _ in split_audio_chunks(waveform)],
+                         [(0, 30), (30, 60), (60, 70)])
+
+        chunks = split_audio_chunks(waveform, [[1, 2], [50, 51]])
+        self.assertEqual(len(chunks), 1)
+        start, end, chunk = chunks[0]
+        self.assertEqual((start, end), (0.8, 51.2))
+        self.assertEqual(len(chunk), int(2.8 * self.RATE))
+        self.assertEqual(chunk[0], int(0.8 * self.RATE))
+
+
+class SpeechDecisionTests(SimpleTestCase):
+
+    def test_enough_speech_stops_early(self):
+        self.assertIs(speech_decision(60, 60, 600), True)
+        self.assertIs(speech_decision(60, 90, 600, min_speech_duration=30), True)
+
+    def test_undecided_while_speech_is_still_possible(self):
+        self.assertIsNone(speech_decision(0, 30, 600))
+        self.assertIsNone(speech_decision(59, 570, 600))
+
+    def test_no_speech_possible(self):
+        self.assertIs(speech_decision(0, 570, 600), False)
+        self.assertIs(speech_decision(0.5, 10, 10), False)
+
+    def test_short_audio_needs_minimum_duration(self):
+        self.assertIs(speech_decision(1.0, 5, 5), True)
+        self.assertIsNone(speech_decision(0.5, 2, 5))
+
+    def test_unknown_duration_never_decides(self):
+        self.assertIsNone(speech_decision(100, 120, None))
+
+
+class AudioBranchTests(SimpleTestCase):
+    PLAN = {'vad': True, 'asr': True, 'has_speech': True, 'speech_segments': None, 'duration': 60.0}
+    SEGMENTS = [[10.0, 12.0], [40.0, 41.0]]
+
+    def run_branch(self, speech=True, streaming=True, plan=None):
+        rate = AUDIO_SAMPLE_RATE
+        metadata = {'segments': self.SEGMENTS if speech else []}
+        with mock.patch('voice_detection.has_speech', return_value=(speech, metadata)) as vad, \
+                mock.patch('video_utils.decode_audio', return_value=np.zeros(60 * rate, np.float32)) as full, \
+                mock.patch('video_utils.decode_audio_ranges',
+                           side_effect=lambda path, ranges: [np.zeros(int((end - start) * rate), np.float32)
+                                                             for start, end in ranges]) as ranges, \
+                mock.patch('speech_transcriber.transcribe', return_value='bonjour') as asr:
+            results = run_audio_branch('video.mp4', plan or self.PLAN, {'vad_streaming': streaming})
+        return results, vad, full, ranges, asr
+
+    def test_streaming_vad_runs_before_decoding(self):
+        results, vad, full, ranges, asr = self.run_branch()
+
+        self.assertEqual(vad.call_args.args[0], 'video.mp4')
+        self.assertEqual(vad.call_args.kwargs['duration'], 60.0)
+        self.assertTrue(vad.call_args.kwargs['full_timestamps'])
+        full.assert_not_called()
+        ranges.assert_called_once_with('video.mp4', speech_ranges(self.SEGMENTS))
+
+        audio = asr.call_args.args[0]
+        self.assertEqual(len(audio), 5 * AUDIO_SAMPLE_RATE)
+        self.assertEqual(asr.call_args.kwargs['segments'], [[0.5, 2.5], [3.5, 4.5]])
+        self.assertEqual({name: state['status'] for name, (state, _) in results.items()},
+                         {'vad': STAGE_DONE, 'audio_extract': STAGE_DONE, 'asr': STAGE_DONE})
+        self.assertEqual(results['asr'][1], {'audio_transcription': 'bonjour'})
+
+    def test_no_speech_skips_decoding(self):
+        results, vad, full, ranges, asr = self.run_branch(speech=False)
+
+        full.assert_not_called()
+        ranges.assert_not_called()
+        asr.assert_not_called()
+        self.assertEqual(results['vad'][1]['has_speech'], False)
+        self.assertEqual(results['audio_extract'][0]['status'], STAGE_SKIPPED)
+        self.assertEqual(results['asr'][0]['status'], STAGE_SKIPPED)
+
+    def test_vad_only_stops_without_decoding(self):
+        results, vad, full, ranges, asr = self.run_branch(plan={**self.PLAN, 'asr': False})
+
+        self.assertFalse(vad.call_args.kwargs['full_timestamps'])
+        full.assert_not_called()
+        ranges.assert_not_called()
+        self.assertEqual(results['audio_extract'][0]['status'], STAGE_SKIPPED)
+        self.assertNotIn('asr', results)
+
+    def decode_with_pcm_calls(self, segments, duration):
+        rate = AUDIO_SAMPLE_RATE
+        with mock.patch('video_utils._decode_pcm',
+                        side_effect=lambda path, sample_rate, start=None, length=None, allow_empty=False:
+                        np.zeros(int((length or duration) * rate), np.float32)) as pcm:
+            output, fields = audio_extract_stage('video.mp4', segments, duration)
+        return output, fields, pcm.call_count
+
+    def test_many_speech_ranges_bound_ffmpeg_calls(self):
+        # 10 groupes de 5 courtes phrases, espacés de 2 minutes : 50 plages avant regroupement
+        segments = [[group * 120.0 + k * 5.0, group * 120.0 + k * 5.0 + 0.5]
+                    for group in range(10) for k in range(5)]
+        output, fields, calls = self.decode_with_pcm_calls(segments, 1200.0)
+
+        self.assertEqual(calls, MAX_SPEECH_RANGES)
+        self.assertEqual(output['ranges'], MAX_SPEECH_RANGES)
+        self.assertEqual(len(fields['segments']), len(segments))
+        self.assertLessEqual(fields['segments'][-1][1], output['duration'])
+
+    def test_dense_speech_decodes_once(self):
+        segments = [[t, t + 4.0] for t in range(0, 600, 6)]
+        output, fields, calls = self.decode_with_pcm_calls(segments, 600.0)
+
+        self.assertEqual(calls, 1)
+        self.assertNotIn('ranges', output)
+        self.assertEqual(fields['segments'], segments)
+
+    def test_vad_error_fails_stage(self):
+        with mock.patch('voice_detection.has_speech', side_effect=RuntimeError('modèle')):
+            results = run_audio_branch('video.mp4', self.PLAN, {'vad_streaming': True})
+        self.assertEqual(results['vad'][0]['status'], STAGE_FAILED)
+        self.assertEqual(list(results), ['vad'])
+
+    def test_without_streaming_audio_is_decoded_once(self):
+        results, vad, full, ranges, asr = self.run_branch(streaming=False)
+
+        full.assert_called_once_with('video.mp4')
+        ranges.assert_not_called()
+        self.assertIsInstance(vad.call_args.args[0], np.ndarray)
+        self.assertEqual(asr.call_args.kwargs['segments'], self.SEGMENTS)
+
+    def test_known_segments_decode_speech_only(self):
+        plan = {**self.PLAN, 'vad': False, 'speech_segments': self.SEGMENTS}
+        results, vad, full, ranges, asr = self.run_branch(plan=plan)
+
+        vad.assert_not_called()
+        full.assert_not_called()
+        ranges.assert_called_once()
+        self.assertEqual(results['asr'][0]['status'], STAGE_DONE)
+
+
+class EmbeddedSubtitlesPipelineTests(TestCase):
+
+    def setUp(self):
+        self.pipeline = VideoPipeline(create_video())
+        self.pipeline.video_path = 'video.mkv'
+
+    def test_subtitles_skip_ocr_only(self):
+        self.pipeline.video.media_metadata = {'subtitles': [{'index': 2}], 'audio': {'codec': 'aac'}}
+        found = ({'found': True}, {'extracted_text': 'Bonjour', 'ocr_timeline': []})
+        with mock.patch('uploader.pipeline.subtitles_stage', return_value=found):
+            self.pipeline._embedded_subtitles()
+
+        self.assertEqual(self.pipeline.stage_status('ocr'), 'skipped')
+        self.assertTrue(self.pipeline._needs('audio_extract', 'vad', 'asr'))
+        self.assertEqual(self.pipeline.video.extracted_text, 'Bonjour')
+
+    def test_missing_audio_track_is_marked_not_analyzed(self):
+        probed = ({'probed': True, 'has_audio': False}, {'media_metadata': {'audio': None}})
+        with mock.patch('uploader.pipeline.probe_stage', return_value=probed):
+            self.pipeline._probe()
+
+        for name in ('audio_extract', 'vad', 'asr'):
+            self.assertEqual(self.pipeline.stage_status(name), 'skipped')
+        self.assertFalse(self.pipeline.video.has_speech)
+        self.assertEqual(self.pipeline.video.speech_metadata['analyzed'], False)
+
+
+class OcrErrorTests(SimpleTestCase):
+
+    def test_ocr_error_fails_stage(self):
+        with mock.patch('uploader.ocr_utils.load_text_frames', side_effect=MemoryError('frames')):
+            state, fields = run_stage(ocr_stage, 'video.mp4', {'ocr': {'frame_source': 'opencv'}})
+        self.assertEqual(state['status'], STAGE_FAILED)
+        self.assertEqual(fields, {})
+
+
+class PytesseractEngineTests(SimpleTestCase):
+    IMAGES = [np.full((20, 60), 255, np.uint8), np.full((30, 40), 255, np.uint8)]
+
+    def test_single_line_psm_reads_each_image(self):
+        with mock.patch('pytesseract.image_to_string', return_value='mot') as to_string, \
+                mock.patch('pytesseract.image_to_data') as to_data:
+            texts = PytesseractEngine().images_to_strings(self.IMAGES, psm=8, whitelist='ABC')
+
+        self.assertEqual(texts, ['mot', 'mot'])
+        to_data.assert_not_called()
+        self.assertEqual(to_string.call_count, 2)
+        for call in to_string.call_args_list:
+            self.assertIn('--psm 8', call.kwargs['config'])
+
+    def test_block_psm_stacks_images(self):
+        data = {'text': ['un', 'deux'], 'top': [20, 80], 'height': [10, 10],
+                'block_num': [1, 1], 'par_num': [1, 1], 'line_num': [1, 2]}
+        with mock.patch('pytesseract.image_to_string') as to_string, \
+                mock.patch('pytesseract.image_to_data', return_value=data) as to_data:
+            texts = PytesseractEngine().images_to_strings(self.IMAGES, psm=6)
+
+        to_string.assert_not_called()
+        self.assertIn('--psm 6', to_data.call_args.kwargs['config'])
+        self.assertEqual(texts, ['un', 'deux'])
+
+
+class SelectTextThumbnailsTests(SimpleTestCase):
+
+    def test_sharpness_computed_in_one_batch(self):
+        thumbs = []
+        for k in range(20):
+            thumb = np.zeros((90, 160), np.uint8)
+            cv2.putText(thumb, f"Plan {k // 5}", (10, 50), cv2.FONT_HERSHEY_SIMPLEX, 0.8, 255, 2)
+            thumbs.append((k * 15, thumb))
+
+        with mock.patch('uploader.ocr_utils.batch_sharpness', wraps=batch_sharpness) as sharpness:
+            indices = select_text_thumbnails(iter(thumbs), budget=5)
+
+        sharpness.assert_called_once()
+        self.assertEqual(len(sharpness.call_args.args[0]), len(thumbs))
+        self.assertTrue(indices)
+        self.assertEqual(indices, sorted(indices))
+
+
+class VideoDetailStartTimeTests(TestCase):
+
+    def setUp(self):
+        self.url = reverse('uploader:video_detail', args=[create_video().pk])
+
+    def start_time(self, value):
+        return self.client.get(self.url, {'t': value}).context['start_time']
+
+    def test_valid_start_time(self):
+        self.assertEqual(self.start_time('12.5'), 12.5)
+        self.assertEqual(self.start_time('0'), 0.0)
+
+    def test_invalid_start_time_is_ignored(self):
+        for value in ('nan', 'inf', '-inf', '-3', 'abc'):
+            self.assertIsNone(self.start_time(value), value)
@@ -0,0 +1,48 @@
+"""
+Gestionnaires d'upload calculant l'empreinte SHA-256 des fichiers pendant leur réception.
+
+L'empreinte est disponible sur le fichier uploadé (`uploaded_file.content_hash`)
+sans relire le contenu, ce qui permet de détecter les vidéos déjà analysées.
+"""
+
+import hashlib
+
+from django.core.files.uploadhandler import MemoryFileUploadHandler, TemporaryFileUploadHandler
+
+
+def compute_content_hash(file_obj, chunk_size=8 * 1024 * 1024):
+    """Calcule l'empreinte SHA-256 d'un fichier Django en le relisant par blocs."""
+    sha256 = hashlib.sha256()
+    for chunk in file_obj.chunks(chunk_size):
+        sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+class HashingUploadHandlerMixin:
+    """Met à jour un SHA-256 avec chaque bloc reçu par le gestionnaire."""
+
+    def new_file(self, *args, **kwargs):
+        # Initialisé avant super() : MemoryFileUploadHandler lève StopFutureHandlers
+        self.sha256 = hashlib.sha256()
+        super().new_file(*args, **kwargs)
+
+    def receive_data_chunk(self, raw_data, start):
+        remaining = super().receive_data_chunk(raw_data, start)
+        if remaining is None:
+            # Bloc consommé par ce gestionnaire
+            self.sha256.update(raw_data)
+        return remaining
+
+    def file_complete(self, file_size):
+        uploaded_file = super().file_complete(file_size)
+        if uploaded_file is not None:
+            uploaded_file.content_hash = self.sha256.hexdigest()
+        return uploaded_file
+
+
+class HashingMemoryFileUploadHandler(HashingUploadHandlerMixin, MemoryFileUploadHandler):
+    pass
+
+
+class HashingTemporaryFileUploadHandler(HashingUploadHandlerMixin, TemporaryFileUploadHandler):
+    pass
@@ -1,3 +1,5 @@
+import math
+
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
 from django.db.models import Q
@@ -62,18 +64,8 @@ def video_upload(request):
         if form.is_valid():
             video = form.save()
             
-            # Message de succès avec informations IA
-            success_msg = f'Vidéo "{video.title}" uploadée avec succès !'
-            
-            if video.corrected_text:
-                success_msg += f' Texte extrait et corrigé par IA.'
-            if video.category:
-                success_msg += f' Catégorisée: {video.category}'
-                if video.subcategory:
-                    success_msg += f' > {video.subcategory}'
-            if video.keywords:
-                keyword_count = len(video.keywords) if isinstance(video.keywords, list) else 0
-                success_msg += f' {keyword_count} mots-clés extraits.'
+            # Le traitement OCR/audio/IA est effectué en arrière-plan par les workers
+            success_msg = f'Vidéo "{video.title}" uploadée avec succès ! Analyse IA en cours, les résultats apparaîtront dans quelques minutes.'
             
             messages.success(request, success_msg)
             return redirect('uploader:video_list')
@@ -139,11 +131,22 @@ def video_detail(request, pk):
             'corrections_made': video.analysis_metadata.get('corrected_length', 0) != video.analysis_metadata.get('original_length', 0)
         }
     
+    # Instant de départ du lecteur (lien depuis un résultat de recherche)
+    try:
+        start_time = float(request.GET.get('t', ''))
+    except ValueError:
+        start_time = None
+    # nan, inf ou instant négatif : lecture depuis le début
+    if start_time is not None and not (math.isfinite(start_time) and start_time >= 0):
+        start_time = None
+    
     context = {
         'video': video,
         'keywords': keywords,
         'similar_videos': similar_videos,
         'analysis_info': analysis_info,
+        'timeline': video.timeline_entries(),
+        'start_time': start_time,
     }
     return render(request, 'uploader/video_detail.html', context)
 
@@ -180,8 +183,8 @@ def video_delete(request, pk):
             video_title = video.title
             video_file_name = video.file.name
             
-            # Supprimer le fichier sur Google Cloud Storage si nécessaire
-            if video.file:
+            # Supprimer le fichier sur Google Cloud Storage si nécessaire (sauf s'il est partagé)
+            if video.file and not video.file_is_shared():
                 try:
                     # Tenter de supprimer le fichier
                     video.file.delete(save=False)
@@ -216,8 +219,8 @@ def video_delete_ajax(request, pk):
         video_title = video.title
         video_file_name = video.file.name
         
-        # Supprimer le fichier sur Google Cloud Storage si nécessaire
-        if video.file:
+        # Supprimer le fichier sur Google Cloud Storage si nécessaire (sauf s'il est partagé)
+        if video.file and not video.file_is_shared():
             try:
                 video.file.delete(save=False)
                 print(f"✅ Fichier supprimé: {video_file_name}")
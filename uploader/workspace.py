@@ -0,0 +1,98 @@
+"""
+Espace de travail local d'une tâche de traitement vidéo.
+
+Le fichier uploadé est matérialisé une seule fois sur le disque local, puis
+le même chemin (`video_path`) est transmis à ffprobe, à l'OCR et à la branche
+audio, qui décode l'audio en mémoire. Sur un stockage local, le fichier est
+utilisé tel quel ; sur un stockage distant (GCS), il est copié dans un
+répertoire temporaire supprimé en fin de tâche (`cleanup`).
+"""
+
+import os
+import shutil
+import tempfile
+import logging
+
+import requests
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+class MediaWorkspace:
+    """Copie locale de la vidéo d'une tâche (répertoire temporaire si le stockage est distant)."""
+
+    def __init__(self, file_field, chunk_size=None):
+        self.file_field = file_field
+        self.chunk_size = chunk_size or settings.MEDIA_DOWNLOAD_CHUNK_SIZE
+        self.root = tempfile.mkdtemp(prefix='mediamanager-')
+        self._video_path = None
+        self.downloaded_bytes = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.cleanup()
+
+    @property
+    def video_path(self):
+        """Chemin local de la vidéo, téléchargée au premier accès uniquement."""
+        if self._video_path is None:
+            self._video_path = self._materialize()
+        return self._video_path
+
+    @property
+    def is_copy(self):
+        """True si la vidéo a été copiée dans l'espace de travail (stockage distant)."""
+        return self._video_path is not None and self._video_path.startswith(self.root)
+
+    def cleanup(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+        self._video_path = None
+
+    def _materialize(self):
+        # Stockage local : utiliser le fichier directement, sans copie
+        try:
+            local_path = self.file_field.path
+            if os.path.exists(local_path):
+                return local_path
+        except (NotImplementedError, AttributeError):
+            # Le fichier est sur GCS, on doit le télécharger
+            pass
+
+        extension = os.path.splitext(self.file_field.name)[1] or '.mp4'
+        destination = os.path.join(self.root, f'source{extension}')
+
+        try:
+            self._download_from_storage(destination)
+        except Exception as e:
+            print(f"⚠️ Téléchargement via le stockage impossible, tentative HTTP: {e}")
+            self._download_from_url(destination)
+
+        self.downloaded_bytes = os.path.getsize(destination)
+        print(f"Fichier téléchargé dans l'espace de travail : {destination} ({self.downloaded_bytes / 1e6:.1f} Mo)")
+        return destination
+
+    def _download_from_storage(self, destination):
+        storage = self.file_field.storage
+        bucket = getattr(storage, 'bucket', None)
+
+        if bucket is not None:
+            # Google Cloud Storage : flux direct du blob vers le disque, par gros blocs
+            blob = bucket.blob(self.file_field.name, chunk_size=self.chunk_size)
+            blob.download_to_filename(destination)
+            return
+
+        with storage.open(self.file_field.name, 'rb') as source, open(destination, 'wb') as target:
+            shutil.copyfileobj(source, target, self.chunk_size)
+
+    def _download_from_url(self, destination):
+        file_url = self.file_field.url
+        print(f"Téléchargement depuis : {file_url}")
+
+        with requests.get(file_url, stream=True, timeout=60) as response:
+            response.raise_for_status()
+            with open(destination, 'wb') as target:
+                for chunk in response.iter_content(chunk_size=self.chunk_size):
+                    target.write(chunk)
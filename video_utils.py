@@ -1,63 +1,318 @@
 import ffmpeg
-import tempfile
-import os
+import numpy as np
+import re
+import threading
 
-def extract_audio(video_path: str) -> str | None:
+# Fréquence d'échantillonnage attendue par Silero VAD et Whisper
+AUDIO_SAMPLE_RATE = 16000
+
+# Codecs de sous-titres texte (les sous-titres image, PGS/VobSub/DVB, demanderaient un OCR)
+TEXT_SUBTITLE_CODECS = {'mov_text', 'subrip', 'srt', 'webvtt', 'ass', 'ssa', 'text', 'microdvd', 'subviewer'}
+
+_SRT_TIMING = re.compile(r'(\d+):(\d{2}):(\d{2})[,.](\d{3})\s*-->\s*(\d+):(\d{2}):(\d{2})[,.](\d{3})')
+_SUBTITLE_TAGS = re.compile(r'<[^>]+>|\{[^}]*\}')
+
+def decode_audio(video_path: str, sample_rate: int = AUDIO_SAMPLE_RATE) -> np.ndarray | None:
+    """
+    Décode la piste audio en mémoire : mono, float32, `sample_rate` Hz.
+
+    ffmpeg écrit du PCM float32 brut sur sa sortie standard ; le tableau obtenu
+    est partagé par la détection vocale et la transcription, sans WAV temporaire,
+    second décodage ni rééchantillonnage.
+
+    Returns:
+        Tableau numpy float32 à une dimension, ou None si le fichier n'a pas d'audio
+        ou en cas d'erreur.
     """
-    Extrait la piste audio d'un fichier vidéo, la convertit en WAV mono, 16kHz
-    et retourne le chemin vers le fichier audio extrait.
+    audio = _decode_pcm(video_path, sample_rate)
+    if audio is not None:
+        print(f"Audio décodé en mémoire : {len(audio) / sample_rate:.1f}s à {sample_rate} Hz")
+    return audio
 
-    Args:
-        video_path: Chemin vers le fichier vidéo d'entrée.
+def decode_audio_ranges(video_path: str, ranges: list, sample_rate: int = AUDIO_SAMPLE_RATE) -> list | None:
+    """
+    Décode seulement les plages [début, fin] (secondes) de la piste audio : un
+    ffmpeg par plage, positionné directement sur son début, sans décoder le reste.
 
     Returns:
-        Chemin vers le fichier audio WAV extrait, ou None en cas d'erreur.
+        Liste de tableaux numpy float32 (un par plage, éventuellement vide en fin
+        de fichier), ou None en cas d'erreur.
     """
+    pieces = []
+    for start, end in ranges:
+        audio = _decode_pcm(video_path, sample_rate, start, end - start, allow_empty=True)
+        if audio is None:
+            return None
+        pieces.append(audio)
+    decoded = sum(len(audio) for audio in pieces) / sample_rate
+    print(f"Audio décodé en mémoire : {decoded:.1f}s en {len(pieces)} plage(s) à {sample_rate} Hz")
+    return pieces
+
+def _decode_pcm(video_path: str, sample_rate: int, start: float | None = None, duration: float | None = None,
+                allow_empty: bool = False) -> np.ndarray | None:
+    """Lit la sortie PCM de _audio_stream (voir decode_audio) ; None en cas d'erreur."""
+    buffer = bytearray()
     try:
-        # Créer un nom de fichier temporaire pour la sortie audio
-        with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmpfile:
-            output_audio_path = tmpfile.name
-        
-        print(f"Extraction de l'audio de {video_path} vers {output_audio_path}")
-
-        (
-            ffmpeg
-            .input(video_path)
-            .output(output_audio_path, acodec='pcm_s16le', ac=1, ar='16k')
-            .run(capture_stdout=True, capture_stderr=True, overwrite_output=True)
+        process = (
+            _audio_stream(video_path, sample_rate, start, duration)
+            .run_async(pipe_stdout=True, pipe_stderr=True)
         )
-        
-        print(f"Audio extrait avec succès : {output_audio_path}")
-        return output_audio_path
+    except OSError as e:
+        print(f"Erreur inattendue lors du décodage audio de {video_path}: {e}")
+        return None
+
+    # stderr est vidé en parallèle : un ffmpeg bavard bloquerait sur un pipe stderr plein
+    # pendant que ce processus attend la suite de stdout
+    errors = []
+    drain = threading.Thread(target=lambda: errors.append(process.stderr.read()), daemon=True)
+    drain.start()
+    try:
+        while True:
+            chunk = process.stdout.read(1024 * 1024)
+            if not chunk:
+                break
+            buffer += chunk
+    finally:
+        process.stdout.close()
+        process.wait()
+        drain.join()
+        process.stderr.close()
+    stderr = errors[0] if errors else b''
+
+    if process.returncode != 0 or not (buffer or allow_empty):
+        message = stderr.decode('utf8', 'replace').strip() or "aucune piste audio"
+        print(f"Erreur FFMPEG lors du décodage audio de {video_path}: {message}")
+        return None
+
+    # bytearray : le tableau est modifiable sans copie (torch.from_numpy)
+    return np.frombuffer(buffer[:len(buffer) - len(buffer) % 4], dtype=np.float32)
 
+def load_audio(audio, sample_rate: int = AUDIO_SAMPLE_RATE) -> np.ndarray | None:
+    """Audio déjà décodé (tableau numpy) ou chemin d'un fichier audio/vidéo à décoder."""
+    if isinstance(audio, np.ndarray):
+        return audio
+    return decode_audio(audio, sample_rate)
+
+def iter_audio_windows(video_path: str, window_seconds: float = 30, sample_rate: int = AUDIO_SAMPLE_RATE):
+    """
+    Génère l'audio par fenêtres de `window_seconds` (numpy float32 mono) lues sur
+    un pipe ffmpeg : la mémoire reste bornée quelle que soit la durée du fichier.
+
+    Arrêter l'itération (break, close()) arrête ffmpeg sans décoder la suite.
+    """
+    window_bytes = int(window_seconds * sample_rate) * 4
+    process = _audio_stream(video_path, sample_rate).run_async(pipe_stdout=True)
+    try:
+        while True:
+            data = process.stdout.read(window_bytes)
+            # Garder un nombre entier d'échantillons float32
+            data = data[:len(data) - len(data) % 4]
+            if not data:
+                break
+            yield np.frombuffer(data, dtype=np.float32).copy()
+    finally:
+        # Fenêtres abandonnées avant la fin : arrêter ffmpeg avant de fermer le pipe
+        # (sinon il signale un « Broken pipe »)
+        if process.poll() is None:
+            process.kill()
+        process.stdout.close()
+        process.wait()
+
+def _audio_stream(video_path: str, sample_rate: int, start: float | None = None, duration: float | None = None):
+    """
+    Commande ffmpeg écrivant la première piste audio en PCM float32 mono sur stdout,
+    éventuellement limitée à `duration` secondes à partir de `start` (seek avant l'entrée).
+    """
+    seek = {}
+    if start is not None:
+        seek['ss'] = f'{start:.3f}'
+    if duration is not None:
+        seek['t'] = f'{duration:.3f}'
+    return (
+        ffmpeg
+        .input(video_path, **seek)
+        .output('pipe:', map='0:a:0', format='f32le', acodec='pcm_f32le', ac=1, ar=sample_rate)
+        .global_args('-nostdin', '-loglevel', 'error')
+    )
+
+def probe_media(video_path: str) -> dict | None:
+    """
+    Un seul appel ffprobe décrivant le fichier : conteneur, flux vidéo, audio et sous-titres.
+
+    Returns:
+        dict {'format', 'duration', 'size', 'bit_rate',
+              'video': {'codec', 'width', 'height' (après rotation), 'rotation', 'fps', 'frames', 'pix_fmt'} ou None,
+              'audio': {'codec', 'sample_rate', 'channels'} ou None,
+              'subtitles': pistes texte (voir probe_subtitle_streams)},
+        ou None en cas d'erreur.
+    """
+    try:
+        probe = ffmpeg.probe(video_path, v='error')
     except ffmpeg.Error as e:
-        stderr = e.stderr.decode('utf8') if e.stderr else "Erreur FFMPEG inconnue"
-        print(f"Erreur FFMPEG lors de l'extraction audio de {video_path}: {stderr}")
-        # Nettoyer le fichier temporaire en cas d'erreur
-        if os.path.exists(output_audio_path):
-            os.remove(output_audio_path)
+        stderr = e.stderr.decode('utf8') if e.stderr else "Erreur FFPROBE inconnue"
+        print(f"Erreur FFPROBE lors de l'analyse de {video_path}: {stderr}")
         return None
-    except Exception as e:
-        print(f"Erreur inattendue lors de l'extraction audio de {video_path}: {e}")
-        # Nettoyer le fichier temporaire en cas d'erreur
-        if 'output_audio_path' in locals() and os.path.exists(output_audio_path):
-            os.remove(output_audio_path)
+    except OSError as e:
+        print(f"FFPROBE indisponible, analyse du fichier ignorée: {e}")
         return None
 
+    container = probe.get('format', {})
+    duration = float(container.get('duration') or 0)
+    streams = probe.get('streams', [])
+    video = next((s for s in streams if s.get('codec_type') == 'video'
+                  and not s.get('disposition', {}).get('attached_pic')), None)
+    audio = next((s for s in streams if s.get('codec_type') == 'audio'), None)
+
+    metadata = {
+        'format': container.get('format_name', ''),
+        'duration': round(duration, 3),
+        'size': int(container.get('size') or 0),
+        'bit_rate': int(container.get('bit_rate') or 0),
+        'video': _video_stream_metadata(video, duration) if video else None,
+        'audio': {
+            'codec': audio.get('codec_name', ''),
+            'sample_rate': int(audio.get('sample_rate') or 0),
+            'channels': int(audio.get('channels') or 0),
+        } if audio else None,
+        'subtitles': _text_subtitle_streams(streams),
+    }
+    return metadata
+
+
+def _video_stream_metadata(stream: dict, duration: float) -> dict:
+    fps = 0.0
+    for key in ('avg_frame_rate', 'r_frame_rate'):
+        num, _, den = stream.get(key, '0/0').partition('/')
+        if float(den or 1) > 0 and float(num) > 0:
+            fps = float(num) / float(den or 1)
+            break
+    fps = fps or 30
+
+    frames = int(stream.get('nb_frames') or 0)
+    if not frames:
+        frames = int(float(stream.get('duration') or duration) * fps)
+
+    # Vidéos filmées au téléphone : ffmpeg applique la rotation au décodage
+    rotation = stream.get('tags', {}).get('rotate') or next(
+        (side.get('rotation') for side in stream.get('side_data_list', []) if 'rotation' in side), 0)
+    rotation = int(float(rotation))
+    width, height = int(stream.get('width') or 0), int(stream.get('height') or 0)
+    if abs(rotation) % 180 == 90:
+        width, height = height, width
+
+    return {
+        'codec': stream.get('codec_name', ''),
+        'width': width,
+        'height': height,
+        'rotation': rotation,
+        'fps': round(fps, 3),
+        'frames': frames,
+        'pix_fmt': stream.get('pix_fmt', ''),
+    }
+
+
+def _text_subtitle_streams(streams: list) -> list:
+    subtitles = []
+    for stream in streams:
+        if stream.get('codec_type') != 'subtitle' or stream.get('codec_name') not in TEXT_SUBTITLE_CODECS:
+            continue
+        disposition = stream.get('disposition', {})
+        subtitles.append({
+            'index': stream['index'],
+            'codec': stream['codec_name'],
+            'language': stream.get('tags', {}).get('language', ''),
+            'default': bool(disposition.get('default')),
+            'forced': bool(disposition.get('forced')),
+        })
+    return subtitles
+
+
+def probe_subtitle_streams(video_path: str) -> list:
+    """
+    Liste les pistes de sous-titres texte d'un fichier vidéo (ffprobe).
+
+    Returns:
+        Liste de dicts {'index', 'codec', 'language', 'default', 'forced'} ;
+        liste vide si aucune piste texte ou en cas d'erreur.
+    """
+    try:
+        probe = ffmpeg.probe(video_path, select_streams='s', v='error')
+    except ffmpeg.Error as e:
+        stderr = e.stderr.decode('utf8') if e.stderr else "Erreur FFPROBE inconnue"
+        print(f"Erreur FFPROBE lors de la lecture des sous-titres de {video_path}: {stderr}")
+        return []
+    except OSError as e:
+        print(f"FFPROBE indisponible, sous-titres intégrés ignorés: {e}")
+        return []
+
+    return _text_subtitle_streams(probe.get('streams', []))
+
+
+def extract_subtitles(video_path: str, streams: list | None = None) -> dict | None:
+    """
+    Extrait la piste de sous-titres texte la plus complète d'un fichier vidéo.
+
+    Les pistes sont converties en SRT par ffmpeg sur un pipe (mov_text, SRT,
+    WebVTT, ASS...). La piste par défaut est préférée, les pistes « forcées »
+    (quelques répliques seulement) en dernier. `streams` : pistes déjà connues
+    (voir probe_media), pour ne pas relancer ffprobe.
+
+    Returns:
+        dict de la piste (voir probe_subtitle_streams) avec 'cues' : liste de
+        (début, fin, texte) en secondes, ou None si aucune piste texte n'est lisible.
+    """
+    if streams is None:
+        streams = probe_subtitle_streams(video_path)
+    for stream in sorted(streams, key=lambda s: (s['forced'], not s['default'])):
+        try:
+            content, _ = (
+                ffmpeg
+                .input(video_path)
+                .output('pipe:', map=f"0:{stream['index']}", format='srt')
+                .global_args('-nostdin', '-loglevel', 'error')
+                .run(capture_stdout=True, capture_stderr=True)
+            )
+        except ffmpeg.Error as e:
+            stderr = e.stderr.decode('utf8') if e.stderr else "Erreur FFMPEG inconnue"
+            print(f"Erreur FFMPEG lors de l'extraction des sous-titres de {video_path}: {stderr}")
+            continue
+
+        cues = parse_srt(content.decode('utf8', errors='replace'))
+        if cues:
+            return {**stream, 'cues': cues}
+    return None
+
+
+def parse_srt(content: str) -> list:
+    """
+    Répliques d'un fichier SRT : liste de (début, fin, texte) en secondes.
+    Les balises de style (<i>, {\\an8}...) sont retirées et les lignes d'une réplique jointes.
+    """
+    cues = []
+    for block in re.split(r'\n\s*\n', content.replace('\r', '')):
+        lines = block.strip().split('\n')
+        for i, line in enumerate(lines):
+            match = _SRT_TIMING.search(line)
+            if not match:
+                continue
+            h1, m1, s1, ms1, h2, m2, s2, ms2 = (int(v) for v in match.groups())
+            text = _SUBTITLE_TAGS.sub('', ' '.join(lines[i + 1:]))
+            text = re.sub(r'\s+', ' ', text).strip()
+            if text:
+                cues.append((h1 * 3600 + m1 * 60 + s1 + ms1 / 1000,
+                             h2 * 3600 + m2 * 60 + s2 + ms2 / 1000,
+                             text))
+            break
+    return cues
+
 if __name__ == '__main__':
-    # Créez un fichier vidéo de test (par exemple, test_video.mp4) dans le même répertoire
-    # ou spécifiez le chemin d'accès à une vidéo existante pour tester cette fonction.
-    # test_video_file = "test_video.mp4" 
-    # if os.path.exists(test_video_file):
-    #     print(f"Test de l'extraction audio pour: {test_video_file}")
-    #     audio_file = extract_audio(test_video_file)
-    #     if audio_file:
-    #         print(f"Audio extrait dans: {audio_file}")
-    #         # Vous pouvez ajouter ici un appel à speech_transcriber.transcribe(audio_file) pour tester l'ensemble du flux
-    #         # N'oubliez pas de supprimer le fichier audio temporaire après utilisation si nécessaire
-    #         # os.remove(audio_file)
-    #     else:
-    #         print("Échec de l'extraction audio.")
-    # else:
-    # print(f"Fichier vidéo de test '{test_video_file}' non trouvé. Veuillez le créer ou modifier le chemin.")
-    print("Le module video_utils est prêt. Utilisez la fonction extract_audio(video_path).") 
\ No newline at end of file
+    import sys
+
+    # Test rapide : python video_utils.py video.mp4
+    if len(sys.argv) > 1:
+        print(probe_media(sys.argv[1]))
+        audio = decode_audio(sys.argv[1])
+        if audio is not None:
+            print(f"{len(audio)} échantillons à {AUDIO_SAMPLE_RATE} Hz")
+    else:
+        print("Le module video_utils est prêt. Utilisez decode_audio(video_path) ou iter_audio_windows(video_path).")
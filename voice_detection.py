@@ -4,70 +4,111 @@ Module de détection d'activité vocale (VAD) utilisant Silero VAD.
 Détecte si un fichier audio contient de la parole humaine.
 """
 
-import torch
-import torchaudio
+import numpy as np
 import os
-import tempfile
+import threading
 from typing import Tuple, Optional
-import warnings
 
-# Supprimer les warnings de torchaudio
-warnings.filterwarnings("ignore", category=UserWarning, module="torchaudio")
+from video_utils import AUDIO_SAMPLE_RATE, iter_audio_windows
+
+# Détecteurs chargés, par (onnx, model_path) : voir get_detector
+_detectors = {}
+_detectors_lock = threading.Lock()
 
 class VoiceActivityDetector:
     """Détecteur d'activité vocale utilisant Silero VAD."""
+
+    # Taille des fenêtres d'analyse (secondes)
+    WINDOW_SECONDS = 30
+    # Écart maximal (secondes) pour recoller deux segments séparés par une limite de fenêtre
+    MERGE_GAP = 0.1
+    # Part minimale de parole dans l'audio
+    MIN_SPEECH_RATIO = 0.1
     
-    def __init__(self):
-        """Initialise le détecteur VAD."""
+    def __init__(self, onnx: bool = False, model_path: Optional[str] = None):
+        """
+        Initialise le détecteur VAD.
+
+        Args:
+            onnx: Utiliser le modèle ONNX (onnxruntime) plutôt que TorchScript
+            model_path: Fichier du modèle (.jit ou .onnx) ; par défaut celui fourni
+                        par le paquet silero-vad
+        """
+        self.onnx = onnx
+        self.model_path = model_path or None
         self.model = None
-        self.utils = None
+        self.get_speech_timestamps = None
         self._load_model()
     
     def _load_model(self):
-        """Charge le modèle Silero VAD."""
+        """Charge le modèle Silero VAD depuis un fichier local (sans torch.hub ni réseau)."""
         try:
-            import silero_vad
-            self.model, self.utils = torch.hub.load(
-                repo_or_dir='snakers4/silero-vad',
-                model='silero_vad',
-                force_reload=False,
-                onnx=False,
-                verbose=False
-            )
-            print("✅ Modèle Silero VAD chargé avec succès")
+            from silero_vad import get_speech_timestamps, load_silero_vad
+            from silero_vad.utils_vad import OnnxWrapper, init_jit_model
+
+            if self.model_path:
+                self.model = OnnxWrapper(self.model_path) if self.onnx else init_jit_model(self.model_path)
+            else:
+                self.model = load_silero_vad(onnx=self.onnx)
+            self.get_speech_timestamps = get_speech_timestamps
+            print(f"✅ Modèle Silero VAD chargé avec succès ({'ONNX' if self.onnx else 'TorchScript'})")
         except Exception as e:
             print(f"❌ Erreur chargement modèle VAD: {e}")
             raise
 
-    def has_speech(self, audio_path: str, min_speech_duration: float = 1.0, 
-                   confidence_threshold: float = 0.5) -> Tuple[bool, dict]:
+    def has_speech(self, audio, min_speech_duration: float = 1.0, 
+                   confidence_threshold: float = 0.5, duration: Optional[float] = None,
+                   full_timestamps: bool = True) -> Tuple[bool, dict]:
         """
-        Détecte si le fichier audio contient de la parole humaine.
+        Détecte si l'audio contient de la parole humaine.
+
+        L'audio est analysé par fenêtres de WINDOW_SECONDS. Un chemin de fichier est
+        lu en flux sur un pipe ffmpeg (mémoire bornée), et l'analyse s'arrête dès que
+        la décision ne peut plus changer : parole suffisante déjà trouvée (sauf si
+        full_timestamps), ou parole impossible à atteindre même si tout le reste en était.
         
         Args:
-            audio_path: Chemin vers le fichier audio
+            audio: Audio décodé (numpy float32 mono 16kHz, voir video_utils.decode_audio),
+                   chemin d'un fichier audio/vidéo ou itérable de fenêtres numpy
             min_speech_duration: Durée minimale de parole requise (secondes)
             confidence_threshold: Seuil de confiance pour la détection
+            duration: Durée totale de l'audio (secondes) si elle n'est pas déductible de
+                      `audio` (flux) ; sans elle, tout l'audio est analysé
+            full_timestamps: Analyser tout l'audio quand il y a de la parole, pour
+                             obtenir tous les segments (nécessaires à la transcription)
             
         Returns:
             Tuple (has_speech: bool, metadata: dict)
         """
+        # Import différé : torch n'est chargé qu'au moment d'analyser l'audio
+        import torch
+
+        windows = None
         try:
-            # Charger l'audio
-            wav, sample_rate = torchaudio.load(audio_path)
-            
-            # Convertir en mono si nécessaire
-            if wav.shape[0] > 1:
-                wav = wav.mean(dim=0, keepdim=True)
-            
-            # Resample à 16kHz si nécessaire (requis par Silero VAD)
-            if sample_rate != 16000:
-                resampler = torchaudio.transforms.Resample(sample_rate, 16000)
-                wav = resampler(wav)
-                sample_rate = 16000
-            
-            # Appliquer VAD
-            speech_timestamps = self._get_speech_timestamps(wav, sample_rate)
+            # Audio mono 16kHz (requis par Silero VAD) : aucun rééchantillonnage
+            sample_rate = AUDIO_SAMPLE_RATE
+            windows, total_duration = self._audio_windows(audio, duration)
+
+            speech_timestamps = []
+            scanned = 0
+            stopped = False
+            for window in windows:
+                for start, end in self._get_speech_timestamps(torch.from_numpy(window), sample_rate):
+                    start, end = start + scanned, end + scanned
+                    # Recoller un segment coupé par la limite entre deux fenêtres
+                    if speech_timestamps and start - speech_timestamps[-1][1] <= self.MERGE_GAP * sample_rate:
+                        speech_timestamps[-1] = (speech_timestamps[-1][0], end)
+                    else:
+                        speech_timestamps.append((start, end))
+                scanned += len(window)
+
+                speech_duration = sum(end - start for start, end in speech_timestamps) / sample_rate
+                decision = speech_decision(
+                    speech_duration, scanned / sample_rate, total_duration, min_speech_duration
+                )
+                if decision is False or (decision and not full_timestamps):
+                    stopped = True
+                    break
             
             # Calculer les métriques
             total_speech_duration = sum(
@@ -75,13 +116,15 @@ class VoiceActivityDetector:
                 for start, end in speech_timestamps
             )
             
-            audio_duration = wav.shape[1] / sample_rate
+            scanned_duration = scanned / sample_rate
+            early_exit = stopped and scanned_duration < total_duration
+            audio_duration = total_duration if early_exit else scanned_duration
             speech_ratio = total_speech_duration / max(audio_duration, 0.1)
             
             # Déterminer si il y a de la parole
             has_speech = (
                 total_speech_duration >= min_speech_duration and 
-                speech_ratio >= 0.1  # Au moins 10% de parole
+                speech_ratio >= self.MIN_SPEECH_RATIO
             )
             
             metadata = {
@@ -89,53 +132,110 @@ class VoiceActivityDetector:
                 'speech_duration': round(total_speech_duration, 2),
                 'speech_ratio': round(speech_ratio, 3),
                 'speech_segments': len(speech_timestamps),
+                'scanned_duration': round(scanned_duration, 2),
+                'early_exit': early_exit,
                 'confidence': confidence_threshold,
                 'method': 'silero_vad'
             }
+            if not early_exit:
+                # Segments [début, fin] en secondes : la transcription ne traite que ces passages
+                # (absents après un arrêt anticipé, ils ne couvriraient qu'une partie de l'audio)
+                metadata['segments'] = [
+                    [round(start / sample_rate, 2), round(end / sample_rate, 2)]
+                    for start, end in speech_timestamps
+                ]
             
-            print(f"🎙️ VAD: Parole={has_speech}, Durée={total_speech_duration:.1f}s/{audio_duration:.1f}s ({speech_ratio:.1%})")
+            exit_note = f", arrêt à {scanned_duration:.0f}s" if early_exit else ""
+            print(f"🎙️ VAD: Parole={has_speech}, Durée={total_speech_duration:.1f}s/{audio_duration:.1f}s ({speech_ratio:.1%}){exit_note}")
             
             return has_speech, metadata
             
         except Exception as e:
+            # Erreur propagée : l'étape VAD est marquée en échec et réessayée, au lieu
+            # d'enregistrer une détection supposée comme résultat définitif
             print(f"❌ Erreur détection vocale: {e}")
-            # En cas d'erreur, on assume qu'il y a de la parole (sécurité)
-            return True, {'error': str(e), 'fallback': True}
+            raise
 
-    def _get_speech_timestamps(self, wav: torch.Tensor, sample_rate: int) -> list:
-        """Obtient les timestamps des segments de parole."""
-        try:
-            # Utiliser get_speech_timestamps de Silero VAD
-            speech_timestamps = self.utils[0](
-                wav.squeeze(), 
-                self.model, 
-                sampling_rate=sample_rate,
-                threshold=0.5,
-                min_speech_duration_ms=250,  # 250ms minimum
-                min_silence_duration_ms=100,  # 100ms de silence entre segments
-                window_size_samples=1536,
-                speech_pad_ms=30
-            )
-            
-            # Convertir en liste de tuples (start, end)
-            return [(segment['start'], segment['end']) for segment in speech_timestamps]
-            
-        except Exception as e:
-            print(f"❌ Erreur get_speech_timestamps: {e}")
-            return []
+        finally:
+            # Arrêter ffmpeg si la lecture en flux a été interrompue
+            close = getattr(windows, 'close', None)
+            if close is not None:
+                close()
+
+    def _audio_windows(self, audio, duration=None):
+        """Fenêtres d'audio à analyser et durée totale (None si inconnue)."""
+        window = int(self.WINDOW_SECONDS * AUDIO_SAMPLE_RATE)
+        if isinstance(audio, np.ndarray):
+            windows = (audio[i:i + window] for i in range(0, len(audio), window))
+            return windows, len(audio) / AUDIO_SAMPLE_RATE
+        if isinstance(audio, (str, os.PathLike)):
+            return iter_audio_windows(audio, self.WINDOW_SECONDS), duration
+        return iter(audio), duration
+
+    def _get_speech_timestamps(self, wav, sample_rate: int) -> list:
+        """
+        Obtient les timestamps des segments de parole (wav : tenseur torch mono 16kHz).
+        Une erreur du modèle est propagée : une fenêtre illisible n'est pas du silence.
+        """
+        # Utiliser get_speech_timestamps de Silero VAD
+        # (fenêtres Silero de 512 échantillons à 16kHz, imposées par le modèle)
+        speech_timestamps = self.get_speech_timestamps(
+            wav.squeeze(), 
+            self.model, 
+            sampling_rate=sample_rate,
+            threshold=0.5,
+            min_speech_duration_ms=250,  # 250ms minimum
+            min_silence_duration_ms=100,  # 100ms de silence entre segments
+            speech_pad_ms=30
+        )
+        
+        # Convertir en liste de tuples (start, end)
+        return [(segment['start'], segment['end']) for segment in speech_timestamps]
+
+def speech_decision(speech_duration: float, scanned_duration: float, total_duration: Optional[float],
+                    min_speech_duration: float = 1.0,
+                    min_speech_ratio: float = VoiceActivityDetector.MIN_SPEECH_RATIO) -> Optional[bool]:
+    """
+    Décision de détection vocale déjà acquise après `scanned_duration` secondes analysées.
+
+    Returns:
+        True si la parole trouvée suffit déjà, False si elle ne peut plus suffire même
+        si tout le reste de l'audio était de la parole, None tant que rien n'est joué
+        (toujours None si la durée totale est inconnue)
+    """
+    if total_duration is None:
+        return None
+    required = max(min_speech_duration, min_speech_ratio * total_duration)
+    if speech_duration >= required:
+        return True
+    if speech_duration + max(total_duration - scanned_duration, 0) < required:
+        return False
+    return None
+
+def get_detector(onnx: bool = False, model_path: Optional[str] = None) -> VoiceActivityDetector:
+    """
+    Détecteur partagé par tout le processus, chargé au premier appel
+    (un par moteur et fichier de modèle).
+    """
+    key = (bool(onnx), model_path or None)
+    with _detectors_lock:
+        if key not in _detectors:
+            _detectors[key] = VoiceActivityDetector(onnx=key[0], model_path=key[1])
+        return _detectors[key]
 
-def has_speech(audio_path: str) -> Tuple[bool, dict]:
+def has_speech(audio, onnx: bool = False, model_path: Optional[str] = None, **kwargs) -> Tuple[bool, dict]:
     """
-    Fonction helper pour détecter la parole dans un fichier audio.
+    Fonction helper pour détecter la parole avec le détecteur partagé du processus.
     
     Args:
-        audio_path: Chemin vers le fichier audio
+        audio: Audio décodé (numpy float32 mono 16kHz) ou chemin d'un fichier audio/vidéo
+        onnx, model_path: Modèle à utiliser (voir VoiceActivityDetector)
+        **kwargs: Options de VoiceActivityDetector.has_speech (duration, full_timestamps...)
         
     Returns:
         Tuple (has_speech: bool, metadata: dict)
     """
-    detector = VoiceActivityDetector()
-    return detector.has_speech(audio_path)
+    return get_detector(onnx, model_path).has_speech(audio, **kwargs)
 
 def test_voice_detection(audio_path: str):
     """Teste la détection vocale sur un fichier."""